@@ -10,19 +10,15 @@ Rules:
 """
 from __future__ import annotations
 
-import sqlite3
 from typing import Any
 
-
-def _connect(db_path: str) -> sqlite3.Connection:
-    return sqlite3.connect(db_path)
+from src.persistence.connection import connection
 
 
 def create_category(db_path: str, name: str) -> int:
     if not name or not name.strip():
         raise ValueError("Category name required")
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         # Check duplicate
         cur = con.execute("SELECT category_id FROM categories WHERE name=?", (name,))
         if cur.fetchone():
@@ -30,26 +26,20 @@ def create_category(db_path: str, name: str) -> int:
         cur = con.execute("INSERT INTO categories(name) VALUES (?)", (name,))
         con.commit()
         return int(cur.lastrowid)
-    finally:
-        con.close()
 
 
 def list_categories(db_path: str) -> list[dict[str, Any]]:
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute("SELECT category_id, name, created_at FROM categories ORDER BY name")
         return [
             {"category_id": r[0], "name": r[1], "created_at": r[2]} for r in cur.fetchall()
         ]
-    finally:
-        con.close()
 
 
 def rename_category(db_path: str, category_id: int, new_name: str) -> None:
     if not new_name.strip():
         raise ValueError("New name empty")
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute("SELECT category_id FROM categories WHERE name=?", (new_name,))
         if cur.fetchone():
             raise ValueError(f"Category '{new_name}' already exists")
@@ -59,13 +49,10 @@ def rename_category(db_path: str, category_id: int, new_name: str) -> None:
         if updated.rowcount == 0:
             raise ValueError(f"Category {category_id} not found")
         con.commit()
-    finally:
-        con.close()
 
 
 def assign_category(db_path: str, transaction_id: str, category_id: int) -> None:
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         # Ensure category exists
         cur = con.execute("SELECT 1 FROM categories WHERE category_id=?", (category_id,))
         if not cur.fetchone():
@@ -77,13 +64,10 @@ def assign_category(db_path: str, transaction_id: str, category_id: int) -> None
         if updated.rowcount == 0:
             raise ValueError(f"Transaction {transaction_id} not found")
         con.commit()
-    finally:
-        con.close()
 
 
 def delete_category(db_path: str, category_id: int) -> None:
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         # Check references
         cur = con.execute(
             "SELECT 1 FROM transactions WHERE category_id=? LIMIT 1", (category_id,)
@@ -96,8 +80,6 @@ def delete_category(db_path: str, category_id: int) -> None:
         if deleted.rowcount == 0:
             raise ValueError(f"Category {category_id} not found")
         con.commit()
-    finally:
-        con.close()
 
 
 __all__ = [
@@ -0,0 +1,134 @@
+"""File hashing service for bulk (re)scans of statement archives.
+
+Wraps `hashing.file_sha256` with:
+ - A thread pool: hashlib releases the GIL for large `update` calls, so
+   several files hash concurrently on multiple cores.
+ - A stat-keyed sidecar cache: entries are keyed by absolute path and
+   validated against (size, mtime_ns, inode). Unchanged files are never
+   re-read; any change to those attributes forces a fresh hash.
+
+The sidecar is a small JSON document written atomically (temp file +
+os.replace) by `save()` or on context-manager exit.
+
+Example:
+    with FileHashService(Path("data/hash_cache.json")) as svc:
+        digests = svc.hash_files(paths)
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from src.common.hashing import file_sha256
+
+CACHE_FORMAT_VERSION = 1
+
+
+def _stat_key(st: os.stat_result) -> list[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+class FileHashService:
+    """Parallel SHA256 hashing with a persistent stat-based cache."""
+
+    def __init__(self, cache_path: str | Path | None = None, *, max_workers: int | None = None) -> None:
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries: dict[str, list[Any]] = self._load()
+
+    # -- cache persistence -------------------------------------------------
+    def _load(self) -> dict[str, list[Any]]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}  # corrupt/unreadable sidecar: start cold rather than fail
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            return {}
+        return dict(data.get("entries") or {})
+
+    def save(self) -> None:
+        """Persist the cache sidecar if anything changed since the last save."""
+        if self.cache_path is None or not self._dirty:
+            return
+        with self._lock:
+            payload = json.dumps(
+                {"version": CACHE_FORMAT_VERSION, "entries": self._entries}, separators=(",", ":")
+            )
+            self._dirty = False
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def __enter__(self) -> FileHashService:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.save()
+
+    # -- hashing -----------------------------------------------------------
+    def _lookup(self, key: str, stat_key: list[int]) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[:3] == stat_key:
+            return str(entry[3])
+        return None
+
+    def _store(self, original: str, key: str, stat_key: list[int], digest: str) -> None:
+        try:
+            if _stat_key(os.stat(original)) != stat_key:
+                return  # modified while hashing: do not cache a possibly torn digest
+        except OSError:
+            return
+        with self._lock:
+            self._entries[key] = [*stat_key, digest]
+            self._dirty = True
+
+    def hash_file(self, path: str | Path) -> str:
+        return self.hash_files([path])[str(path)]
+
+    def hash_files(self, paths: Iterable[str | Path]) -> dict[str, str]:
+        """Return {str(path): sha256 hex} for every input path (input order).
+
+        Cache hits are answered from stat metadata alone; misses are hashed
+        concurrently. Missing files raise FileNotFoundError.
+        """
+        ordered = [str(p) for p in paths]
+        results: dict[str, str] = {}
+        pending: list[tuple[str, str, list[int]]] = []  # (original, cache key, stat key)
+        for original in dict.fromkeys(ordered):
+            key = os.path.abspath(original)
+            stat_key = _stat_key(os.stat(original))
+            cached = self._lookup(key, stat_key)
+            if cached is not None:
+                results[original] = cached
+                self.hits += 1
+            else:
+                pending.append((original, key, stat_key))
+        self.misses += len(pending)
+
+        if len(pending) == 1:
+            original, key, stat_key = pending[0]
+            results[original] = file_sha256(original)
+            self._store(original, key, stat_key, results[original])
+        elif pending:
+            workers = min(self.max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                digests = pool.map(file_sha256, [p[0] for p in pending])
+                for (original, key, stat_key), digest in zip(pending, digests, strict=True):
+                    results[original] = digest
+                    self._store(original, key, stat_key, digest)
+        return {p: results[p] for p in ordered}
+
+
+__all__ = ["FileHashService"]
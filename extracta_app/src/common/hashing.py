@@ -8,8 +8,12 @@ Adheres to Constitution Principles:
 Functions:
     file_sha256(path: str) -> str
         Stream file bytes and return lowercase hex SHA256 digest.
+    file_fingerprint(path: str) -> str
+        Cheap "<size>:<sha256(head+tail)>" prefilter key for duplicate checks.
     normalization_hash(row: dict, mapping_version: str, logic_version: str) -> str
         Build canonical string per data-model specification and return SHA256.
+    normalization_hashes(rows, mapping_version, logic_version) -> list[str]
+        Batch variant for backfills; bit-identical to per-row normalization_hash.
 
 The canonical ordering MUST remain synchronized with `data-model.md`. Any change
 requires bumping NORMALIZATION_LOGIC_VERSION (handled elsewhere) and updating
@@ -17,10 +21,14 @@ tests that assert determinism.
 """
 from __future__ import annotations
 
-from collections.abc import Iterable
+import os
+from collections.abc import Iterable, Mapping, Sequence
 from hashlib import sha256
+from operator import itemgetter
+from typing import Any
 
-CHUNK_SIZE = 8192
+CHUNK_SIZE = 1 << 20  # 1 MiB: large updates let hashlib release the GIL
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
 
 # Canonical field order (excluding mapping_version & logic_version which are appended)
 CANONICAL_FIELDS: tuple[str, ...] = (
@@ -36,18 +44,45 @@ CANONICAL_FIELDS: tuple[str, ...] = (
 )
 
 
+# Batch formatting specs mirroring _coerce_value (amounts -> float .2f, year -> int)
+_BATCH_FIELD_SPECS: dict[str, str] = {"amount_in": "{:.2f}", "amount_out": "{:.2f}", "year": "{:d}"}
+_CANONICAL_GETTER = itemgetter(*CANONICAL_FIELDS)
+
+
 def file_sha256(path: str) -> str:
     """Return SHA256 hex digest of file at `path`.
 
-    Reads in chunks to avoid large memory usage for big files (1GB scale).
+    Reads in chunks to avoid large memory usage for big files (1GB scale); a
+    single reused buffer avoids allocating a new bytes object per chunk.
     """
     h = sha256()
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
     with open(path, "rb") as f:  # noqa: PTH123 (intentional direct open)
-        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
-            h.update(chunk)
+        while n := f.readinto(buf):
+            h.update(view[:n])
     return h.hexdigest()
 
 
+def file_fingerprint(path: str, block_size: int = FINGERPRINT_BLOCK_SIZE) -> str:
+    """Return a cheap content fingerprint: file size plus SHA256 of head and tail blocks.
+
+    Reads at most 2 * block_size bytes regardless of file size. Equal files
+    always share a fingerprint; differing fingerprints prove the files differ,
+    so only fingerprint collisions need a full `file_sha256` comparison.
+    """
+    h = sha256()
+    with open(path, "rb") as f:  # noqa: PTH123 (intentional direct open)
+        size = os.fstat(f.fileno()).st_size
+        if size <= 2 * block_size:
+            h.update(f.read())
+        else:
+            h.update(f.read(block_size))
+            f.seek(size - block_size)
+            h.update(f.read(block_size))
+    return f"{size}:{h.hexdigest()}"
+
+
 def _format_numeric(value: float) -> str:
     """Format numeric values to two decimal places for hash stability."""
     return f"{float(value):.2f}"
@@ -85,14 +120,66 @@ def normalization_hash(row: dict, mapping_version: str, logic_version: str) -> s
     logic_version : str
         Application constant representing transformation logic version.
     """
+    _validate_versions(mapping_version, logic_version)
+
+    segments = list(_build_canonical_segments(row))
+    base = "|".join(segments + [mapping_version, logic_version])
+    return sha256(base.encode("utf-8")).hexdigest()
+
+
+def _validate_versions(mapping_version: str, logic_version: str) -> None:
     if not mapping_version:
         raise ValueError("mapping_version must be non-empty")
     if not logic_version:
         raise ValueError("logic_version must be non-empty")
 
-    segments = list(_build_canonical_segments(row))
-    base = "|".join(segments + [mapping_version, logic_version])
-    return sha256(base.encode("utf-8")).hexdigest()
 
+def _compile_canonical_template(mapping_version: str, logic_version: str) -> str:
+    """Return a str.format template producing the full canonical string.
 
-__all__ = ["file_sha256", "normalization_hash", "CANONICAL_FIELDS"]
+    The constant version suffix is baked in once (braces escaped) so each row
+    costs a single format call.
+    """
+    specs = [_BATCH_FIELD_SPECS.get(field, "{}") for field in CANONICAL_FIELDS]
+    suffix = "|".join([mapping_version, logic_version]).replace("{", "{{").replace("}", "}}")
+    return "|".join(specs + [suffix])
+
+
+def normalization_hashes_from_values(
+    value_rows: Iterable[Sequence[Any]], mapping_version: str, logic_version: str
+) -> list[str]:
+    """Hash rows given as value sequences already in CANONICAL_FIELDS order."""
+    _validate_versions(mapping_version, logic_version)
+    fmt = _compile_canonical_template(mapping_version, logic_version).format
+    out: list[str] = []
+    append = out.append
+    # Unpacking mirrors CANONICAL_FIELDS; tests assert parity with normalization_hash.
+    for date, desc, amount_in, amount_out, counterparty, source_file, source_hash, year, month in value_rows:
+        canonical = fmt(
+            date, desc, float(amount_in), float(amount_out), counterparty, source_file, source_hash, int(year), month
+        )
+        append(sha256(canonical.encode("utf-8")).hexdigest())
+    return out
+
+
+def normalization_hashes(rows: Iterable[Mapping[str, Any]], mapping_version: str, logic_version: str) -> list[str]:
+    """Compute normalization hashes for many rows at once.
+
+    Equivalent to ``[normalization_hash(r, mapping_version, logic_version) for r in rows]``
+    but validates versions once, precompiles the canonical template and avoids
+    per-field generator/list overhead. Intended for large backfills.
+    """
+    try:
+        return normalization_hashes_from_values(map(_CANONICAL_GETTER, rows), mapping_version, logic_version)
+    except KeyError as exc:  # itemgetter reports the bare key; keep single-row message shape
+        raise KeyError(f"Missing required field '{exc.args[0]}' for normalization hash") from None
+
+
+__all__ = [
+    "file_sha256",
+    "file_fingerprint",
+    "normalization_hash",
+    "normalization_hashes",
+    "normalization_hashes_from_values",
+    "CANONICAL_FIELDS",
+]
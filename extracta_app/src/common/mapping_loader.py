@@ -6,15 +6,28 @@ Resolution order (highest precedence first):
 3. Synonym lists (case-insensitive membership)
 
 If no match: return None for that header.
+
+`MappingResolver` is the compiled form of a config: lowercase lookups built
+once, all override glob patterns folded into a single regex for the common
+"no override applies" case, and an LRU cache of results per
+(headers, source_file). Each MappingConfig lazily owns one resolver
+(`config.resolver`), so configs are treated as immutable once loaded.
 """
 from __future__ import annotations
 
+import os
+import re
 from dataclasses import dataclass
-from fnmatch import fnmatch
+from fnmatch import translate
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 import yaml
 
+RESOLVER_CACHE_SIZE = 1024
+# libyaml-backed loader when PyYAML was built with it; same semantics, much faster
+YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 @dataclass
 class MappingConfig:
@@ -23,9 +36,21 @@ class MappingConfig:
     rules: dict[str, str]  # original header -> canonical
     file_overrides: list[dict]
 
+    @cached_property
+    def resolver(self) -> MappingResolver:
+        return MappingResolver(self)
+
 
 def load_mapping_config(path: Path) -> MappingConfig:
-    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    return config_from_data(parse_mapping_yaml(path.read_text(encoding="utf-8")))
+
+
+def parse_mapping_yaml(text: str) -> dict:
+    return yaml.load(text, Loader=YAML_SAFE_LOADER) or {}
+
+
+def config_from_data(data: dict) -> MappingConfig:
+    """Validate parsed YAML data and build a MappingConfig."""
     version = data.get("version")
     if not version:
         raise ValueError("Mapping config missing required 'version'")
@@ -43,36 +68,72 @@ def _build_synonym_lookup(cfg: MappingConfig) -> dict[str, str]:
     return lookup
 
 
-def resolve_headers(headers: list[str], source_file: str, config: MappingConfig) -> dict[str, str | None]:
-    """Resolve a list of headers to canonical names using precedence rules."""
-    result: dict[str, str | None] = dict.fromkeys(headers)
-    lower_rules = {k.lower(): v for k, v in config.rules.items()}
-    synonym_lookup = _build_synonym_lookup(config)
-
-    # 1. File overrides
-    for entry in config.file_overrides:
-        pattern = entry.get("pattern")
-        if pattern and fnmatch(source_file, pattern):
-            for hdr, canonical in (entry.get("headers") or {}).items():
-                for original in headers:
-                    if original.lower() == hdr.lower():
-                        result[original] = canonical
-
-    # 2. Rules (if not already set)
-    for original in headers:
-        if result[original] is None:
+class MappingResolver:
+    """Compiled, cached header resolver for a single MappingConfig."""
+
+    def __init__(self, config: MappingConfig, *, cache_size: int = RESOLVER_CACHE_SIZE) -> None:
+        self.version = config.version
+        self._lower_rules = {k.lower(): v for k, v in config.rules.items()}
+        self._synonym_lookup = _build_synonym_lookup(config)
+        # (compiled glob, lowercase header -> canonical) in config order; later entries win
+        self._overrides: list[tuple[re.Pattern[str], dict[str, str]]] = []
+        for entry in config.file_overrides:
+            pattern = entry.get("pattern")
+            if not pattern:
+                continue
+            header_map = {hdr.lower(): canonical for hdr, canonical in (entry.get("headers") or {}).items()}
+            self._overrides.append((re.compile(translate(os.path.normcase(pattern))), header_map))
+        self._any_override = (
+            re.compile("|".join(f"(?:{p.pattern})" for p, _ in self._overrides)) if self._overrides else None
+        )
+        self._file_overrides = lru_cache(maxsize=cache_size)(self._overrides_for_file)
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def _overrides_for_file(self, source_file: str) -> dict[str, str]:
+        """Merged lowercase header overrides applying to `source_file`."""
+        if self._any_override is None:
+            return {}
+        name = os.path.normcase(source_file)
+        if not self._any_override.match(name):
+            return {}
+        merged: dict[str, str] = {}
+        for regex, header_map in self._overrides:
+            if regex.match(name):
+                merged.update(header_map)
+        return merged
+
+    def _resolve(self, headers: tuple[str, ...], source_file: str) -> tuple[tuple[str, str | None], ...]:
+        overrides = self._file_overrides(source_file)
+        result: dict[str, str | None] = dict.fromkeys(headers)
+        for original in result:
             key = original.lower()
-            if key in lower_rules:
-                result[original] = lower_rules[key]
+            # 1. File overrides, 2. Rules, 3. Synonyms (each only if still unresolved)
+            value = overrides.get(key)
+            if value is None:
+                value = self._lower_rules.get(key)
+            if value is None:
+                value = self._synonym_lookup.get(key) or None
+            result[original] = value
+        return tuple(result.items())
+
+    def resolve(self, headers: list[str], source_file: str) -> dict[str, str | None]:
+        """Resolve headers for a file; repeated (headers, file) pairs hit the LRU cache."""
+        return dict(self._resolve_cached(tuple(headers), source_file))
 
-    # 3. Synonyms
-    for original in headers:
-        if result[original] is None:
-            val = synonym_lookup.get(original.lower())
-            if val:
-                result[original] = val
+    def cache_info(self):
+        return self._resolve_cached.cache_info()
 
-    return result
+
+def resolve_headers(headers: list[str], source_file: str, config: MappingConfig) -> dict[str, str | None]:
+    """Resolve a list of headers to canonical names using precedence rules."""
+    return config.resolver.resolve(headers, source_file)
 
 
-__all__ = ["MappingConfig", "load_mapping_config", "resolve_headers"]
+__all__ = [
+    "MappingConfig",
+    "MappingResolver",
+    "config_from_data",
+    "load_mapping_config",
+    "parse_mapping_yaml",
+    "resolve_headers",
+]
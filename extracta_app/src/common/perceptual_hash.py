@@ -0,0 +1,95 @@
+"""Perceptual (difference) hashing for near-duplicate image detection.
+
+Re-photographed receipts differ byte-for-byte, so the SHA256 file hash cannot
+detect them. A dHash compares adjacent pixel brightness on a downscaled
+grayscale thumbnail, producing a 64-bit fingerprint that stays stable under
+re-encoding, small exposure changes and minor resizing.
+
+Functions:
+    dhash(image, hash_size=8) -> int
+        Difference hash of an already opened Pillow image.
+    image_dhash(path) -> int | None
+        Open `path` with Pillow and hash it; None when the image cannot be read.
+    hamming_distance(a, b) -> int
+        Number of differing bits between two hashes.
+    hash_to_hex / hex_to_hash
+        Fixed-width hex round-trip used for SQLite storage.
+    split_bands(value, bands=4) -> tuple[int, ...]
+        Split a 64-bit hash into equal bands for indexed candidate lookup.
+
+Pillow is imported lazily (same approach as the image extractor) so this
+module stays importable in environments without it.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+HASH_SIZE = 8  # 8x8 comparisons -> 64-bit hash
+HASH_BITS = HASH_SIZE * HASH_SIZE
+BAND_COUNT = 4
+
+
+def dhash(image: Any, hash_size: int = HASH_SIZE) -> int:
+    """Return the difference hash of a Pillow image as an unsigned int."""
+    thumb = image.convert("L").resize((hash_size + 1, hash_size))
+    pixels = thumb.tobytes()  # mode 'L': one byte per pixel, row-major
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def image_dhash(path: str | Path) -> int | None:
+    """Compute the dHash of the image at `path`.
+
+    Returns None when Pillow is unavailable or the bytes are not a decodable
+    image (minimal test fixtures), so callers can skip near-duplicate checks.
+    """
+    try:
+        from PIL import Image  # type: ignore
+    except Exception:  # pragma: no cover - Pillow absent
+        return None
+    try:
+        with Image.open(Path(path)) as img:
+            return dhash(img)
+    except Exception:
+        return None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def hash_to_hex(value: int) -> str:
+    return f"{value:0{HASH_BITS // 4}x}"
+
+
+def hex_to_hash(text: str) -> int:
+    return int(text, 16)
+
+
+def split_bands(value: int, bands: int = BAND_COUNT) -> tuple[int, ...]:
+    """Split a hash into `bands` equal-width integers (most significant first).
+
+    Pigeonhole principle: two hashes within Hamming distance < `bands` share at
+    least one identical band, which lets SQLite answer threshold queries with
+    plain equality lookups on indexed band columns.
+    """
+    width = HASH_BITS // bands
+    mask = (1 << width) - 1
+    return tuple((value >> (width * (bands - 1 - i))) & mask for i in range(bands))
+
+
+__all__ = [
+    "dhash",
+    "image_dhash",
+    "hamming_distance",
+    "hash_to_hex",
+    "hex_to_hash",
+    "split_bands",
+    "HASH_BITS",
+    "BAND_COUNT",
+]
@@ -0,0 +1,35 @@
+"""Compact transaction record passed from normalization to persistence.
+
+`TransactionRecord` is a NamedTuple: tuple-backed, no per-instance __dict__,
+fields in the `transactions` table column order. It is bound directly as an
+executemany parameter row, so persistence needs no per-column copies. Dicts
+are produced only at API edges via `as_dict()`.
+"""
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+
+class TransactionRecord(NamedTuple):
+    transaction_id: str
+    transaction_date: str
+    description: str
+    amount_in: float
+    amount_out: float
+    counterparty: str | None
+    category_id: int | None
+    source_file: str
+    source_file_hash: str
+    normalization_hash: str
+    year: int
+    month: str
+    mapping_version: str
+    logic_version: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return dict(zip(self._fields, self, strict=True))
+
+
+TX_FIELDS: tuple[str, ...] = TransactionRecord._fields
+
+__all__ = ["TransactionRecord", "TX_FIELDS"]
@@ -0,0 +1,88 @@
+"""Pre-upload duplicate detection with a two-tier fingerprint.
+
+Tier 1: `file_fingerprint` (size + head/tail block hash) looked up on the
+indexed `documents.fingerprint` column. A miss proves the file is new, so no
+full read happens at all.
+Tier 2: only on a fingerprint collision (or when legacy documents without a
+fingerprint exist) is the full `file_sha256` computed and compared.
+
+`check_duplicate` also returns the fingerprint and (when computed) the full
+hash, so the upload flow hands them to `ingest_file` instead of reading the
+file again.
+
+`scan_archive` rescans a directory of statements: files are hashed through
+`FileHashService` (thread pool + stat-keyed sidecar cache, so unchanged files
+are not re-read on the next rescan) and matched against stored documents in
+chunked lookups.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from src.common.hash_service import FileHashService
+from src.common.hashing import file_fingerprint, file_sha256
+from src.ingestion.router import SUPPORTED_IMAGE, SUPPORTED_PDF
+from src.persistence.documents_repository import (
+    find_documents_by_file_hashes,
+    find_fingerprint_candidates,
+    get_document_by_file_hash,
+)
+
+HASH_CACHE_NAME = ".extracta_hashes.json"  # default sidecar, inside the scanned directory
+
+
+@dataclass(frozen=True)
+class DuplicateCheck:
+    fingerprint: str
+    file_hash: str | None  # None when the fingerprint alone proved the file new
+    existing: dict[str, Any] | None  # document record with identical content
+
+
+def check_duplicate(db_path: str, path: str) -> DuplicateCheck:
+    """Look `path` up among stored documents, keeping the hashes computed on the way."""
+    fingerprint = file_fingerprint(path)
+    candidates, has_legacy = find_fingerprint_candidates(db_path, fingerprint)
+    if not candidates and not has_legacy:
+        return DuplicateCheck(fingerprint, None, None)
+    full_hash = file_sha256(path)
+    if candidates and full_hash not in candidates and not has_legacy:
+        return DuplicateCheck(fingerprint, full_hash, None)
+    return DuplicateCheck(fingerprint, full_hash, get_document_by_file_hash(db_path, full_hash))
+
+
+@dataclass(frozen=True)
+class ArchiveScan:
+    hashes: dict[str, str]  # path -> sha256, for every supported file (sorted by path)
+    new: list[str]  # paths whose content is not stored yet
+    existing: dict[str, dict[str, Any]]  # path -> document record with identical content
+
+
+def scan_archive(
+    db_path: str,
+    directory: str | Path,
+    *,
+    cache_path: str | Path | None = None,
+    max_workers: int | None = None,
+) -> ArchiveScan:
+    """Hash every supported file under `directory` and split them into new / already stored.
+
+    The hash cache sidecar defaults to HASH_CACHE_NAME inside `directory`.
+    """
+    root = Path(directory)
+    suffixes = SUPPORTED_PDF | SUPPORTED_IMAGE
+    paths = sorted(str(p) for p in root.rglob("*") if p.suffix.lower() in suffixes and p.is_file())
+    with FileHashService(cache_path or root / HASH_CACHE_NAME, max_workers=max_workers) as svc:
+        hashes = svc.hash_files(paths)
+    stored = find_documents_by_file_hashes(db_path, list(dict.fromkeys(hashes.values())))
+    existing = {p: stored[h] for p, h in hashes.items() if h in stored}
+    return ArchiveScan(hashes, [p for p in paths if p not in existing], existing)
+
+
+def find_duplicate_document(db_path: str, path: str) -> dict[str, Any] | None:
+    """Return the existing document record with identical content, else None."""
+    return check_duplicate(db_path, path).existing
+
+
+__all__ = ["ArchiveScan", "DuplicateCheck", "check_duplicate", "find_duplicate_document", "scan_archive"]
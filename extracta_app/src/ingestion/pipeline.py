@@ -2,32 +2,46 @@
 
 Produces a raw artifact dict:
 {
-  source_file, source_file_hash, extraction_method, extracted_at, record_count_raw, rows: [...]
+  source_file, source_file_hash, source_file_fingerprint, extraction_method,
+  extracted_at, record_count_raw, near_duplicate_of, perceptual_hash, rows: [...]
 }
+
+Near-duplicate images: when a `db_path` is supplied, image inputs get a
+perceptual hash before OCR runs. If an already ingested image lies within the
+configured Hamming distance the artifact is flagged (`near_duplicate_of`) and,
+unless `skip_near_duplicates=False`, OCR is skipped entirely (rows == []).
+`file_hash` / `fingerprint` may be passed in when the caller already computed
+them (see `dedup.check_duplicate`); only missing ones are computed here.
+
+The perceptual hash is returned as `perceptual_hash`, not stored: the caller records it
+(`record_image_hash`) once the document itself has been persisted, so a
+failed upload never blocks a later re-photo of the same statement.
 """
 from __future__ import annotations
 
-import hashlib
 import time
 from pathlib import Path
 from typing import Any
 
 # Import extractor modules (not symbols) so tests can monkeypatch their
 # public functions via sys.modules lookups before calling ingest_file.
+from src.common.hashing import file_fingerprint, file_sha256
+from src.common.perceptual_hash import image_dhash
 from src.extraction import image_extractor, pdf_extractor  # type: ignore
 from src.ingestion.router import detect_file_type
 from src.logging.json_logger import emit_log_event
+from src.persistence.image_hashes_repository import DEFAULT_MAX_DISTANCE, find_near_duplicates
 
 
-def _file_sha256(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:  # pragma: no cover (small; integration tested)
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def ingest_file(path_str: str) -> dict[str, Any]:
+def ingest_file(
+    path_str: str,
+    *,
+    db_path: str | None = None,
+    file_hash: str | None = None,
+    fingerprint: str | None = None,
+    near_duplicate_distance: int = DEFAULT_MAX_DISTANCE,
+    skip_near_duplicates: bool = True,
+) -> dict[str, Any]:
     path = Path(path_str)
     start_time = time.time()
 
@@ -35,6 +49,43 @@ def ingest_file(path_str: str) -> dict[str, Any]:
         if not path.exists():  # early safety
             raise FileNotFoundError(path)
         file_type = detect_file_type(path.name)
+        if file_hash is None:
+            file_hash = file_sha256(str(path))
+        if fingerprint is None:
+            fingerprint = file_fingerprint(str(path))
+        near_duplicate: dict[str, Any] | None = None
+        phash: int | None = None
+        if file_type == "image" and db_path is not None:
+            phash = image_dhash(path)
+            if phash is not None:
+                matches = find_near_duplicates(
+                    db_path, phash, max_distance=near_duplicate_distance, exclude_file_hash=file_hash
+                )
+                near_duplicate = matches[0] if matches else None
+
+        if near_duplicate is not None and skip_near_duplicates:
+            emit_log_event({
+                "stage": "ingestion",
+                "status": "duplicate",
+                "in_count": 1,
+                "out_count": 0,
+                "error_count": 0,
+                "duration_ms": int((time.time() - start_time) * 1000),
+                "source_file": path.name,
+                "message": f"near-duplicate of {near_duplicate['filename']} (distance {near_duplicate['distance']})"
+            })
+            return {
+                "source_file": path.name,
+                "source_file_hash": file_hash,
+                "source_file_fingerprint": fingerprint,
+                "extraction_method": "image",
+                "extracted_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "record_count_raw": 0,
+                "near_duplicate_of": near_duplicate,
+                "perceptual_hash": phash,
+                "rows": [],
+            }
+
         if file_type == "pdf":
             rows = pdf_extractor.extract_raw_rows(str(path))  # type: ignore[attr-defined]
             method = "pdf"
@@ -43,10 +94,13 @@ def ingest_file(path_str: str) -> dict[str, Any]:
             method = "image"
         artifact = {
             "source_file": path.name,
-            "source_file_hash": _file_sha256(path),
+            "source_file_hash": file_hash,
+            "source_file_fingerprint": fingerprint,
             "extraction_method": method,
             "extracted_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "record_count_raw": len(rows),
+            "near_duplicate_of": near_duplicate,
+            "perceptual_hash": phash,
             "rows": rows,
         }
 
@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import json
 import time
+from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -18,6 +19,12 @@ def emit_log_event(event_data: dict[str, Any]) -> None:
     logger.emit(event_data)
 
 
+def emit_log_events(events: Iterable[dict[str, Any]]) -> int:
+    """Emit many events with the default logger in one file append; returns count."""
+    logger = JsonLogger(Path("logs/pipeline.log"))
+    return logger.emit_many(events)
+
+
 @dataclass
 class JsonLogger:
     path: Path
@@ -27,20 +34,38 @@ class JsonLogger:
     def __post_init__(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
-    def emit(self, event: dict[str, Any]) -> None:
+    def _format(self, event: dict[str, Any], ts: str) -> str:
         evt = dict(event)  # shallow copy
         # Auto timestamp if missing
-        evt.setdefault("ts", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        evt.setdefault("ts", ts)
         # Truncate stack excerpt if present
         if isinstance(evt.get("stack_excerpt"), str) and self.stack_lines > 0:
             lines = evt["stack_excerpt"].splitlines()
             if len(lines) > self.stack_lines:
                 evt["stack_excerpt"] = "\n".join(lines[: self.stack_lines])
-        line = json.dumps(evt, separators=(",", ":"), ensure_ascii=False)
+        return json.dumps(evt, separators=(",", ":"), ensure_ascii=False)
+
+    def emit(self, event: dict[str, Any]) -> None:
+        line = self._format(event, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
         self._rotate_if_needed(len(line) + 1)  # + newline
         with self.path.open("a", encoding="utf-8") as f:
             f.write(line + "\n")
 
+    def emit_many(self, events: Iterable[dict[str, Any]]) -> int:
+        """Append a batch of events with one open/rotation check; returns count.
+
+        Events without a timestamp share the batch's timestamp.
+        """
+        ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        lines = [self._format(e, ts) for e in events]
+        if not lines:
+            return 0
+        payload = "\n".join(lines) + "\n"
+        self._rotate_if_needed(len(payload))
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(payload)
+        return len(lines)
+
     # Simple size-based single-level rotation
     def _rotate_if_needed(self, incoming_len: int) -> None:
         try:
@@ -54,4 +79,4 @@ class JsonLogger:
             # Fail silently; logging should not break pipeline
             pass
 
-__all__ = ["JsonLogger"]
+__all__ = ["JsonLogger", "emit_log_event", "emit_log_events"]
@@ -0,0 +1,222 @@
+"""Locale-aware amount parsing with per-file format inference.
+
+`infer_amount_format` looks at a sample of a file's amount strings once and
+decides the decimal separator, the thousands separator and the currency
+symbol. `AmountParser` then parses every value with a precompiled fast path
+(a fixed `str.replace` chain for that format, then `float`). Only values the
+fast path rejects (grouping spaces, accounting parentheses, trailing minus,
+other currency symbols, garbage) reach the slow path, which normalizes with
+`str.translate` and gates on a regex instead of raising.
+
+Inference votes per sampled value:
+    1.234,56 / 1,234.56   both separators: the last one is the decimal
+    12,5 / 1234,567       comma not in 3-digit groups: decimal comma
+    1.234.567             repeated dot groups: thousands dot
+    1,234 / 1.234         ambiguous, no vote
+Ties (including all-ambiguous files) keep the legacy US reading
+("," = thousands, "." = decimal), matching the previous `_parse_float`.
+
+The majority only picks the file's format. A value that itself votes for the
+other decimal separator (12,50 or 1.234,56 in a US file) is a conflict. It is
+not parsed under the file's format: `parse` raises AmountFormatConflictError
+and `try_parse` returns None, like date format conflicts.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+AMOUNT_SAMPLE_SIZE = 500
+CURRENCY_SYMBOLS = "€$£¥₹₽"
+CURRENCY_CODES = ("EUR", "USD", "GBP", "CHF", "PLN", "SEK", "NOK", "DKK", "CZK")
+_SPACES = " \u00a0\u202f'\u2019"  # grouping characters accepted regardless of locale
+
+_DROP_SPACES = {ord(ch): None for ch in _SPACES}
+_CURRENCY_RE = re.compile(f"[{CURRENCY_SYMBOLS}]|\\b(?:{'|'.join(CURRENCY_CODES)})\\b")
+_NUMBER_RE = re.compile(r"([-+]?)(\d+(?:\.\d*)?|\.\d+)(-?)")
+_COMMA_GROUPS = re.compile(r"\d{1,3}(?:,\d{3})+")
+_DOT_GROUPS = re.compile(r"\d{1,3}(?:\.\d{3})+")
+_COMMA_DECIMAL = re.compile(r"\d*,\d+")
+_DOT_DECIMAL = re.compile(r"\d*\.\d+")
+
+
+@dataclass(frozen=True)
+class AmountFormat:
+    decimal: str = "."
+    thousands: str = ","
+    currency: str = ""  # symbol or ISO code seen in the file ("" if none)
+
+
+US_FORMAT = AmountFormat()
+
+
+def _vote(core: str) -> str | None:
+    """Return the decimal separator a single value implies, or None if ambiguous."""
+    comma, dot = core.rfind(","), core.rfind(".")
+    if comma >= 0 and dot >= 0:
+        return "," if comma > dot else "."
+    if comma >= 0:
+        if _COMMA_GROUPS.fullmatch(core):
+            return "." if core.count(",") > 1 else None
+        return "," if _COMMA_DECIMAL.fullmatch(core) else None
+    if dot >= 0:
+        if _DOT_GROUPS.fullmatch(core):
+            return "," if core.count(".") > 1 else None
+        return "." if _DOT_DECIMAL.fullmatch(core) else None
+    return None
+
+
+def _core(text: str) -> str:
+    """The digits and separators of an amount: currency, sign, parentheses and spaces removed."""
+    return _CURRENCY_RE.sub("", text).strip().strip("()+-\u2212").strip().translate(_DROP_SPACES)
+
+
+def infer_amount_format(values: Iterable[Any], sample_size: int = AMOUNT_SAMPLE_SIZE) -> AmountFormat:
+    """Infer decimal/thousands separators and currency from the first `sample_size` values."""
+    decimals: Counter[str] = Counter()
+    currencies: Counter[str] = Counter()
+    for value in islice(values, sample_size):
+        text = str(value).strip()
+        currencies.update(_CURRENCY_RE.findall(text))
+        vote = _vote(_core(text))
+        if vote is not None:
+            decimals[vote] += 1
+    decimal = "," if decimals[","] > decimals["."] else "."
+    thousands = "." if decimal == "," else ","
+    currency = currencies.most_common(1)[0][0] if currencies else ""
+    return AmountFormat(decimal=decimal, thousands=thousands, currency=currency)
+
+
+class AmountFormatConflictError(ValueError):
+    """An amount written with the other decimal convention than the file's."""
+
+
+class AmountParser:
+    """Parse amount strings of one `AmountFormat` to floats."""
+
+    def __init__(self, amount_format: AmountFormat = US_FORMAT) -> None:
+        self.format = amount_format
+        table: dict[int, str | None] = dict(_DROP_SPACES)
+        table[ord(amount_format.thousands)] = None
+        table[ord(amount_format.decimal)] = "."
+        table[ord("\u2212")] = "-"  # unicode minus sign
+        if len(amount_format.currency) == 1:
+            table[ord(amount_format.currency)] = None
+        self._table = table
+        self._thousands = amount_format.thousands
+        # Digits grouped by the file's own convention, e.g. 1,234 / 1,234.56 for US: never a conflict
+        t, d = re.escape(amount_format.thousands), re.escape(amount_format.decimal)
+        self._grouped = re.compile(rf"(?<![\d.,])\d{{1,3}}(?:{t}\d{{3}})+(?:{d}\d*)?(?![\d.,])")
+        self._code = amount_format.currency if len(amount_format.currency) > 1 else ""
+        replacements = [(amount_format.thousands, "")]
+        if amount_format.currency:
+            replacements.insert(0, (amount_format.currency, ""))
+        if amount_format.decimal != ".":
+            replacements.append((amount_format.decimal, "."))
+        self._replacements = tuple(replacements)
+
+    def try_parse(self, value: Any) -> float | None:
+        """Return the parsed float, or None when the value is not a number in this format."""
+        if type(value) is str:
+            if self._thousands in value and self._grouped.search(value) is None and self._conflicts(value):
+                return None
+            text = value
+            for old, new in self._replacements:
+                text = text.replace(old, new)
+            try:
+                return float(text)
+            except ValueError:
+                return self._slow_parse(value)
+        if isinstance(value, float | int) and not isinstance(value, bool):
+            return float(value)
+        return self._slow_parse(str(value))
+
+    def _conflicts(self, text: str) -> bool:
+        """True when `text` itself implies the other decimal separator.
+
+        Only values containing the thousands separator can: with the decimal
+        separator alone they either agree or fail to parse anyway.
+        """
+        vote = _vote(_core(text.strip()))
+        return vote is not None and vote != self.format.decimal
+
+    def _slow_parse(self, text: str) -> float | None:
+        text = text.strip()
+        negate = text[:1] == "(" and text[-1:] == ")"  # accounting negative: (12.50)
+        if negate:
+            text = text[1:-1]
+        if self._code:
+            text = text.replace(self._code, "")
+        cleaned = text.translate(self._table)
+        m = _NUMBER_RE.fullmatch(cleaned)
+        if m is None:
+            # Another currency symbol
+            cleaned = _CURRENCY_RE.sub("", cleaned)
+            m = _NUMBER_RE.fullmatch(cleaned)
+        if m is None:
+            return None
+        sign, digits, trailing = m.groups()
+        number = float(digits)
+        if (sign == "-") != bool(trailing):
+            number = -number
+        return -number if negate else number
+
+    def parse(self, value: Any) -> float:
+        number = self.try_parse(value)
+        if number is None:
+            if isinstance(value, str) and self._conflicts(value):
+                raise AmountFormatConflictError(
+                    f"Amount {value!r} conflicts with the file's amount format "
+                    f"(decimal {self.format.decimal!r}, thousands {self.format.thousands!r})"
+                )
+            raise ValueError(f"Invalid numeric value: {value}")
+        return number
+
+    def parse_many(self, values: Iterable[Any]) -> list[float | None]:
+        """Batch parse; invalid values become None instead of raising."""
+        try_parse = self.try_parse
+        return [try_parse(v) for v in values]
+
+    def parse_array(self, values: Sequence[Any]) -> Any:
+        """Vectorized parse to a float64 NumPy array (requires numpy).
+
+        Raises ValueError on the first invalid or conflicting value, like `parse`.
+        """
+        import numpy as np
+
+        text = np.char.strip(np.asarray(values, dtype=str))
+        for i in np.flatnonzero(np.char.find(text, self._thousands) >= 0).tolist():
+            if self._grouped.search(str(text[i])) is None and self._conflicts(str(text[i])):
+                self.parse(values[i])  # raises AmountFormatConflictError
+        if self._code:
+            text = np.char.replace(text, self._code, "")
+        for ch, repl in self._table.items():
+            text = np.char.replace(text, chr(ch), repl or "")
+        try:
+            return text.astype(np.float64)
+        except ValueError:
+            # Parentheses, trailing minus, stray symbols: per-element path
+            return np.array([self.parse(v) for v in values], dtype=np.float64)
+
+
+DEFAULT_AMOUNT_PARSER = AmountParser()
+
+
+def amount_parser_for(values: Iterable[Any], amount_format: AmountFormat | None = None) -> AmountParser:
+    """Parser for an explicit format, or one inferred from `values`."""
+    return AmountParser(amount_format or infer_amount_format(values))
+
+
+__all__ = [
+    "AmountFormat",
+    "AmountFormatConflictError",
+    "AmountParser",
+    "US_FORMAT",
+    "DEFAULT_AMOUNT_PARSER",
+    "infer_amount_format",
+    "amount_parser_for",
+]
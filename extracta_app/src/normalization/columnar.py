@@ -0,0 +1,276 @@
+"""Columnar normalization engine (optional, requires NumPy).
+
+Same contract as `engine.normalize_rows`, but operates on column arrays
+instead of per-row dicts:
+ - Dates: parsed per cell with the row engine's per-file DateParser, whose
+   memo makes the repeated dates of a statement a dict lookup; cells are not
+   coerced to str, so None / datetime values fail exactly as in the row
+   engine.
+ - Amounts: the file's inferred AmountParser runs its separator/currency
+   translation and float conversion as array operations (`parse_array`);
+   amount_in / amount_out are derived with `np.where`.
+ - year / month: sliced from the normalized ISO date array.
+ - Hashes: one `normalization_hashes_from_values` batch call.
+
+Results (values, hash ordering, validation / quarantine log counts and, in
+tolerant mode, quarantined rows and reasons) are identical to the row engine;
+transaction ids match too with `deterministic_ids=True` (random UUID4s
+otherwise). Quarantined entries carry the full raw row when `raw_rows` is
+passed, else the row rebuilt from the three columns. Use `columns_from_rows` /
+`columns_to_rows` to convert at the boundaries.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from src.common.hashing import normalization_hashes_from_values
+from src.logging.json_logger import emit_log_event
+from src.normalization.amounts import AMOUNT_SAMPLE_SIZE, AmountFormat, AmountParser, amount_parser_for
+from src.normalization.mapping import deterministic_transaction_ids
+from src.normalization.validation import DATE_SAMPLE_SIZE, DateParser, date_parser_for
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+
+ZERO_AMOUNT_LITERALS = ("0", "0.0", "0.00")
+MISSING: Any = object()  # a cell whose row lacks the column (see `columns_from_rows`)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("NumPy is required for the columnar normalization engine (pip install numpy)")
+
+
+def columns_from_rows(raw_rows: Sequence[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Split raw extracted rows into Date / Description / Amount columns.
+
+    Absent keys become MISSING, so `normalize_columns` reports (or
+    quarantines) those rows with their original row index.
+    """
+    columns: dict[str, list[Any]] = {"Date": [], "Description": [], "Amount": []}
+    for r in raw_rows:
+        columns["Date"].append(r.get("Date", MISSING))
+        columns["Description"].append(r.get("Description", MISSING))
+        columns["Amount"].append(r.get("Amount", MISSING))
+    return columns
+
+
+def _row(
+    dates: Sequence[Any],
+    descriptions: Sequence[Any],
+    amounts: Sequence[Any],
+    raw_rows: Sequence[dict[str, Any]] | None,
+    i: int,
+) -> dict[str, Any]:
+    if raw_rows is not None:
+        return raw_rows[i]
+    row = {"Date": dates[i], "Description": descriptions[i], "Amount": amounts[i]}
+    return {k: v for k, v in row.items() if v is not MISSING}
+
+
+def _reject(errors: dict[int, str] | None, i: int, error: Exception) -> None:
+    """Record row `i` as invalid in tolerant mode, else raise `error`."""
+    if errors is None:
+        raise error
+    errors[i] = str(error)
+
+
+def _parse_dates(dates: Sequence[Any], parser: DateParser, errors: dict[int, str] | None) -> np.ndarray:
+    """ISO date per row ("" for rejected rows), parsed exactly like the row engine.
+
+    Values are not coerced to str first: None or datetime cells fail the
+    same way as in `iter_validated`. The parser memoizes repeated dates.
+    """
+    parse = parser.parse
+    iso = [""] * len(dates)
+    for i, value in enumerate(dates):
+        if errors and i in errors:
+            continue
+        try:
+            iso[i] = parse(value)
+        except (ValueError, TypeError) as e:
+            _reject(errors, i, e)
+    return np.array(iso, dtype="U10")
+
+
+def _parse_amounts(values: list[Any], rows: np.ndarray, parser: AmountParser, errors: dict[int, str] | None) -> np.ndarray:
+    """Vectorized amount parse; in tolerant mode invalid values are rejected per row (0.0 placeholder)."""
+    try:
+        return parser.parse_array(values)
+    except ValueError:
+        if errors is None:
+            raise
+    amount = np.zeros(len(values))
+    for j, (i, value) in enumerate(zip(rows.tolist(), values, strict=True)):
+        try:
+            amount[j] = parser.parse(value)
+        except ValueError as e:
+            _reject(errors, i, e)
+    return amount
+
+
+def normalize_columns(
+    dates: Sequence[Any],
+    descriptions: Sequence[Any],
+    amounts: Sequence[Any],
+    *,
+    mapping_version: str,
+    logic_version: str,
+    source_file: str,
+    source_file_hash: str,
+    date_format: str | None = None,
+    amount_format: AmountFormat | None = None,
+    deterministic_ids: bool = False,
+    quarantined: list[dict[str, Any]] | None = None,
+    raw_rows: Sequence[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """Normalize column arrays; returns canonical columns sorted by normalization_hash.
+
+    Numeric/date columns are NumPy arrays; text columns are lists.
+    With `quarantined`, invalid rows (a MISSING cell, bad or conflicting date,
+    bad amount) are collected there as {"row_index", "row", "reason"} instead
+    of raising, exactly as `normalize_rows` would. `raw_rows` (the rows the
+    columns were split from) puts the full raw row into those entries and
+    into missing-column reasons.
+    """
+    _require_numpy()
+    start_time = time.time()
+    n = len(dates)
+    try:
+        if n == 0:
+            raise ValueError("No rows extracted (empty input)")
+        if len(descriptions) != n or len(amounts) != n or (raw_rows is not None and len(raw_rows) != n):
+            raise ValueError("Column lengths differ")
+
+        errors: dict[int, str] | None = {} if quarantined is not None else None
+        for i, cells in enumerate(zip(dates, descriptions, amounts, strict=True)):
+            if MISSING in cells:
+                row = _row(dates, descriptions, amounts, raw_rows, i)
+                _reject(errors, i, ValueError(f"Missing required columns in row: {row}"))
+        parser = date_parser_for([d for d in dates[:DATE_SAMPLE_SIZE] if d is not MISSING], date_format)
+        iso = _parse_dates(dates, parser, errors)
+        amount_parser = amount_parser_for([a for a in amounts[:AMOUNT_SAMPLE_SIZE] if a is not MISSING], amount_format)
+
+        valid = np.ones(n, dtype=bool)
+        if errors:
+            valid[list(errors)] = False
+        rows = np.flatnonzero(valid)
+        amount_values = [amounts[i] for i in rows.tolist()]
+        zero_count = sum(str(a).strip() in ZERO_AMOUNT_LITERALS for a in amount_values)
+
+        # Log order and counts as in the row engine: quarantine, then validation
+        # (tolerant mode counts only rows whose amount parsed; strict mode fails after it)
+        amount_error: ValueError | None = None
+        try:
+            amount = _parse_amounts(amount_values, rows, amount_parser, errors)
+        except ValueError as e:
+            amount_error = e
+        if errors and len(errors) > n - len(rows):  # amounts rejected too
+            parsed = np.array([i not in errors for i in rows.tolist()], dtype=bool)
+            rows, amount = rows[parsed], amount[parsed]
+        if quarantined is not None and errors:
+            quarantined.extend(
+                {"row_index": i, "row": _row(dates, descriptions, amounts, raw_rows, i), "reason": errors[i]}
+                for i in sorted(errors)
+            )
+            emit_log_event({"event": "rows_quarantined", "source_file": source_file, "quarantined_count": len(errors)})
+        emit_log_event({
+            "stage": "validation",
+            "status": "success",
+            "in_count": n,
+            "out_count": len(rows),
+            "error_count": zero_count,
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "source_file": source_file
+        })
+        if amount_error is not None:
+            raise amount_error
+        n = len(rows)
+        transaction_date = iso[rows]
+        amount_in = np.where(amount > 0, amount, 0.0)
+        amount_out = np.where(amount < 0, -amount, 0.0)
+        year = transaction_date.astype("U4").astype(np.int64)
+        month = transaction_date.astype("U7")
+        description = [descriptions[i] for i in rows.tolist()]
+
+        date_list = transaction_date.tolist()
+        month_list = month.tolist()
+        hashes = normalization_hashes_from_values(
+            zip(
+                date_list,
+                description,
+                amount_in.tolist(),
+                amount_out.tolist(),
+                description,  # counterparty: MVP pass-through, as in map_row
+                [source_file] * n,
+                [source_file_hash] * n,
+                year.tolist(),
+                month_list,
+                strict=True,
+            ),
+            mapping_version,
+            logic_version,
+        )
+        hash_array = np.asarray(hashes)
+        order = np.argsort(hash_array, kind="stable")
+        description_sorted = [description[i] for i in order.tolist()]
+        hash_sorted = hash_array[order]
+        if deterministic_ids:
+            ids = list(deterministic_transaction_ids(hash_sorted.tolist()))
+        else:
+            ids = [str(uuid.uuid4()) for _ in range(n)]
+
+        columns: dict[str, Any] = {
+            "transaction_id": ids,
+            "transaction_date": transaction_date[order],
+            "description": description_sorted,
+            "amount_in": amount_in[order],
+            "amount_out": amount_out[order],
+            "counterparty": list(description_sorted),
+            "category_id": [None] * n,
+            "source_file": [source_file] * n,
+            "source_file_hash": [source_file_hash] * n,
+            "year": year[order],
+            "month": month[order],
+            "mapping_version": [mapping_version] * n,
+            "logic_version": [logic_version] * n,
+            "normalization_hash": hash_sorted,
+        }
+        emit_log_event({
+            "stage": "normalization",
+            "status": "success",
+            "in_count": n,
+            "out_count": n,
+            "error_count": 0,
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "source_file": source_file
+        })
+        return columns
+    except Exception as e:
+        emit_log_event({
+            "stage": "normalization",
+            "status": "error",
+            "in_count": n,
+            "out_count": 0,
+            "error_count": 1,
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "source_file": source_file,
+            "exception_type": type(e).__name__,
+            "message": str(e)
+        })
+        raise
+
+
+def columns_to_rows(columns: dict[str, Any]) -> list[dict[str, Any]]:
+    """Convert `normalize_columns` output to row dicts with plain Python values."""
+    names = list(columns)
+    values = [c.tolist() if hasattr(c, "tolist") else c for c in columns.values()]
+    return [dict(zip(names, row, strict=True)) for row in zip(*values, strict=True)]
+
+
+__all__ = ["normalize_columns", "columns_from_rows", "columns_to_rows", "MISSING"]
@@ -3,50 +3,118 @@
 Scans transactions lacking a meaningful counterparty value and applies the
 deterministic heuristic to populate the `counterparty` column. Idempotent:
 already populated rows are skipped. Returns stats for observability.
+
+Incremental: candidate rows are read through the partial index over pending
+rows (schema v7), never the whole table, and `source_file_hash` narrows the
+run to one document (the upload flow passes the file it just inserted), so
+cost scales with the pending rows / the upload. Rows the heuristic cannot
+name stay pending and are re-examined by unscoped runs only.
+
+Set-based, on one connection and one transaction:
+ 1. only candidate rows (counterparty NULL / '' / 'Unknown') are read;
+ 2. curated merchant aliases (schema v8) are matched first, all at once per
+    description (`alias_matcher_for`); descriptions without an alias fall
+    back to the heuristic, whose LRU memo serves repeated descriptions (its
+    hit rate for the run is logged as a `counterparty_heuristic_cache` event);
+ 3. new counterparties are created with one executemany INSERT OR IGNORE
+    (first-seen order, so ids match the former row-by-row get_or_create);
+ 4. the run's distinct names resolve to ids through the name_normalized
+    unique index, in chunked IN (...) lookups (never the whole table);
+ 5. updates apply with one executemany keyed by rowid, and the assigned
+    rows are counted into counterparty_stats per chunk of rowids.
+Heuristic failures are logged in one batched append.
 """
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict
+from typing import Any
+
+from src.logging.json_logger import emit_log_event, emit_log_events
+from src.persistence.connection import connection
+from src.persistence.counterparties_repository import add_counterparty_stats
+from src.persistence.migrations import PENDING_COUNTERPARTY_FILTER
+
+from .counterparty_heuristic import extract_counterparty_name, name_cache_stats
+from .merchant_aliases import alias_matcher_for
+
+ID_LOOKUP_CHUNK = 500  # names per IN (...) lookup, well under SQLite's bound-parameter limit
+
 
-from .counterparty_heuristic import extract_counterparty_name
-from src.logging.json_logger import emit_log_event
-from src.persistence.counterparties_repository import get_or_create
+def _counterparty_ids(con: sqlite3.Connection, names_normalized: list[str]) -> dict[str, int]:
+    ids: dict[str, int] = {}
+    for i in range(0, len(names_normalized), ID_LOOKUP_CHUNK):
+        chunk = names_normalized[i:i + ID_LOOKUP_CHUNK]
+        ids.update(con.execute(
+            "SELECT name_normalized, counterparty_id FROM counterparties "
+            f"WHERE name_normalized IN ({','.join('?' * len(chunk))})",
+            chunk,
+        ))
+    return ids
 
 
-def derive_counterparties(db_path: str) -> Dict[str, Any]:
-    con = sqlite3.connect(db_path)
-    try:
-        cur = con.execute(
-            "SELECT transaction_id, description, counterparty, counterparty_id FROM transactions"
+def _log_cache_usage(before: dict[str, Any]) -> None:
+    after = name_cache_stats()
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    if hits < 0 or misses < 0:  # memo was resized / cleared mid-run
+        hits, misses = after["hits"], after["misses"]
+    emit_log_event({
+        "event": "counterparty_heuristic_cache",
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "currsize": after["currsize"],
+        "maxsize": after["maxsize"],
+    })
+
+
+def derive_counterparties(db_path: str, *, source_file_hash: str | None = None) -> dict[str, Any]:
+    """Derive counterparties for pending rows (of one document if `source_file_hash`).
+
+    Stats: scanned = pending rows examined, assigned, skipped = scanned - assigned.
+    """
+    sql = f"SELECT rowid, transaction_id, description FROM transactions WHERE ({PENDING_COUNTERPARTY_FILTER})"
+    params: tuple[Any, ...] = ()
+    if source_file_hash is not None:
+        sql += " AND source_file_hash=?"
+        params = (source_file_hash,)
+    cache_before = name_cache_stats()
+    match_alias = alias_matcher_for(db_path).match
+    with connection(db_path) as con:
+        cur = con.execute(sql, params)
+        scanned = 0
+        pending: list[tuple[str, int]] = []  # (name, rowid)
+        failed: list[str] = []  # transaction ids the heuristic could not name
+        for rowid, tx_id, desc in cur:
+            scanned += 1
+            desc = desc or ""
+            name = match_alias(desc) or extract_counterparty_name(desc)
+            if name == "Unknown":
+                failed.append(tx_id)
+            else:
+                pending.append((name, rowid))
+
+        # dict.fromkeys keeps first-seen order -> deterministic counterparty ids
+        distinct = dict.fromkeys(name for name, _ in pending)
+        con.executemany(
+            "INSERT OR IGNORE INTO counterparties(name, name_normalized) VALUES (?, ?)",
+            ((name, name.lower()) for name in distinct),
+        )
+        ids = _counterparty_ids(con, list(dict.fromkeys(name.lower() for name in distinct)))
+        con.executemany(
+            "UPDATE transactions SET counterparty=?, counterparty_id=? WHERE rowid=?",
+            ((name, ids[name.lower()], rowid) for name, rowid in pending),
         )
-        rows = cur.fetchall()
-        to_update: list[tuple[str, int | None, str]] = []  # (counterparty, counterparty_id, transaction_id)
-        skipped = 0
-        for tx_id, desc, existing, _existing_id in rows:
-            if existing not in (None, "", "Unknown"):
-                skipped += 1
-                continue
-            name = extract_counterparty_name(desc or "")
-            if name == "Unknown" and existing in (None, "", "Unknown"):
-                skipped += 1
-                emit_log_event({
-                    "event": "counterparty_autoderive_fail",
-                    "transaction_id": tx_id,
-                    "reason": "heuristic_unknown"
-                })
-                continue
-            if name != existing:
-                cp_id = get_or_create(db_path, display_name=name, normalized=name.lower())
-                to_update.append((name, cp_id, tx_id))
-        for cp, cp_id, tid in to_update:
-            con.execute(
-                "UPDATE transactions SET counterparty=?, counterparty_id=? WHERE transaction_id=?",
-                (cp, cp_id, tid),
-            )
+        rowids = [rowid for _, rowid in pending]
+        for i in range(0, len(rowids), ID_LOOKUP_CHUNK):
+            chunk = rowids[i:i + ID_LOOKUP_CHUNK]
+            add_counterparty_stats(con, f"rowid IN ({','.join('?' * len(chunk))})", chunk)
         con.commit()
-        return {"scanned": len(rows), "assigned": len(to_update), "skipped": skipped}
-    finally:
-        con.close()
+        emit_log_events(
+            {"event": "counterparty_autoderive_fail", "transaction_id": tx_id, "reason": "heuristic_unknown"}
+            for tx_id in failed
+        )
+        _log_cache_usage(cache_before)
+        return {"scanned": scanned, "assigned": len(pending), "skipped": scanned - len(pending)}
 
 __all__ = ["derive_counterparties"]
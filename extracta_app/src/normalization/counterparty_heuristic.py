@@ -2,19 +2,31 @@
 
 Functions:
   extract_counterparty_name(description: str) -> str
+  extract_counterparty_names(descriptions: Iterable[str]) -> list[str]
   get_or_create_counterparty_id(repo_get_or_create, description: str) -> int
+  name_cache_stats() -> dict  (hits, misses, hit_rate, currsize, maxsize)
 
 Design: Pure string transformations; no external calls; stable ordering.
+All patterns are compiled at import. Results are memoized in a bounded LRU
+keyed on the raw description (statements repeat the same merchant line
+constantly); size it with `configure_name_cache` using the hit rate that
+derivation logs (`counterparty_heuristic_cache` event).
 """
 from __future__ import annotations
 
 import re
-from typing import Callable
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any
 
 _STOPWORDS = {"payment", "transfer", "to", "from", "card", "visa", "mastercard", "purchase"}
 _CODE_PREFIX = re.compile(r"^(pos|card|trf|transfer|payment)[:\-\s]+", re.IGNORECASE)
 _PUNCT = re.compile(r"[^A-Za-z0-9\s\-']+")
 _MULTI_SPACE = re.compile(r"\s+")
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+_NON_ALPHA = re.compile(r"[^A-Za-z]")
+
+NAME_CACHE_SIZE = 8192  # distinct descriptions kept; one entry is ~two short strings
 
 
 def _normalize_desc(text: str) -> str:
@@ -27,7 +39,7 @@ def _normalize_desc(text: str) -> str:
     return txt
 
 
-def extract_counterparty_name(description: str) -> str:
+def _extract(description: str) -> str:
     base = _normalize_desc(description)
     if not base:
         return "Unknown"
@@ -35,9 +47,9 @@ def extract_counterparty_name(description: str) -> str:
     if not tokens:
         return "Unknown"
     candidate = " ".join(tokens)
-    stripped = re.sub(r"[^A-Za-z0-9]", "", candidate)
+    stripped = _NON_ALNUM.sub("", candidate)
     alnum_len = len(stripped)
-    alpha_len = len(re.sub(r"[^A-Za-z]", "", stripped))
+    alpha_len = len(_NON_ALPHA.sub("", stripped))
     # Require at least one alphabetic char and >=3 alphanumeric total
     if alnum_len < 3 or alpha_len == 0:
         return "Unknown"
@@ -57,9 +69,55 @@ def _title_token(t: str) -> str:
     return t[0].upper() + t[1:].lower()
 
 
+_cached_extract = lru_cache(maxsize=NAME_CACHE_SIZE)(_extract)
+
+
+def extract_counterparty_name(description: str) -> str:
+    return _cached_extract(description)
+
+
+def extract_counterparty_names(descriptions: Iterable[str]) -> list[str]:
+    """Batch form of `extract_counterparty_name` (shares the LRU memo)."""
+    extract = _cached_extract
+    return [extract(d) for d in descriptions]
+
+
+def configure_name_cache(maxsize: int) -> None:
+    """Resize (and clear) the memo; maxsize=0 disables caching."""
+    global _cached_extract
+    if maxsize < 0:
+        raise ValueError("maxsize must be >= 0")
+    _cached_extract = lru_cache(maxsize=maxsize)(_extract)
+
+
+def name_cache_stats() -> dict[str, Any]:
+    """Cumulative memo counters since the last resize / clear."""
+    info = _cached_extract.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": info.hits / lookups if lookups else 0.0,
+        "currsize": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def clear_name_cache() -> None:
+    _cached_extract.cache_clear()
+
+
 def get_or_create_counterparty_id(repo_get_or_create: Callable[[str, str], int], description: str) -> int:
     name = extract_counterparty_name(description)
     normalized = name.lower()
     return repo_get_or_create(normalized, name)
 
-__all__ = ["extract_counterparty_name", "get_or_create_counterparty_id"]
+__all__ = [
+    "extract_counterparty_name",
+    "extract_counterparty_names",
+    "get_or_create_counterparty_id",
+    "configure_name_cache",
+    "name_cache_stats",
+    "clear_name_cache",
+    "NAME_CACHE_SIZE",
+]
@@ -0,0 +1,289 @@
+"""Counterparty merge suggestions via MinHash + LSH (schema v9).
+
+Near-duplicate counterparty names ("amazon eu sarl" / "amazon eu s a r l")
+are found without pairwise comparison of all names:
+
+ - each `counterparties.name_normalized`, with separators removed, is
+   reduced to character 3-gram shingles and a MinHash signature of NUM_PERM
+   values (universal hashing (a * x + b) mod p over CRC32 shingle hashes;
+   vectorized with NumPy when it is installed, identical pure-Python
+   fallback otherwise);
+ - the signature is cut into BANDS bands of ROWS_PER_BAND values; each band
+   hashes to a bucket stored in `counterparty_lsh_buckets` (indexed), so
+   names sharing any bucket become candidate pairs. With 16 x 4 the
+   candidate threshold sits near Jaccard 0.5;
+ - candidates are verified by estimated Jaccard similarity (share of equal
+   signature positions), linked into clusters (union-find) and ranked.
+
+Cost is linear in the number of counterparties plus the candidate pairs;
+oversized buckets (generic shingle patterns) are skipped. Signatures are
+incremental: `refresh_signatures` only computes counterparties that have
+none, and triggers drop a signature when its counterparty is merged away
+or renamed.
+"""
+from __future__ import annotations
+
+import random
+import re
+import sqlite3
+import struct
+import time
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from hashlib import blake2b
+from typing import Any
+
+from src.logging.json_logger import emit_log_event
+from src.persistence.connection import connection
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None  # type: ignore[assignment]
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_MIN_SIMILARITY = 0.5  # matches the LSH candidate threshold
+MAX_BUCKET_SIZE = 100  # buckets with more members carry no signal and would be quadratic
+_PRIME = 4294967311  # smallest prime above 2**32: (a * x + b) stays below 2**64
+_SEED = 20251019
+_IN_CHUNK = 500  # ids per IN (...) query, below SQLite's variable limit
+_NON_ALNUM_RUN = re.compile(r"[^0-9a-z]+")
+_SIG_STRUCT = struct.Struct(f"<{NUM_PERM}Q")
+
+_rng = random.Random(_SEED)
+_A = [_rng.randrange(1, 1 << 32) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 1 << 32) for _ in range(NUM_PERM)]
+if np is not None:
+    _A_NP = np.array(_A, dtype=np.uint64)[:, None]
+    _B_NP = np.array(_B, dtype=np.uint64)[:, None]
+
+
+def shingles(name: str) -> set[str]:
+    # Separators removed: statement spellings differ mostly in spacing ("s a r l" / "sarl")
+    text = f" {_NON_ALNUM_RUN.sub('', name.lower())} "
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(name: str) -> tuple[int, ...]:
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(name)]
+    if np is not None:
+        h = np.array(hashes, dtype=np.uint64)[None, :]
+        return tuple(((_A_NP * h + _B_NP) % np.uint64(_PRIME)).min(axis=1).tolist())
+    return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in zip(_A, _B, strict=True))
+
+
+def estimated_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity: share of equal signature positions."""
+    return sum(x == y for x, y in zip(sig_a, sig_b, strict=True)) / NUM_PERM
+
+
+def band_buckets(signature: Sequence[int]) -> list[int]:
+    """One signed 64-bit bucket id per band (fits an SQLite INTEGER)."""
+    buckets = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = blake2b(struct.pack(f"<{ROWS_PER_BAND}Q", *chunk), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def _chunks(ids: Sequence[int]) -> Iterable[Sequence[int]]:
+    for i in range(0, len(ids), _IN_CHUNK):
+        yield ids[i:i + _IN_CHUNK]
+
+
+def _fetch_by_ids(con: sqlite3.Connection, sql: str, ids: Sequence[int]) -> list[tuple[Any, ...]]:
+    """Run `sql` (with one `{ids}` placeholder list) over `ids` in chunks."""
+    rows: list[tuple[Any, ...]] = []
+    for chunk in _chunks(ids):
+        rows.extend(con.execute(sql.format(ids=",".join("?" * len(chunk))), chunk).fetchall())
+    return rows
+
+
+def refresh_signatures(db_path: str) -> int:
+    """Compute signatures + buckets for counterparties that have none; returns count."""
+    with connection(db_path) as con:
+        missing = con.execute(
+            "SELECT c.counterparty_id, c.name_normalized FROM counterparties c "
+            "LEFT JOIN counterparty_signatures s ON s.counterparty_id = c.counterparty_id "
+            "WHERE s.counterparty_id IS NULL"
+        ).fetchall()
+        signatures = [(cp_id, minhash_signature(name)) for cp_id, name in missing]
+        con.executemany(
+            "INSERT OR REPLACE INTO counterparty_signatures(counterparty_id, signature) VALUES (?, ?)",
+            ((cp_id, _SIG_STRUCT.pack(*sig)) for cp_id, sig in signatures),
+        )
+        con.executemany(
+            "INSERT OR IGNORE INTO counterparty_lsh_buckets(band, bucket, counterparty_id) VALUES (?, ?, ?)",
+            (
+                (band, bucket, cp_id)
+                for cp_id, sig in signatures
+                for band, bucket in enumerate(band_buckets(sig))
+            ),
+        )
+        con.commit()
+        return len(signatures)
+
+
+def _candidate_pairs(con: sqlite3.Connection, max_bucket_size: int) -> list[tuple[int, int]]:
+    return con.execute(
+        """
+        WITH shared AS (
+            SELECT band, bucket FROM counterparty_lsh_buckets
+            GROUP BY band, bucket HAVING COUNT(*) BETWEEN 2 AND ?
+        )
+        SELECT DISTINCT a.counterparty_id, b.counterparty_id
+        FROM shared s
+        JOIN counterparty_lsh_buckets a ON a.band = s.band AND a.bucket = s.bucket
+        JOIN counterparty_lsh_buckets b ON b.band = s.band AND b.bucket = s.bucket
+        WHERE a.counterparty_id < b.counterparty_id
+        """,
+        (max_bucket_size,),
+    ).fetchall()
+
+
+def _load_signatures(con: sqlite3.Connection, ids: Sequence[int]) -> dict[int, tuple[int, ...]]:
+    rows = _fetch_by_ids(
+        con, "SELECT counterparty_id, signature FROM counterparty_signatures WHERE counterparty_id IN ({ids})", ids
+    )
+    return {cp_id: _SIG_STRUCT.unpack(blob) for cp_id, blob in rows}
+
+
+def suggest_merge_clusters(
+    db_path: str,
+    *,
+    min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    max_bucket_size: int = MAX_BUCKET_SIZE,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Ranked clusters of likely duplicate counterparties.
+
+    Each cluster: {"winner_id", "losing_ids", "similarity", "members"} where
+    winner_id is the member with most transactions (lowest id on ties), ready
+    for `counterparties_repository.merge(winner_id=..., losing_ids=...)`, and
+    members lists {"counterparty_id", "name", "transactions", "last_seen"}
+    (read from counterparty_stats). Largest and most similar clusters come
+    first.
+    """
+    start_time = time.time()
+    refreshed = refresh_signatures(db_path)
+    with connection(db_path) as con:
+        pairs = _candidate_pairs(con, max_bucket_size)
+        signatures = _load_signatures(con, sorted({i for pair in pairs for i in pair}))
+        parent: dict[int, int] = {}
+
+        def find(x: int) -> int:
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        edges: list[tuple[int, int, float]] = []
+        for a, b in pairs:
+            sim = estimated_similarity(signatures[a], signatures[b])
+            if sim >= min_similarity:
+                edges.append((a, b, sim))
+                ra, rb = find(a), find(b)
+                if ra != rb:
+                    parent[max(ra, rb)] = min(ra, rb)
+
+        groups: dict[int, list[int]] = defaultdict(list)
+        for node in list(parent):
+            groups[find(node)].append(node)
+        sims: dict[int, list[float]] = defaultdict(list)
+        for a, _b, sim in edges:
+            sims[find(a)].append(sim)
+
+        member_ids = sorted(parent)
+        names = dict(_fetch_by_ids(
+            con, "SELECT counterparty_id, name FROM counterparties WHERE counterparty_id IN ({ids})", member_ids
+        ))
+        activity = {
+            cp_id: (count, last_date)
+            for cp_id, count, last_date in _fetch_by_ids(
+                con,
+                "SELECT counterparty_id, tx_count, last_date FROM counterparty_stats WHERE counterparty_id IN ({ids})",
+                member_ids,
+            )
+        }
+
+    counts = {cp_id: count for cp_id, (count, _last) in activity.items()}
+    clusters: list[dict[str, Any]] = []
+    for root, members in groups.items():
+        members.sort(key=lambda i: (-counts.get(i, 0), i))
+        similarity = sum(sims[root]) / len(sims[root])
+        clusters.append({
+            "winner_id": members[0],
+            "losing_ids": members[1:],
+            "similarity": round(similarity, 4),
+            "members": [
+                {
+                    "counterparty_id": i,
+                    "name": names.get(i),
+                    "transactions": counts.get(i, 0),
+                    "last_seen": activity.get(i, (0, None))[1],
+                }
+                for i in members
+            ],
+        })
+    clusters.sort(key=lambda c: (-len(c["members"]), -c["similarity"], c["winner_id"]))
+    if limit is not None:
+        clusters = clusters[:limit]
+    emit_log_event({
+        "event": "counterparty_merge_suggestions",
+        "signatures_refreshed": refreshed,
+        "candidate_pairs": len(pairs),
+        "clusters": len(clusters),
+        "duration_ms": int((time.time() - start_time) * 1000),
+    })
+    return clusters
+
+
+def similar_counterparties(
+    db_path: str, counterparty_id: int, *, min_similarity: float = DEFAULT_MIN_SIMILARITY
+) -> list[dict[str, Any]]:
+    """Candidates for one (e.g. just created) counterparty, most similar first."""
+    refresh_signatures(db_path)
+    with connection(db_path) as con:
+        candidates = [
+            r[0] for r in con.execute(
+                "SELECT DISTINCT b.counterparty_id FROM counterparty_lsh_buckets a "
+                "JOIN counterparty_lsh_buckets b ON b.band = a.band AND b.bucket = a.bucket "
+                "WHERE a.counterparty_id = ? AND b.counterparty_id != a.counterparty_id",
+                (counterparty_id,),
+            )
+        ]
+        signatures = _load_signatures(con, [counterparty_id, *candidates])
+        names = dict(_fetch_by_ids(
+            con, "SELECT counterparty_id, name FROM counterparties WHERE counterparty_id IN ({ids})", candidates
+        ))
+    if counterparty_id not in signatures:
+        return []
+    own = signatures[counterparty_id]
+    scored = [
+        {"counterparty_id": c, "name": names.get(c), "similarity": estimated_similarity(own, signatures[c])}
+        for c in candidates
+    ]
+    return sorted(
+        (s for s in scored if s["similarity"] >= min_similarity),
+        key=lambda s: (-s["similarity"], s["counterparty_id"]),
+    )
+
+
+__all__ = [
+    "minhash_signature",
+    "estimated_similarity",
+    "refresh_signatures",
+    "suggest_merge_clusters",
+    "similar_counterparties",
+    "NUM_PERM",
+    "BANDS",
+    "DEFAULT_MIN_SIMILARITY",
+]
@@ -1,16 +1,166 @@
-"""Normalization engine orchestrating validation, mapping, and hash computation."""
+"""Normalization engine orchestrating validation, mapping, and hash computation.
+
+Rows travel through the engine as compact `TransactionRecord` tuples; dicts
+exist only at the API edges (raw input rows, `normalize_rows` output).
+
+transaction_id is a random UUID4 by default. With deterministic_ids=True it is
+derived from normalization_hash (see `deterministic_transaction_ids`), so
+re-ingesting the same statement yields the same primary keys and
+`bulk_insert_transactions` (INSERT OR IGNORE) skips every row.
+
+Entrypoints share the same per-row logic:
+    normalize_records         materialized list in, TransactionRecords sorted by
+                              normalization_hash out (feed straight to persistence).
+    normalize_rows            same, as dicts.
+                              With workers > 1 the validated rows are split into
+                              contiguous shards normalized in worker processes
+                              and merged by hash (identical to the serial result).
+    normalize_rows_streaming  iterator in, sorted chunks out, in bounded memory:
+                              input is processed chunk by chunk, each sorted run
+                              is spilled to a temp file and runs are k-way merged
+                              by hash, so output order equals normalize_rows.
+
+Tolerant mode (all entrypoints): pass a `quarantined` list and rows that fail
+validation (missing column, unparseable date or amount) are appended to it as
+{"row_index", "row", "reason"} instead of aborting the file; see
+`src.normalization.quarantine` for persisting and replaying them.
+"""
 from __future__ import annotations
 
+import heapq
+import pickle
+import tempfile
 import time
-from typing import Any
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat, tee
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any
 
-from src.common.hashing import normalization_hash
+from src.common.hashing import normalization_hashes_from_values
+from src.common.records import TX_FIELDS, TransactionRecord
 from src.logging.json_logger import emit_log_event
-from src.normalization.mapping import map_row
-from src.normalization.validation import validate_rows
+from src.normalization.amounts import AMOUNT_SAMPLE_SIZE, AmountFormat, AmountParser, amount_parser_for
+from src.normalization.mapping import deterministic_transaction_ids, random_transaction_ids, split_amount
+from src.normalization.validation import DATE_SAMPLE_SIZE, DateParser, date_parser_for, iter_validated
 
+REQUIRED_COLUMNS = ["Date", "Description", "Amount"]
+DEFAULT_STREAM_CHUNK_SIZE = 50_000
+MAX_MERGE_FANIN = 128  # open run files per merge pass
+_SPILL_BLOCK = 1024  # rows per pickle record in spill files
+MIN_SHARD_ROWS = 5_000  # smaller inputs are not worth the process round-trip
+_hash_key = itemgetter(TX_FIELDS.index("normalization_hash"))
 
-def normalize_rows(
+# Validated input reduced to what mapping needs: (iso_date, description, raw_amount)
+ValidatedRow = tuple[str, Any, Any]
+
+
+def _head_values(rows: Iterable[dict[str, Any]], column: str, limit: int) -> Iterator[Any]:
+    """Column values of the leading rows used for per-file format inference."""
+    return (r[column] for r in islice(rows, limit) if column in r)
+
+
+def _validate(
+    rows: Iterable[dict[str, Any]],
+    date_parser: DateParser,
+    anomalies: list[dict[str, Any]],
+    quarantined: list[dict[str, Any]] | None = None,
+    amount_parser: AmountParser | None = None,
+    start: int = 0,
+) -> list[ValidatedRow]:
+    validated = iter_validated(
+        rows, REQUIRED_COLUMNS, date_parser=date_parser, anomalies=anomalies, quarantined=quarantined, start=start
+    )
+    if quarantined is None:
+        return [(iso, r["Description"], r["Amount"]) for r, iso in validated]
+    # Tolerant mode: parse amounts up front so bad ones are quarantined, not raised later
+    assert amount_parser is not None
+    parse_amount = amount_parser.parse
+    kept: list[ValidatedRow] = []
+    seen = len(quarantined)  # entries not counted yet as consumed input rows
+    index = start
+    for r, iso in validated:
+        index += len(quarantined) - seen  # rows iter_validated skipped before this one
+        try:
+            kept.append((iso, r["Description"], parse_amount(r["Amount"])))
+        except ValueError as e:  # invalid, or written in the other decimal convention
+            quarantined.append({"row_index": index, "row": r, "reason": str(e)})
+        seen = len(quarantined)
+        index += 1
+    return kept
+
+
+def _normalize_validated(
+    validated: list[ValidatedRow],
+    *,
+    mapping_version: str,
+    logic_version: str,
+    source_file: str,
+    source_file_hash: str,
+    amount_parser: AmountParser,
+    deterministic_ids: bool = False,
+) -> list[TransactionRecord]:
+    """Map validated rows (same rules as `map_row`), derive year/month and hash (unsorted)."""
+    parse_amount = amount_parser.parse
+    values: list[tuple[Any, ...]] = []
+    append = values.append
+    for date_str, description, amount in validated:
+        amount_in, amount_out = split_amount(parse_amount(amount))
+        # Canonical hash field order; counterparty is the MVP description pass-through
+        append((
+            date_str, description, amount_in, amount_out, description,
+            source_file, source_file_hash, int(date_str[:4]), date_str[:7],
+        ))
+    hashes = normalization_hashes_from_values(values, mapping_version, logic_version)
+    # Deterministic ids depend on the final hash order: assigned after sorting
+    ids = [""] * len(values) if deterministic_ids else random_transaction_ids(len(values))
+    return [
+        TransactionRecord(
+            tx_id, date_str, description, amount_in, amount_out, counterparty, None,
+            source_file, source_file_hash, h, year, month, mapping_version, logic_version,
+        )
+        for tx_id, (date_str, description, amount_in, amount_out, counterparty, _, _, year, month), h
+        in zip(ids, values, hashes, strict=True)
+    ]
+
+
+def _log_quarantined(count: int, source_file: str) -> None:
+    if count:
+        emit_log_event({"event": "rows_quarantined", "source_file": source_file, "quarantined_count": count})
+
+
+def _with_deterministic_ids(records: Iterable[TransactionRecord]) -> Iterator[TransactionRecord]:
+    """Fill transaction_id from normalization_hash; `records` must be hash-sorted."""
+    for_hashes, for_rows = tee(records)
+    ids = deterministic_transaction_ids(map(_hash_key, for_hashes))
+    return (TransactionRecord(tx_id, *r[1:]) for tx_id, r in zip(ids, for_rows, strict=True))
+
+
+def _normalize_shard(shard: list[ValidatedRow], options: dict[str, Any]) -> list[TransactionRecord]:
+    """Worker entrypoint (module level so it pickles): normalize and sort one shard."""
+    rows = _normalize_validated(shard, **options)
+    rows.sort(key=_hash_key)
+    return rows
+
+
+def _normalize_sorted(validated: list[ValidatedRow], *, workers: int, **options: Any) -> list[TransactionRecord]:
+    """Normalize and sort by hash, sharding across `workers` processes when large enough.
+
+    Shards are contiguous and merged in shard order, so rows with equal hashes
+    keep their input order exactly like the serial stable sort.
+    """
+    shard_count = min(workers, len(validated) // MIN_SHARD_ROWS)
+    if shard_count <= 1:
+        return _normalize_shard(validated, options)
+    size = -(-len(validated) // shard_count)
+    shards = [validated[i:i + size] for i in range(0, len(validated), size)]
+    with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+        results = list(pool.map(_normalize_shard, shards, repeat(options)))
+    return list(heapq.merge(*results, key=_hash_key))
+
+
+def normalize_records(
     raw_rows: list[dict[str, Any]],
     *,
     header_map: dict[str, str],
@@ -18,11 +168,30 @@ def normalize_rows(
     logic_version: str,
     source_file: str,
     source_file_hash: str,
-) -> list[dict[str, Any]]:
+    date_format: str | None = None,
+    amount_format: AmountFormat | None = None,
+    workers: int = 1,
+    deterministic_ids: bool = False,
+    quarantined: list[dict[str, Any]] | None = None,
+) -> list[TransactionRecord]:
+    """Validate, map and hash raw rows; returns records sorted by normalization_hash.
+
+    With `quarantined`, invalid rows are collected there instead of raising.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
     start_time = time.time()
 
     try:
-        validated, anomalies = validate_rows(raw_rows, required_columns=["Date", "Description", "Amount"])
+        if not raw_rows:
+            raise ValueError("No rows extracted (empty input)")
+        date_parser = date_parser_for(_head_values(raw_rows, REQUIRED_COLUMNS[0], DATE_SAMPLE_SIZE), date_format)
+        amount_parser = amount_parser_for(_head_values(raw_rows, "Amount", AMOUNT_SAMPLE_SIZE), amount_format)
+        anomalies: list[dict[str, Any]] = []
+        quarantine_base = len(quarantined) if quarantined is not None else 0
+        validated = _validate(raw_rows, date_parser, anomalies, quarantined, amount_parser)
+        if quarantined is not None:
+            _log_quarantined(len(quarantined) - quarantine_base, source_file)
 
         # Log validation stage
         emit_log_event({
@@ -35,27 +204,19 @@ def normalize_rows(
             "source_file": source_file
         })
 
-        normalized: list[dict[str, Any]] = []
-        for raw in validated:
-            mapped = map_row(raw, header_map, source_file=source_file, source_file_hash=source_file_hash)
-            if not mapped:
-                continue
-            # Derive year & month
-            date_str = mapped["transaction_date"]
-            year = int(date_str[:4])
-            month = date_str[:7]
-            mapped.update({
-                "year": year,
-                "month": month,
-                "mapping_version": mapping_version,
-                "logic_version": logic_version,
-            })
-            mapped["normalization_hash"] = normalization_hash(
-                mapped,
-                mapping_version=mapping_version,
-                logic_version=logic_version,
-            )
-            normalized.append(mapped)
+        # Sorted by normalization_hash for deterministic ordering
+        normalized = _normalize_sorted(
+            validated,
+            workers=workers,
+            mapping_version=mapping_version,
+            logic_version=logic_version,
+            source_file=source_file,
+            source_file_hash=source_file_hash,
+            amount_parser=amount_parser,
+            deterministic_ids=deterministic_ids,
+        )
+        if deterministic_ids:
+            normalized = list(_with_deterministic_ids(normalized))
 
         # Log normalization stage
         emit_log_event({
@@ -68,9 +229,6 @@ def normalize_rows(
             "source_file": source_file
         })
 
-        # Sort normalized results by normalization_hash for deterministic ordering
-        normalized.sort(key=lambda x: x["normalization_hash"])
-
         return normalized
 
     except Exception as e:
@@ -88,4 +246,213 @@ def normalize_rows(
         })
         raise
 
-__all__ = ["normalize_rows"]
+
+def normalize_rows(
+    raw_rows: list[dict[str, Any]],
+    *,
+    header_map: dict[str, str],
+    mapping_version: str,
+    logic_version: str,
+    source_file: str,
+    source_file_hash: str,
+    date_format: str | None = None,
+    amount_format: AmountFormat | None = None,
+    workers: int = 1,
+    deterministic_ids: bool = False,
+    quarantined: list[dict[str, Any]] | None = None,
+) -> list[dict[str, Any]]:
+    """`normalize_records` with dict rows (API edge for callers and tests)."""
+    records = normalize_records(
+        raw_rows,
+        header_map=header_map,
+        mapping_version=mapping_version,
+        logic_version=logic_version,
+        source_file=source_file,
+        source_file_hash=source_file_hash,
+        date_format=date_format,
+        amount_format=amount_format,
+        workers=workers,
+        deterministic_ids=deterministic_ids,
+        quarantined=quarantined,
+    )
+    return [r.as_dict() for r in records]
+
+
+def _write_run(rows: list[TransactionRecord], directory: Path, index: int) -> Path:
+    path = directory / f"run_{index:06d}.pkl"
+    with path.open("wb") as f:
+        for start in range(0, len(rows), _SPILL_BLOCK):
+            pickle.dump(rows[start:start + _SPILL_BLOCK], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(f: IO[bytes]) -> Iterator[TransactionRecord]:
+    while True:
+        try:
+            block = pickle.load(f)
+        except EOFError:
+            return
+        yield from block
+
+
+def _merge_runs(paths: list[Path]) -> Iterator[TransactionRecord]:
+    """Stable k-way merge of sorted run files (earlier runs win ties)."""
+    handles = [p.open("rb") for p in paths]
+    try:
+        yield from heapq.merge(*(_read_run(h) for h in handles), key=_hash_key)
+    finally:
+        for h in handles:
+            h.close()
+
+
+def _reduce_runs(paths: list[Path], directory: Path, next_index: int) -> list[Path]:
+    """Merge runs in groups until at most MAX_MERGE_FANIN remain (bounded open files)."""
+    while len(paths) > MAX_MERGE_FANIN:
+        merged: list[Path] = []
+        for start in range(0, len(paths), MAX_MERGE_FANIN):
+            group = paths[start:start + MAX_MERGE_FANIN]
+            out = directory / f"run_{next_index:06d}.pkl"
+            next_index += 1
+            with out.open("wb") as f:
+                block: list[TransactionRecord] = []
+                for row in _merge_runs(group):
+                    block.append(row)
+                    if len(block) == _SPILL_BLOCK:
+                        pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+                        block = []
+                if block:
+                    pickle.dump(block, f, protocol=pickle.HIGHEST_PROTOCOL)
+            for p in group:
+                p.unlink()
+            merged.append(out)
+        paths = merged
+    return paths
+
+
+def _chunked(rows: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(rows)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def normalize_rows_streaming(
+    raw_rows: Iterable[dict[str, Any]],
+    *,
+    header_map: dict[str, str],
+    mapping_version: str,
+    logic_version: str,
+    source_file: str,
+    source_file_hash: str,
+    chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+    spill_dir: str | None = None,
+    date_format: str | None = None,
+    amount_format: AmountFormat | None = None,
+    deterministic_ids: bool = False,
+    quarantined: list[dict[str, Any]] | None = None,
+) -> Iterator[list[dict[str, Any]]]:
+    """Normalize an iterator of raw rows in fixed memory.
+
+    Yields lists of at most `chunk_size` normalized rows; concatenated, the
+    chunks are ordered exactly like `normalize_rows` output. Memory holds one
+    input chunk plus one spill block per run; sorted runs live in a temporary
+    directory (under `spill_dir` if given) that is removed afterwards. The
+    date and amount formats are inferred once from the head of the stream,
+    exactly as `normalize_rows` would, and shared by every chunk.
+    With `quarantined`, invalid rows are collected there (row_index counts
+    from the start of the stream) instead of raising.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    start_time = time.time()
+    in_count = 0
+    valid_count = 0
+    anomaly_count = 0
+    out_count = 0
+    quarantine_base = len(quarantined) if quarantined is not None else 0
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="extracta_norm_", dir=spill_dir) as tmp:
+            tmp_dir = Path(tmp)
+            runs: list[Path] = []
+            first_run: list[TransactionRecord] | None = None
+            it = iter(raw_rows)
+            head = list(islice(it, max(DATE_SAMPLE_SIZE, AMOUNT_SAMPLE_SIZE)))
+            date_parser = date_parser_for(_head_values(head, REQUIRED_COLUMNS[0], DATE_SAMPLE_SIZE), date_format)
+            amount_parser = amount_parser_for(_head_values(head, "Amount", AMOUNT_SAMPLE_SIZE), amount_format)
+            for chunk in _chunked(chain(head, it), chunk_size):
+                anomalies: list[dict[str, Any]] = []
+                validated = _validate(chunk, date_parser, anomalies, quarantined, amount_parser, start=in_count)
+                in_count += len(chunk)
+                valid_count += len(validated)
+                anomaly_count += len(anomalies)
+                normalized = _normalize_validated(
+                    validated,
+                    mapping_version=mapping_version,
+                    logic_version=logic_version,
+                    source_file=source_file,
+                    source_file_hash=source_file_hash,
+                    amount_parser=amount_parser,
+                    deterministic_ids=deterministic_ids,
+                )
+                normalized.sort(key=_hash_key)
+                # Keep the first run in memory: single-chunk inputs never touch disk
+                if first_run is None and not runs:
+                    first_run = normalized
+                    continue
+                if first_run is not None:
+                    runs.append(_write_run(first_run, tmp_dir, len(runs)))
+                    first_run = None
+                runs.append(_write_run(normalized, tmp_dir, len(runs)))
+
+            if first_run is None and not runs:
+                raise ValueError("No rows extracted (empty input)")
+
+            emit_log_event({
+                "stage": "validation",
+                "status": "success",
+                "in_count": in_count,
+                "out_count": valid_count,
+                "error_count": anomaly_count,
+                "duration_ms": int((time.time() - start_time) * 1000),
+                "source_file": source_file
+            })
+            if quarantined is not None:
+                _log_quarantined(len(quarantined) - quarantine_base, source_file)
+
+            merged: Iterable[TransactionRecord]
+            if first_run is not None:
+                merged = first_run
+            else:
+                merged = _merge_runs(_reduce_runs(runs, tmp_dir, len(runs)))
+            if deterministic_ids:
+                merged = _with_deterministic_ids(merged)
+            for out_chunk in _chunked(merged, chunk_size):
+                out_count += len(out_chunk)
+                yield [r.as_dict() for r in out_chunk]
+
+        emit_log_event({
+            "stage": "normalization",
+            "status": "success",
+            "in_count": valid_count,
+            "out_count": out_count,
+            "error_count": 0,
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "source_file": source_file
+        })
+
+    except Exception as e:
+        emit_log_event({
+            "stage": "normalization",
+            "status": "error",
+            "in_count": in_count,
+            "out_count": out_count,
+            "error_count": 1,
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "source_file": source_file,
+            "exception_type": type(e).__name__,
+            "message": str(e)
+        })
+        raise
+
+
+__all__ = ["normalize_records", "normalize_rows", "normalize_rows_streaming"]
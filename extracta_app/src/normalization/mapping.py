@@ -2,21 +2,84 @@
 
 Handles both two-column (amount_in/amount_out) and single signed amount pattern.
 For MVP we implement single signed amount logic when header_map provides generic 'amount' mapping.
+Amounts are parsed with the file's `AmountParser` (see amounts.py); without
+one, the US format ("," thousands, "." decimal) is assumed.
 """
 from __future__ import annotations
 
+import os
 import uuid
+from collections.abc import Iterable, Iterator
+from hashlib import sha1
 from typing import Any
 
+from src.normalization.amounts import DEFAULT_AMOUNT_PARSER, AmountParser
+
+# Fixed namespace for content-derived (uuid5) transaction ids; never change it,
+# stored ids of previous imports would stop matching.
+TRANSACTION_ID_NAMESPACE = uuid.UUID("2373d490-14ae-41ef-911e-4a4757ea16dc")
+_ID_PREFIX = TRANSACTION_ID_NAMESPACE.bytes
+
 
 def _parse_float(val) -> float:
-    try:
-        return float(str(val).replace(",", "").strip())
-    except Exception as exc:  # pragma: no cover (rare parsing anomaly)
-        raise ValueError(f"Invalid numeric value: {val}") from exc
+    return DEFAULT_AMOUNT_PARSER.parse(val)
+
+
+def split_amount(amt: float) -> tuple[float, float]:
+    """Signed amount -> (amount_in, amount_out); zero rows are info only."""
+    if amt < 0:
+        return 0.0, abs(amt)
+    if amt > 0:
+        return amt, 0.0
+    return 0.0, 0.0
+
+
+def random_transaction_ids(count: int) -> list[str]:
+    """`count` random UUID4 strings, formatted from one urandom read (batch uuid4)."""
+    raw = os.urandom(16 * count)
+    ids: list[str] = []
+    append = ids.append
+    for i in range(0, 16 * count, 16):
+        append(_format_uuid(raw[i:i + 16].hex(), "4"))
+    return ids
+
+
+def _format_uuid(h: str, version: str) -> str:
+    """Format 32 hex digits as a UUID string with the given version and RFC 4122 variant."""
+    return f"{h[:8]}-{h[8:12]}-{version}{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:32]}"
+
+
+def transaction_id_for(normalization_hash: str, ordinal: int) -> str:
+    """Content-derived id of the `ordinal`-th row (0-based) with this normalization_hash."""
+    name = f"{normalization_hash}:{ordinal}".encode()
+    return _format_uuid(sha1(_ID_PREFIX + name).hexdigest(), "5")
+
+
+def deterministic_transaction_ids(hashes: Iterable[str]) -> Iterator[str]:
+    """Content-derived ids for rows in normalization_hash order.
+
+    Each id is uuid5(TRANSACTION_ID_NAMESPACE, "<normalization_hash>:<ordinal>"),
+    where ordinal counts earlier rows with the same hash, so genuinely repeated
+    rows within one statement (same day, amount and description) keep distinct
+    ids while re-importing the statement reproduces the same ids. Equal hashes
+    must be adjacent (sorted input).
+    """
+    previous = None
+    ordinal = 0
+    for h in hashes:
+        ordinal = ordinal + 1 if h == previous else 0
+        previous = h
+        yield transaction_id_for(h, ordinal)
 
 
-def map_row(raw: dict[str, Any], header_map: dict[str, str], *, source_file: str, source_file_hash: str) -> dict[str, Any] | None:
+def map_row(
+    raw: dict[str, Any],
+    header_map: dict[str, str],
+    *,
+    source_file: str,
+    source_file_hash: str,
+    amount_parser: AmountParser | None = None,
+) -> dict[str, Any] | None:
     # Must have date + description + either amount or amount_in/out
     if "Date" not in raw or "Description" not in raw:
         return None
@@ -24,18 +87,9 @@ def map_row(raw: dict[str, Any], header_map: dict[str, str], *, source_file: str
     transaction_date = raw["Date"]
     description = raw["Description"]
 
-    amount_in = 0.0
-    amount_out = 0.0
     # Signed amount logic
     if "Amount" in raw:
-        amt = _parse_float(raw["Amount"])
-        if amt < 0:
-            amount_out = abs(amt)
-        elif amt > 0:
-            amount_in = amt
-        else:  # zero row skip? treat as info only
-            amount_in = 0.0
-            amount_out = 0.0
+        amount_in, amount_out = split_amount((amount_parser or DEFAULT_AMOUNT_PARSER).parse(raw["Amount"]))
     else:
         # Future: handle separate columns e.g. Credit/Debit
         return None
@@ -53,4 +107,11 @@ def map_row(raw: dict[str, Any], header_map: dict[str, str], *, source_file: str
     }
     return row
 
-__all__ = ["map_row"]
+__all__ = [
+    "map_row",
+    "split_amount",
+    "random_transaction_ids",
+    "deterministic_transaction_ids",
+    "transaction_id_for",
+    "TRANSACTION_ID_NAMESPACE",
+]
@@ -0,0 +1,104 @@
+"""Merchant alias matching with an Aho-Corasick automaton.
+
+All aliases of the `merchant_aliases` table (schema v8) are compiled into one
+automaton, so a description is matched against thousands of aliases in a
+single linear pass instead of one pattern at a time.
+
+Matching works on normalized text (`normalize_alias_text`) padded with a
+space on both sides; aliases are padded the same way, so they only match on
+whole-token boundaries ("amzn" does not fire inside "xamzny"). When several
+aliases occur, the longest wins, then the leftmost.
+
+`alias_matcher_for(db_path)` keeps one compiled matcher per database and
+rebuilds it only when the table's revision counter (maintained by triggers)
+has changed; the revision check is a single-row read.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from collections.abc import Iterable
+from functools import lru_cache
+
+from src.persistence.merchant_aliases_repository import alias_revision, load_alias_snapshot, normalize_alias_text
+
+MATCH_CACHE_SIZE = 8192  # per-matcher memo of description -> canonical name
+
+
+class AliasMatcher:
+    """Aho-Corasick automaton over normalized aliases -> canonical names."""
+
+    def __init__(self, aliases: Iterable[tuple[str, str]], revision: int = 0) -> None:
+        self.revision = revision
+        goto: list[dict[str, int]] = [{}]
+        # Longest alias ending at each state (own or via the failure chain): (length, canonical)
+        out: list[tuple[int, str] | None] = [None]
+        count = 0
+        for alias, canonical in aliases:
+            key = normalize_alias_text(alias)
+            if not key:
+                continue
+            node = 0
+            for ch in f" {key} ":
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(None)
+                node = nxt
+            out[node] = (len(key) + 2, canonical)
+            count += 1
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                if out[child] is None:
+                    out[child] = out[fail[child]]
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self.alias_count = count
+        self.match = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match)
+
+    def _match(self, description: str) -> str | None:
+        """Canonical name of the best alias found in `description`, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        best: tuple[int, str] | None = None
+        for ch in f" {normalize_alias_text(description)} ":
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = out[node]
+            if hit is not None and (best is None or hit[0] > best[0]):
+                best = hit  # strictly longer only: ties keep the leftmost
+        return best[1] if best is not None else None
+
+
+_matchers: dict[str, AliasMatcher] = {}
+_lock = threading.Lock()
+
+
+def alias_matcher_for(db_path: str) -> AliasMatcher:
+    """Compiled matcher for the database's alias table, rebuilt only on change."""
+    current = _matchers.get(db_path)
+    if current is not None and current.revision == alias_revision(db_path):
+        return current
+    with _lock:
+        revision, pairs = load_alias_snapshot(db_path)
+        current = _matchers.get(db_path)
+        if current is None or current.revision != revision:
+            current = AliasMatcher(pairs, revision=revision)
+            _matchers[db_path] = current
+        return current
+
+
+__all__ = ["AliasMatcher", "alias_matcher_for", "MATCH_CACHE_SIZE"]
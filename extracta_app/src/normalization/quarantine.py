@@ -0,0 +1,162 @@
+"""Bulk replay of quarantined rows.
+
+Tolerant-mode normalization (`quarantined=` on the engine entrypoints) keeps
+bad rows out of a file's transactions and the UI stores them in the
+`quarantined_rows` table (schema v6). `replay_quarantined` sends them through
+normalization again without re-extracting the document:
+
+ - an optional `fix` callable may correct each row first (return None to
+   leave a row quarantined);
+ - rows are normalized with the document's own date / amount formats,
+   inferred from its cached raw artifact when available (a handful of
+   replayed rows alone could infer a different format than the full file);
+ - rows that now pass get deterministic ids whose ordinals continue after the
+   document's stored rows with the same normalization_hash (a fixed row that
+   repeats an imported one must not reuse its id), are inserted all or nothing
+   and only then removed from the quarantine; corrected rows are also written
+   back into the raw artifact so a later re-normalization sees them;
+ - rows that still fail stay quarantined with their latest row and reason, as
+   do all of a document's passing rows if their insert hit an existing id.
+
+Per document, the insert, the quarantine update and the artifact patch run
+in one BEGIN IMMEDIATE transaction (as in renormalization), so a crash never
+leaves rows both stored and quarantined for a later replay to insert again.
+"""
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from src.common.records import TransactionRecord
+from src.logging.json_logger import emit_log_event
+from src.normalization.amounts import AMOUNT_SAMPLE_SIZE, infer_amount_format
+from src.normalization.engine import normalize_records
+from src.normalization.mapping import transaction_id_for
+from src.normalization.validation import DATE_SAMPLE_SIZE, infer_date_format
+from src.persistence.connection import connection
+from src.persistence.quarantine_repository import (
+    list_quarantined_rows,
+    remove_quarantined_rows,
+    write_quarantined_rows,
+)
+from src.persistence.raw_artifacts_repository import get_raw_artifact, write_raw_artifact
+from src.persistence.transactions_repository import document_transaction_ids, write_new_transactions
+
+RowFix = Callable[[dict[str, Any]], dict[str, Any] | None]
+REPLAY_CONFLICT_REASON = "Replay conflicts with a stored transaction id"
+
+
+def _continue_ordinals(
+    records: Iterable[TransactionRecord], stored: dict[str, set[str]]
+) -> list[TransactionRecord]:
+    """Deterministic ids numbered after the ids already stored per normalization_hash."""
+    next_ordinal: dict[str, int] = {}
+    result: list[TransactionRecord] = []
+    for r in records:
+        h = r.normalization_hash
+        taken = stored.get(h, set())
+        ordinal = next_ordinal.get(h, len(taken))
+        tx_id = transaction_id_for(h, ordinal)
+        while tx_id in taken:  # skip gaps left by rows deleted out of band
+            ordinal += 1
+            tx_id = transaction_id_for(h, ordinal)
+        next_ordinal[h] = ordinal + 1
+        result.append(r._replace(transaction_id=tx_id))
+    return result
+
+
+def _file_formats(artifact: dict[str, Any] | None) -> dict[str, Any]:
+    if artifact is None:
+        return {}
+    rows = artifact["rows"]
+    return {
+        "date_format": infer_date_format(r["Date"] for r in rows[:DATE_SAMPLE_SIZE] if "Date" in r),
+        "amount_format": infer_amount_format(r["Amount"] for r in rows[:AMOUNT_SAMPLE_SIZE] if "Amount" in r),
+    }
+
+
+def replay_quarantined(
+    db_path: str,
+    *,
+    mapping_version: str,
+    logic_version: str,
+    source_file_hash: str | None = None,
+    fix: RowFix | None = None,
+) -> dict[str, int]:
+    """Replay quarantined rows (all documents, or one); returns run statistics."""
+    start_time = time.time()
+    by_document: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for entry in list_quarantined_rows(db_path, source_file_hash=source_file_hash):
+        by_document[entry["source_file_hash"]].append(entry)
+    stats = {"replayed": 0, "inserted": 0, "still_quarantined": 0, "skipped": 0}
+
+    for file_hash, entries in by_document.items():
+        source_file = entries[0]["source_file"]
+        pending: list[dict[str, Any]] = []  # entries with the row to try
+        for entry in entries:
+            row = fix(dict(entry["row"])) if fix is not None else entry["row"]
+            if row is None:
+                stats["skipped"] += 1
+            else:
+                pending.append({**entry, "row": row})
+        if not pending:
+            continue
+
+        artifact = get_raw_artifact(db_path, file_hash)
+        failed: list[dict[str, Any]] = []
+        records = normalize_records(
+            [e["row"] for e in pending],
+            header_map=artifact["header_map"] if artifact else {},
+            mapping_version=mapping_version,
+            logic_version=logic_version,
+            source_file=source_file,
+            source_file_hash=file_hash,
+            quarantined=failed,
+            **_file_formats(artifact),
+        )
+        failed_positions = {f["row_index"]: f["reason"] for f in failed}
+        passed = [e for i, e in enumerate(pending) if i not in failed_positions]
+        with connection(db_path) as con:
+            con.execute("BEGIN IMMEDIATE")
+            records = _continue_ordinals(records, document_transaction_ids(db_path, file_hash))
+            if records and not write_new_transactions(con, records):
+                for i in range(len(pending)):
+                    failed_positions.setdefault(i, REPLAY_CONFLICT_REASON)
+                passed = []
+            remove_quarantined_rows(con, (e["quarantine_id"] for e in passed))
+            write_quarantined_rows(
+                con,
+                source_file_hash=file_hash,
+                source_file=source_file,
+                entries=(
+                    {"row_index": e["row_index"], "row": e["row"], "reason": failed_positions[i]}
+                    for i, e in enumerate(pending) if i in failed_positions
+                ),
+            )
+            if artifact is not None and fix is not None and passed:
+                rows = artifact["rows"]
+                for e in passed:
+                    if e["row_index"] < len(rows):
+                        rows[e["row_index"]] = e["row"]
+                write_raw_artifact(
+                    con, file_hash=file_hash, source_file=artifact["source_file"],
+                    rows=rows, header_map=artifact["header_map"],
+                )
+            con.commit()
+        if passed:
+            stats["inserted"] += len(records)
+        stats["replayed"] += len(passed)
+        stats["still_quarantined"] += len(failed_positions)
+
+    emit_log_event({
+        "event": "quarantine_replay",
+        "documents": len(by_document),
+        "duration_ms": int((time.time() - start_time) * 1000),
+        **stats,
+    })
+    return stats
+
+
+__all__ = ["replay_quarantined", "RowFix", "REPLAY_CONFLICT_REASON"]
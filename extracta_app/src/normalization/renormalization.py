@@ -0,0 +1,187 @@
+"""Incremental re-normalization after mapping / logic version changes.
+
+A document is stale when any of its transactions carries a mapping_version
+or logic_version different from the current ones. `renormalize` replays the
+cached raw artifact (schema v5) of each stale document through
+`normalize_records` and swaps the document's rows in one SQLite transaction
+(`swap_document_transactions`), carrying category / counterparty
+assignments over by content.
+
+Resumable by construction: each document commits on its own and the stale
+set is recomputed from the database on every run, so an interrupted job
+simply continues with whatever is still stale. Documents without a cached
+artifact (uploaded before v5) cannot be replayed and are reported as
+`missing_artifacts`.
+
+Replays run in tolerant mode: rows that fail validation replace the
+document's quarantine entries (schema v6) instead of failing the document.
+The quarantine entries are written in the same transaction as the row swap,
+so a document never ends up with new rows and stale quarantine (or the
+reverse).
+
+Normalization of a batch of documents runs in worker processes when
+workers > 1; swaps always happen in the calling process.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from src.common.records import TransactionRecord
+from src.logging.json_logger import emit_log_event
+from src.normalization.engine import normalize_records
+from src.persistence.connection import connection
+from src.persistence.quarantine_repository import write_quarantined_rows
+from src.persistence.raw_artifacts_repository import get_raw_artifact
+from src.persistence.transactions_repository import swap_document_transactions
+
+DEFAULT_BATCH_SIZE = 8  # documents normalized per (parallel) batch
+
+NormalizedArtifact = tuple[list[TransactionRecord], list[dict[str, Any]]]  # (records, quarantined entries)
+
+ProgressCallback = Callable[[int, int, str], None]  # (done, total, file_hash)
+
+_STALE_FILTER = "(t.mapping_version IS NOT ? OR t.logic_version IS NOT ?)"
+
+
+def find_stale_documents(db_path: str, *, mapping_version: str, logic_version: str) -> list[str]:
+    """File hashes of replayable documents whose rows carry outdated versions."""
+    with connection(db_path) as con:
+        cur = con.execute(
+            "SELECT a.file_hash FROM raw_artifacts a WHERE EXISTS ("
+            f"SELECT 1 FROM transactions t WHERE t.source_file_hash = a.file_hash AND {_STALE_FILTER}"
+            ") ORDER BY a.file_hash",
+            (mapping_version, logic_version),
+        )
+        return [r[0] for r in cur.fetchall()]
+
+
+def count_unreplayable_documents(db_path: str, *, mapping_version: str, logic_version: str) -> int:
+    """Stale documents that have no cached raw artifact."""
+    with connection(db_path) as con:
+        cur = con.execute(
+            f"SELECT COUNT(DISTINCT t.source_file_hash) FROM transactions t WHERE {_STALE_FILTER} "
+            "AND NOT EXISTS (SELECT 1 FROM raw_artifacts a WHERE a.file_hash = t.source_file_hash)",
+            (mapping_version, logic_version),
+        )
+        return int(cur.fetchone()[0])
+
+
+def _normalize_artifact(artifact: dict[str, Any], mapping_version: str, logic_version: str) -> NormalizedArtifact:
+    """Worker entrypoint (module level so it pickles): (records, quarantined entries)."""
+    quarantined: list[dict[str, Any]] = []
+    records = normalize_records(
+        artifact["rows"],
+        header_map=artifact["header_map"],
+        mapping_version=mapping_version,
+        logic_version=logic_version,
+        source_file=artifact["source_file"],
+        source_file_hash=artifact["file_hash"],
+        deterministic_ids=True,
+        quarantined=quarantined,
+    )
+    return records, quarantined
+
+
+def renormalize(
+    db_path: str,
+    *,
+    mapping_version: str,
+    logic_version: str,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_documents: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """Re-normalize stale documents; returns run statistics.
+
+    `max_documents` bounds one run (e.g. a time-sliced background job); the
+    next call resumes with the remaining stale documents.
+    """
+    if workers < 1 or batch_size < 1:
+        raise ValueError("workers and batch_size must be >= 1")
+    start_time = time.time()
+    stale = find_stale_documents(db_path, mapping_version=mapping_version, logic_version=logic_version)
+    if max_documents is not None:
+        stale = stale[:max_documents]
+    stats = {
+        "stale": len(stale),
+        "renormalized": 0,
+        "failed": 0,
+        "rows_removed": 0,
+        "rows_inserted": 0,
+        "carried": 0,
+        "quarantined": 0,
+        "missing_artifacts": count_unreplayable_documents(
+            db_path, mapping_version=mapping_version, logic_version=logic_version
+        ),
+    }
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    done = 0
+    try:
+        for start in range(0, len(stale), batch_size):
+            batch = stale[start:start + batch_size]
+            artifacts = [get_raw_artifact(db_path, file_hash) for file_hash in batch]
+            futures: list[Future[NormalizedArtifact] | None] = [
+                pool.submit(_normalize_artifact, a, mapping_version, logic_version) if pool is not None and a else None
+                for a in artifacts
+            ]
+            for file_hash, artifact, future in zip(batch, artifacts, futures, strict=True):
+                try:
+                    if artifact is None:
+                        raise LookupError(f"Raw artifact disappeared for {file_hash}")
+                    if future is not None:
+                        records, quarantined = future.result()
+                    else:
+                        records, quarantined = _normalize_artifact(artifact, mapping_version, logic_version)
+                    with connection(db_path) as con:
+                        con.execute("BEGIN IMMEDIATE")
+                        swap = swap_document_transactions(con, file_hash, records)
+                        write_quarantined_rows(
+                            con,
+                            source_file_hash=file_hash,
+                            source_file=artifact["source_file"],
+                            entries=quarantined,
+                            replace=True,
+                        )
+                        con.commit()
+                except Exception as e:
+                    stats["failed"] += 1
+                    emit_log_event({
+                        "event": "renormalization_document_fail",
+                        "file_hash": file_hash,
+                        "exception_type": type(e).__name__,
+                        "message": str(e),
+                    })
+                else:
+                    stats["renormalized"] += 1
+                    stats["rows_removed"] += swap["removed"]
+                    stats["rows_inserted"] += swap["inserted"]
+                    stats["carried"] += swap["carried"]
+                    stats["quarantined"] += len(quarantined)
+                done += 1
+                if progress is not None:
+                    progress(done, len(stale), file_hash)
+            emit_log_event({
+                "event": "renormalization_progress",
+                "done": done,
+                "total": len(stale),
+                "failed": stats["failed"],
+            })
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    emit_log_event({
+        "event": "renormalization_complete",
+        "mapping_version": mapping_version,
+        "logic_version": logic_version,
+        "duration_ms": int((time.time() - start_time) * 1000),
+        **stats,
+    })
+    return stats
+
+
+__all__ = ["find_stale_documents", "count_unreplayable_documents", "renormalize", "DEFAULT_BATCH_SIZE"]
@@ -3,17 +3,46 @@
 Provides a single entrypoint `validate_rows` that:
  1. Ensures non-empty input.
  2. Verifies required columns are present in each row.
- 3. Normalizes date formats with fallback parsing (ISO, EU dd/mm/YYYY, US mm/dd/YYYY).
- 4. Collects soft anomalies (zero amount rows) instead of failing.
+ 3. Normalizes dates to ISO using one date format per file (ISO, EU dd/mm/YYYY
+    or US mm/dd/YYYY), inferred from a sample of the file's dates.
+ 4. Rejects rows whose date only parses with a different format than the
+    file's (DateFormatConflictError), so one file never mixes day-first and
+    month-first readings.
+ 5. Collects soft anomalies (zero amount rows) instead of failing.
 
 Returns (cleaned_rows, anomalies_list).
+
+Tolerant mode: pass a `quarantined` list and rows that would raise (missing
+columns, unparseable or conflicting date) are appended to it as
+{"row_index", "row", "reason"} and skipped; the remaining rows go through.
+
+Date format inference: each sampled date votes for every format it parses
+with; the format with most votes wins, ties going to DATE_FORMATS order (so an
+all-ambiguous dd/mm vs mm/dd file stays day-first, as before). A single
+unambiguous value such as 13/01/2025 or 01/13/2025 settles the question.
 """
 from __future__ import annotations
 
-from datetime import datetime
+import re
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from itertools import islice
 from typing import Any
 
 DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y"]
+DATE_SAMPLE_SIZE = 500
+DATE_MEMO_SIZE = 1 << 16  # distinct date strings memoized per parser (per file)
+
+# Field patterns mirror `_strptime` so the fast path accepts exactly the same strings.
+_YEAR = r"(?P<y>\d{4})"
+_MONTH = r"(?P<m>1[0-2]|0[1-9]|[1-9])"
+_DAY = r"(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+_FORMAT_PATTERNS: dict[str, re.Pattern[str]] = {
+    "%Y-%m-%d": re.compile(f"{_YEAR}-{_MONTH}-{_DAY}"),
+    "%d/%m/%Y": re.compile(f"{_DAY}/{_MONTH}/{_YEAR}"),
+    "%m/%d/%Y": re.compile(f"{_MONTH}/{_DAY}/{_YEAR}"),
+}
 
 
 def _normalize_date(value: str) -> str:
@@ -25,18 +54,99 @@ def _normalize_date(value: str) -> str:
     raise ValueError(f"Unrecognized date format: {value}")
 
 
-def validate_rows(rows: list[dict[str, Any]], required_columns: list[str]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
-    if not rows:
-        raise ValueError("No rows extracted (empty input)")
-    missing_cols = set(required_columns)
-    cleaned: list[dict[str, Any]] = []
-    anomalies: list[dict[str, Any]] = []
-    for r in rows:
-        if any(col not in r for col in required_columns):
-            raise ValueError(f"Missing required columns in row: {r}")
-        # Date normalization
-        r = dict(r)
-        r[required_columns[0]] = _normalize_date(r[required_columns[0]])
+def _parse_with(pattern: re.Pattern[str], value: str) -> str | None:
+    m = pattern.fullmatch(value)
+    if m is None:
+        return None
+    try:
+        parsed = date(int(m["y"]), int(m["m"]), int(m["d"]))
+    except ValueError:  # e.g. 31/02/2025
+        return None
+    return parsed.strftime("%Y-%m-%d")
+
+
+class DateFormatConflictError(ValueError):
+    """A date that parses only with a different format than the file's."""
+
+
+class DateParser:
+    """Single-format date parser with a bounded per-value memo.
+
+    `parse` returns the ISO date. Values another supported format would read
+    raise DateFormatConflictError; unparseable values raise ValueError like
+    `_normalize_date`. Only successful parses are memoized, at most
+    DATE_MEMO_SIZE of them.
+    """
+
+    def __init__(self, date_format: str) -> None:
+        if date_format not in _FORMAT_PATTERNS:
+            raise ValueError(f"Unsupported date format: {date_format} (expected one of {DATE_FORMATS})")
+        self.date_format = date_format
+        self._pattern = _FORMAT_PATTERNS[date_format]
+        self._memo: dict[str, str] = {}
+
+    def parse(self, value: str) -> str:
+        if not isinstance(value, str):
+            return _normalize_date(value)  # strptime raises its usual TypeError
+        iso = self._memo.get(value)
+        if iso is not None:
+            return iso
+        iso = _parse_with(self._pattern, value)
+        if iso is None:
+            other = _normalize_date(value)
+            raise DateFormatConflictError(
+                f"Date {value!r} conflicts with the file's date format {self.date_format} (would read as {other})"
+            )
+        if len(self._memo) < DATE_MEMO_SIZE:
+            self._memo[value] = iso
+        return iso
+
+
+def infer_date_format(values: Iterable[Any], sample_size: int = DATE_SAMPLE_SIZE) -> str:
+    """Pick the DATE_FORMATS entry that parses most of the first `sample_size` values."""
+    sample = Counter(v for v in islice(values, sample_size) if isinstance(v, str))
+    votes = dict.fromkeys(DATE_FORMATS, 0)
+    for value, count in sample.items():
+        for fmt, pattern in _FORMAT_PATTERNS.items():
+            if _parse_with(pattern, value) is not None:
+                votes[fmt] += count
+    return max(DATE_FORMATS, key=lambda fmt: votes[fmt])  # max keeps the first on ties
+
+
+def date_parser_for(values: Iterable[Any], date_format: str | None = None) -> DateParser:
+    """Parser for an explicit format, or one inferred from `values`."""
+    return DateParser(date_format or infer_date_format(values))
+
+
+def iter_validated(
+    rows: Iterable[dict[str, Any]],
+    required_columns: list[str],
+    *,
+    date_parser: DateParser,
+    anomalies: list[dict[str, Any]],
+    quarantined: list[dict[str, Any]] | None = None,
+    start: int = 0,
+) -> Iterator[tuple[dict[str, Any], str]]:
+    """Yield (raw_row, iso_date) per row without copying the row.
+
+    Used by the record-based engine; anomalies are appended to `anomalies`
+    (each with a copy of the row carrying the normalized date). With a
+    `quarantined` list, invalid rows are recorded there (row_index counted
+    from `start`) instead of raising.
+    """
+    date_col = required_columns[0]
+    parse_date = date_parser.parse
+    for index, r in enumerate(rows, start):
+        try:
+            if any(col not in r for col in required_columns):
+                raise ValueError(f"Missing required columns in row: {r}")
+            # Date normalization
+            iso = parse_date(r[date_col])
+        except (ValueError, TypeError) as e:
+            if quarantined is None:
+                raise
+            quarantined.append({"row_index": index, "row": r, "reason": str(e)})
+            continue
         # Soft anomaly: zero amount row (if Amount column present and zero)
         amount_col = None
         for c in ("Amount", "amount", "AMOUNT"):
@@ -44,12 +154,43 @@ def validate_rows(rows: list[dict[str, Any]], required_columns: list[str]) -> tu
                 amount_col = c
                 break
         if amount_col and str(r[amount_col]).strip() in ("0", "0.0", "0.00"):
-            anomalies.append({"type": "zero_amount", "row": r})
-        cleaned.append(r)
-        missing_cols -= {c for c in required_columns if c in r}
-    if missing_cols:
-        # If any column missing globally (should already be caught per-row)
-        raise ValueError(f"Required columns missing: {missing_cols}")
+            anomalies.append({"type": "zero_amount", "row": {**r, date_col: iso}})
+        yield r, iso
+
+
+def validate_rows(
+    rows: list[dict[str, Any]],
+    required_columns: list[str],
+    *,
+    date_format: str | None = None,
+    date_parser: DateParser | None = None,
+    quarantined: list[dict[str, Any]] | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Validate rows; dates parse with `date_parser`, else `date_format`, else the inferred format.
+
+    Pass one `date_parser` across calls to keep a single format (and memo)
+    for a file processed in chunks. Pass `quarantined` for tolerant mode.
+    """
+    if not rows:
+        raise ValueError("No rows extracted (empty input)")
+    date_col = required_columns[0]
+    if date_parser is None:
+        date_parser = date_parser_for((r.get(date_col) for r in rows), date_format)
+    anomalies: list[dict[str, Any]] = []
+    cleaned = [
+        {**r, date_col: iso}
+        for r, iso in iter_validated(
+            rows, required_columns, date_parser=date_parser, anomalies=anomalies, quarantined=quarantined
+        )
+    ]
     return cleaned, anomalies
 
-__all__ = ["validate_rows"]
+__all__ = [
+    "validate_rows",
+    "iter_validated",
+    "DateParser",
+    "DateFormatConflictError",
+    "infer_date_format",
+    "date_parser_for",
+    "DATE_FORMATS",
+]
@@ -0,0 +1,151 @@
+"""Shared SQLite connection manager.
+
+Repositories used to open (and close) a connection per call, each time with
+SQLite's defaults: rollback journal, synchronous=FULL, a 2 MB page cache and
+no statement reuse. `connection(db_path)` instead hands out one cached
+connection per database and thread, opened once with:
+
+ - journal_mode=WAL (readers no longer block the writer) and
+   synchronous=NORMAL (no fsync per commit; durable at checkpoints, safe
+   against corruption in WAL mode),
+ - a larger page cache, memory-mapped reads and in-memory temp storage,
+ - a busy timeout and a larger per-connection prepared statement cache.
+
+Usage mirrors the former `connect` / `try` / `finally: close()` blocks:
+
+    with connection(db_path) as con:
+        con.execute(...)
+        con.commit()
+
+Work left uncommitted when the outermost block exits is rolled back, as
+closing the connection used to discard it; nested blocks on the same thread
+share the connection and its transaction. Each thread keeps at most
+MAX_CACHED_CONNECTIONS databases open (least recently used closed first). A
+cached connection is reopened when its database file was deleted or
+replaced, and a forked child never reuses connections inherited from the
+parent. ":memory:" databases are not cached.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+BUSY_TIMEOUT_S = 5.0
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection (sqlite3 default: 128)
+MAX_CACHED_CONNECTIONS = 8  # per thread
+PRAGMAS: tuple[tuple[str, str | int], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -32768),  # negative = KiB: 32 MiB page cache
+    ("mmap_size", 268435456),  # 256 MiB
+    ("temp_store", "MEMORY"),
+)
+
+_MEMORY = ":memory:"
+
+
+class _Entry:
+    __slots__ = ("con", "file_id", "depth")
+
+    def __init__(self, con: sqlite3.Connection, file_id: tuple[int, int] | None) -> None:
+        self.con = con
+        self.file_id = file_id
+        self.depth = 0  # open `connection()` blocks using this entry
+
+
+def _after_fork_in_child(state: SimpleNamespace) -> None:
+    # The parent's connections must be neither used nor closed in the child: park them
+    state.inherited.append(state.local)
+    state.local = threading.local()
+
+
+_state = SimpleNamespace(local=threading.local(), inherited=[])
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _after_fork_in_child(_state))
+
+
+def _cache() -> OrderedDict[str, _Entry]:
+    cache = getattr(_state.local, "connections", None)
+    if cache is None:
+        cache = _state.local.connections = OrderedDict()
+    return cache
+
+
+def _file_id(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+def open_connection(db_path: str | os.PathLike[str]) -> sqlite3.Connection:
+    """New (uncached) connection with the manager's pragmas applied."""
+    con = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_S, cached_statements=STATEMENT_CACHE_SIZE)
+    for name, value in PRAGMAS:
+        con.execute(f"PRAGMA {name}={value}")
+    return con
+
+
+def _checkout(path: str) -> _Entry:
+    cache = _cache()
+    entry = cache.get(path)
+    if entry is not None:
+        if entry.depth or entry.file_id == _file_id(path):
+            cache.move_to_end(path)
+            return entry
+        del cache[path]  # file deleted or replaced underneath the cached connection
+        entry.con.close()
+    con = open_connection(path)
+    entry = cache[path] = _Entry(con, _file_id(path))
+    idle = [key for key, e in cache.items() if e.depth == 0 and key != path]
+    for key in idle[: max(0, len(cache) - MAX_CACHED_CONNECTIONS)]:
+        cache.pop(key).con.close()
+    return entry
+
+
+@contextmanager
+def connection(db_path: str | os.PathLike[str]) -> Iterator[sqlite3.Connection]:
+    """This thread's cached connection to `db_path` for the duration of the block."""
+    path = os.fspath(db_path)
+    if path == _MEMORY or not path:
+        con = open_connection(path or _MEMORY)
+        try:
+            yield con
+        finally:
+            con.close()
+        return
+    entry = _checkout(os.path.abspath(path))
+    entry.depth += 1
+    try:
+        yield entry.con
+    finally:
+        entry.depth -= 1
+        if entry.depth == 0 and entry.con.in_transaction:
+            entry.con.rollback()
+
+
+def close_connections() -> int:
+    """Close this thread's cached connections (e.g. before deleting a database); returns count."""
+    cache = _cache()
+    closed = 0
+    for key in [k for k, e in cache.items() if e.depth == 0]:
+        cache.pop(key).con.close()
+        closed += 1
+    return closed
+
+
+__all__ = [
+    "connection",
+    "open_connection",
+    "close_connections",
+    "PRAGMAS",
+    "BUSY_TIMEOUT_S",
+    "STATEMENT_CACHE_SIZE",
+    "MAX_CACHED_CONNECTIONS",
+]
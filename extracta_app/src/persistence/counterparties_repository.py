@@ -1,13 +1,74 @@
 """Counterparties repository (Feature 002).
 
 Supports canonical counterparty creation, rename, merge.
+
+`merge` is set-based: losing ids are reassigned and deleted with
+`UPDATE ... IN` / `DELETE ... IN` statements (chunked below SQLite's bound
+variable limit) in one transaction, served by the
+transactions(counterparty_id, transaction_date) index (schema v10).
+
+Activity figures (transaction count, totals, first/last date) come from
+`counterparty_stats` (schema v12); `list_counterparties_page` pages through
+it without touching transactions. Activity sorts walk the stats indexes, so
+they only list counterparties that have transactions.
+
+The stats have no per-row triggers: every writer of counterparty_id folds
+the rows it touches in with one aggregate upsert per call
+(`add_counterparty_stats`, or `remove_counterparty_stats` then
+`settle_counterparty_stats` around deletes; `merge` combines stats rows
+directly). Totals are integer cents, so the running sums stay exact.
+Rows written to `transactions` directly are not counted until
+`rebuild_counterparty_stats` runs.
 """
 from __future__ import annotations
 
 import sqlite3
-from typing import Any, Dict, List, Sequence
+from collections.abc import Sequence
+from typing import Any
+
+from src.logging.json_logger import emit_log_event
+from src.persistence.connection import connection
+from src.persistence.migrations import COUNTERPARTY_STATS_AGGREGATE
 
-from extracta_app.src.logging.json_logger import emit_log_event
+MERGE_CHUNK = 500  # ids per IN (...) list
+
+_PAGE_SELECT = (
+    "SELECT c.counterparty_id, c.name, c.name_normalized, COALESCE(s.tx_count, 0), COALESCE(s.total_in_cents, 0),"
+    " COALESCE(s.total_out_cents, 0), s.first_date, s.last_date"
+)
+_PAGE_QUERIES = {
+    "transactions": _PAGE_SELECT + " FROM counterparty_stats s JOIN counterparties c"
+    " ON c.counterparty_id = s.counterparty_id ORDER BY s.tx_count DESC, s.counterparty_id DESC LIMIT ? OFFSET ?",
+    "last_seen": _PAGE_SELECT + " FROM counterparty_stats s JOIN counterparties c"
+    " ON c.counterparty_id = s.counterparty_id ORDER BY s.last_date DESC, s.counterparty_id DESC LIMIT ? OFFSET ?",
+    "name": _PAGE_SELECT + " FROM counterparties c LEFT JOIN counterparty_stats s"
+    " ON s.counterparty_id = c.counterparty_id ORDER BY c.name, c.counterparty_id LIMIT ? OFFSET ?",
+}
+PAGE_SORTS = tuple(_PAGE_QUERIES)
+
+_STATS_COLUMNS = "counterparty_stats(counterparty_id, tx_count, total_in_cents, total_out_cents, first_date, last_date)"
+_STATS_ACCUMULATE = (
+    " ON CONFLICT(counterparty_id) DO UPDATE SET tx_count = tx_count + excluded.tx_count,"
+    " total_in_cents = total_in_cents + excluded.total_in_cents,"
+    " total_out_cents = total_out_cents + excluded.total_out_cents,"
+    " first_date = MIN(first_date, excluded.first_date), last_date = MAX(last_date, excluded.last_date)"
+)
+# The WHERE before ON CONFLICT is required by SQLite's upsert-from-SELECT grammar
+_STATS_ADD_SQL = (
+    f"INSERT INTO {_STATS_COLUMNS} {COUNTERPARTY_STATS_AGGREGATE} AND ({{where}}) GROUP BY counterparty_id"
+    + _STATS_ACCUMULATE
+)
+# A first / last date on the removed range is cleared, for settle_counterparty_stats
+# to look up once the rows are gone
+_STATS_REMOVE_SQL = (
+    f"INSERT INTO {_STATS_COLUMNS} {COUNTERPARTY_STATS_AGGREGATE} AND ({{where}}) GROUP BY counterparty_id"
+    " ON CONFLICT(counterparty_id) DO UPDATE SET tx_count = tx_count - excluded.tx_count,"
+    " total_in_cents = total_in_cents - excluded.total_in_cents,"
+    " total_out_cents = total_out_cents - excluded.total_out_cents,"
+    " first_date = CASE WHEN excluded.first_date > first_date THEN first_date END,"
+    " last_date = CASE WHEN excluded.last_date < last_date THEN last_date END"
+    " RETURNING counterparty_id"
+)
 
 
 class RenameCollisionError(RuntimeError):
@@ -15,8 +76,7 @@ class RenameCollisionError(RuntimeError):
 
 
 def get_or_create(db_path: str, *, display_name: str, normalized: str) -> int:
-    con = sqlite3.connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute("SELECT counterparty_id FROM counterparties WHERE name_normalized=?", (normalized,))
         row = cur.fetchone()
         if row:
@@ -28,13 +88,10 @@ def get_or_create(db_path: str, *, display_name: str, normalized: str) -> int:
         con.commit()
         cur2 = con.execute("SELECT counterparty_id FROM counterparties WHERE name_normalized=?", (normalized,))
         return int(cur2.fetchone()[0])
-    finally:
-        con.close()
 
 
-def list_counterparties(db_path: str) -> List[Dict[str, Any]]:
-    con = sqlite3.connect(db_path)
-    try:
+def list_counterparties(db_path: str) -> list[dict[str, Any]]:
+    with connection(db_path) as con:
         cur = con.execute(
             "SELECT counterparty_id, name, name_normalized, created_at FROM counterparties ORDER BY name"
         )
@@ -47,14 +104,86 @@ def list_counterparties(db_path: str) -> List[Dict[str, Any]]:
             }
             for r in cur.fetchall()
         ]
-    finally:
-        con.close()
+
+
+def count_counterparties(db_path: str, *, active_only: bool = False) -> int:
+    """Number of counterparties (with `active_only`, those with transactions)."""
+    table = "counterparty_stats" if active_only else "counterparties"
+    with connection(db_path) as con:
+        return int(con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+
+
+def list_counterparties_page(
+    db_path: str, *, sort: str = "transactions", limit: int = 50, offset: int = 0
+) -> list[dict[str, Any]]:
+    """One page of counterparties with their activity figures.
+
+    sort: "transactions" (most first), "last_seen" (most recent first) or
+    "name". The activity sorts skip counterparties without transactions.
+    """
+    if sort not in _PAGE_QUERIES:
+        raise ValueError(f"Unknown sort {sort!r}; expected one of {PAGE_SORTS}")
+    with connection(db_path) as con:
+        cur = con.execute(_PAGE_QUERIES[sort], (limit, offset))
+        return [
+            {
+                "counterparty_id": r[0],
+                "name": r[1],
+                "name_normalized": r[2],
+                "tx_count": r[3],
+                "total_in": r[4] / 100,
+                "total_out": r[5] / 100,
+                "first_date": r[6],
+                "last_date": r[7],
+            }
+            for r in cur.fetchall()
+        ]
+
+
+def rebuild_counterparty_stats(db_path: str) -> int:
+    """Recompute counterparty_stats from transactions; returns rows written."""
+    with connection(db_path) as con:
+        with con:
+            con.execute("DELETE FROM counterparty_stats")
+            cur = con.execute(f"INSERT INTO {_STATS_COLUMNS} {COUNTERPARTY_STATS_AGGREGATE} GROUP BY counterparty_id")
+        return cur.rowcount
+
+
+def add_counterparty_stats(con: sqlite3.Connection, where: str, params: Sequence[Any] = ()) -> None:
+    """Count the transactions matching `where` into counterparty_stats on `con` (no commit)."""
+    con.execute(_STATS_ADD_SQL.format(where=where), params)
+
+
+def remove_counterparty_stats(con: sqlite3.Connection, where: str, params: Sequence[Any] = ()) -> list[int]:
+    """Take the transactions matching `where` out of counterparty_stats on `con` (no commit).
+
+    Call before those rows are deleted or reassigned, then pass the returned
+    counterparty ids to `settle_counterparty_stats` afterwards.
+    """
+    return [r[0] for r in con.execute(_STATS_REMOVE_SQL.format(where=where), params).fetchall()]
+
+
+def settle_counterparty_stats(con: sqlite3.Connection, counterparty_ids: Sequence[int]) -> None:
+    """Fill the cleared first / last dates of `counterparty_ids` and drop emptied stats rows (no commit)."""
+    for start in range(0, len(counterparty_ids), MERGE_CHUNK):
+        chunk = counterparty_ids[start:start + MERGE_CHUNK]
+        marks = ",".join("?" * len(chunk))
+        con.execute(f"DELETE FROM counterparty_stats WHERE counterparty_id IN ({marks}) AND tx_count <= 0", chunk)
+        # One probe of the (counterparty_id, transaction_date) index per cleared date
+        con.execute(
+            "UPDATE counterparty_stats SET"
+            " first_date = COALESCE(first_date, (SELECT MIN(transaction_date) FROM transactions t"
+            " WHERE t.counterparty_id = counterparty_stats.counterparty_id)),"
+            " last_date = COALESCE(last_date, (SELECT MAX(transaction_date) FROM transactions t"
+            " WHERE t.counterparty_id = counterparty_stats.counterparty_id))"
+            f" WHERE counterparty_id IN ({marks}) AND (first_date IS NULL OR last_date IS NULL)",
+            chunk,
+        )
 
 
 def rename(db_path: str, *, counterparty_id: int, new_display_name: str) -> None:
     normalized = new_display_name.lower()
-    con = sqlite3.connect(db_path)
-    try:
+    with connection(db_path) as con:
         # Collision check
         cur = con.execute(
             "SELECT counterparty_id FROM counterparties WHERE name_normalized=?", (normalized,)
@@ -72,29 +201,31 @@ def rename(db_path: str, *, counterparty_id: int, new_display_name: str) -> None
             "counterparty_id": counterparty_id,
             "new_name": new_display_name,
         })
-    finally:
-        con.close()
 
 
 def merge(db_path: str, *, winner_id: int, losing_ids: Sequence[int]) -> int:
-    if not losing_ids:
+    losers = list(dict.fromkeys(i for i in losing_ids if i != winner_id))
+    if not losers:
         return 0
-    con = sqlite3.connect(db_path)
-    try:
+    with connection(db_path) as con:
         reassigned_total = 0
-        for losing in losing_ids:
-            if losing == winner_id:
-                continue
-            cur = con.execute(
-                "UPDATE transactions SET counterparty_id=? WHERE counterparty_id=?",
-                (winner_id, losing),
-            )
-            reassigned = cur.rowcount or 0
-            reassigned_total += reassigned
-            con.execute(
-                "DELETE FROM counterparties WHERE counterparty_id=?", (losing,)
-            )
-        con.commit()
+        with con:  # one transaction: all-or-nothing
+            for start in range(0, len(losers), MERGE_CHUNK):
+                chunk = losers[start:start + MERGE_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                # Fold the losers' stats into the winner; their rows go with the counterparties (trigger)
+                con.execute(
+                    f"INSERT INTO {_STATS_COLUMNS} SELECT ?, SUM(tx_count), SUM(total_in_cents),"
+                    " SUM(total_out_cents), MIN(first_date), MAX(last_date) FROM counterparty_stats"
+                    f" WHERE counterparty_id IN ({marks}) HAVING COUNT(*) > 0" + _STATS_ACCUMULATE,
+                    (winner_id, *chunk),
+                )
+                cur = con.execute(
+                    f"UPDATE transactions SET counterparty_id=? WHERE counterparty_id IN ({marks})",
+                    (winner_id, *chunk),
+                )
+                reassigned_total += cur.rowcount or 0
+                con.execute(f"DELETE FROM counterparties WHERE counterparty_id IN ({marks})", chunk)
         emit_log_event({
             "event": "counterparty_merge",
             "winner_id": winner_id,
@@ -102,13 +233,18 @@ def merge(db_path: str, *, winner_id: int, losing_ids: Sequence[int]) -> int:
             "reassigned_tx_count": reassigned_total,
         })
         return reassigned_total
-    finally:
-        con.close()
 
 
 __all__ = [
     "get_or_create",
     "list_counterparties",
+    "count_counterparties",
+    "list_counterparties_page",
+    "rebuild_counterparty_stats",
+    "add_counterparty_stats",
+    "remove_counterparty_stats",
+    "settle_counterparty_stats",
+    "PAGE_SORTS",
     "rename",
     "merge",
     "RenameCollisionError",
@@ -1,25 +1,40 @@
 """Documents repository (Feature 002).
 
 Provides CRUD style operations for documents table introduced in schema v2.
-Deletion cascades (manually) all transactions referencing the file hash.
+Deletion cascades (manually) all transactions, the cached raw artifact and
+the perceptual image hash referencing the file hash.
+Schema v4 adds an indexed `fingerprint` column (see common.hashing.file_fingerprint)
+so duplicate checks can avoid full-file hashing for brand-new files.
 """
 from __future__ import annotations
 
-import sqlite3
-from typing import Any, List, Dict
+from collections.abc import Sequence
+from typing import Any
 
-from extracta_app.src.logging.json_logger import emit_log_event
+from src.logging.json_logger import emit_log_event
+from src.persistence.connection import connection
+from src.persistence.counterparties_repository import remove_counterparty_stats, settle_counterparty_stats
+from src.persistence.transactions_repository import unindex_document_transactions
 
+HASH_LOOKUP_CHUNK = 500  # file hashes per IN (...) lookup
 
-def create_document(db_path: str, *, filename: str, file_hash: str, document_type: str, status: str = "Success") -> int:
-    con = sqlite3.connect(db_path)
-    try:
+
+def create_document(
+    db_path: str,
+    *,
+    filename: str,
+    file_hash: str,
+    document_type: str,
+    status: str = "Success",
+    fingerprint: str | None = None,
+) -> int:
+    with connection(db_path) as con:
         cur = con.execute(
             """
-            INSERT OR IGNORE INTO documents(filename, file_hash, document_type, status)
-            VALUES (?,?,?,?)
+            INSERT OR IGNORE INTO documents(filename, file_hash, document_type, status, fingerprint)
+            VALUES (?,?,?,?,?)
             """,
-            (filename, file_hash, document_type, status),
+            (filename, file_hash, document_type, status, fingerprint),
         )
         con.commit()
         if cur.rowcount:
@@ -34,13 +49,10 @@ def create_document(db_path: str, *, filename: str, file_hash: str, document_typ
         cur2 = con.execute("SELECT document_id FROM documents WHERE file_hash=?", (file_hash,))
         row = cur2.fetchone()
         return int(row[0]) if row else -1
-    finally:
-        con.close()
 
 
-def list_documents(db_path: str) -> List[Dict[str, Any]]:
-    con = sqlite3.connect(db_path)
-    try:
+def list_documents(db_path: str) -> list[dict[str, Any]]:
+    with connection(db_path) as con:
         cur = con.execute(
             "SELECT document_id, filename, file_hash, upload_date, status, document_type FROM documents ORDER BY upload_date DESC"
         )
@@ -56,22 +68,81 @@ def list_documents(db_path: str) -> List[Dict[str, Any]]:
             }
             for r in rows
         ]
-    finally:
-        con.close()
+
+
+def find_fingerprint_candidates(db_path: str, fingerprint: str) -> tuple[list[str], bool]:
+    """Return (file hashes sharing `fingerprint`, whether legacy rows lack one).
+
+    Documents created before schema v4 have a NULL fingerprint and can only be
+    ruled out by a full-hash comparison, hence the second element.
+    """
+    with connection(db_path) as con:
+        cur = con.execute("SELECT file_hash FROM documents WHERE fingerprint=?", (fingerprint,))
+        hashes = [r[0] for r in cur.fetchall()]
+        cur = con.execute("SELECT 1 FROM documents WHERE fingerprint IS NULL LIMIT 1")
+        return hashes, cur.fetchone() is not None
+
+
+def get_document_by_file_hash(db_path: str, file_hash: str) -> dict[str, Any] | None:
+    with connection(db_path) as con:
+        cur = con.execute(
+            "SELECT document_id, filename, file_hash, upload_date, status, document_type FROM documents WHERE file_hash=?",
+            (file_hash,),
+        )
+        r = cur.fetchone()
+        if r is None:
+            return None
+        return {
+            "document_id": r[0],
+            "filename": r[1],
+            "file_hash": r[2],
+            "upload_date": r[3],
+            "status": r[4],
+            "document_type": r[5],
+        }
+
+
+def find_documents_by_file_hashes(db_path: str, file_hashes: Sequence[str]) -> dict[str, dict[str, Any]]:
+    """Stored documents among `file_hashes`, keyed by file hash (one indexed lookup per chunk)."""
+    found: dict[str, dict[str, Any]] = {}
+    with connection(db_path) as con:
+        for start in range(0, len(file_hashes), HASH_LOOKUP_CHUNK):
+            chunk = file_hashes[start:start + HASH_LOOKUP_CHUNK]
+            cur = con.execute(
+                "SELECT document_id, filename, file_hash, upload_date, status, document_type FROM documents "
+                f"WHERE file_hash IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for r in cur.fetchall():
+                found[r[2]] = {
+                    "document_id": r[0],
+                    "filename": r[1],
+                    "file_hash": r[2],
+                    "upload_date": r[3],
+                    "status": r[4],
+                    "document_type": r[5],
+                }
+    return found
 
 
 def delete_document_by_file_hash(db_path: str, file_hash: str) -> int:
-    """Delete document and all transactions referencing it.
+    """Delete document and all transactions referencing it (plus its cached
+    raw artifact, quarantined rows and perceptual image hash).
 
     Returns number of removed transactions.
     """
-    con = sqlite3.connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur_cnt = con.execute(
             "SELECT COUNT(*) FROM transactions WHERE source_file_hash=?", (file_hash,)
         )
         tx_count = int(cur_cnt.fetchone()[0])
+        unindex_document_transactions(con, file_hash)
+        touched = remove_counterparty_stats(con, "source_file_hash=?", (file_hash,))
         con.execute("DELETE FROM transactions WHERE source_file_hash=?", (file_hash,))
+        settle_counterparty_stats(con, touched)
+        con.execute("DELETE FROM raw_artifacts WHERE file_hash=?", (file_hash,))
+        con.execute("DELETE FROM quarantined_rows WHERE source_file_hash=?", (file_hash,))
+        con.execute("DELETE FROM image_hashes WHERE file_hash=?", (file_hash,))
         con.execute("DELETE FROM documents WHERE file_hash=?", (file_hash,))
         con.commit()
         emit_log_event({
@@ -80,12 +151,13 @@ def delete_document_by_file_hash(db_path: str, file_hash: str) -> int:
             "removed_tx_count": tx_count,
         })
         return tx_count
-    finally:
-        con.close()
 
 
 __all__ = [
     "create_document",
     "list_documents",
+    "find_fingerprint_candidates",
+    "get_document_by_file_hash",
+    "find_documents_by_file_hashes",
     "delete_document_by_file_hash",
 ]
@@ -0,0 +1,66 @@
+"""Image perceptual hash repository (schema v3).
+
+Stores one dHash per image document (keyed by SHA256 file hash) and answers
+"is there an already ingested image within Hamming distance N?" queries.
+
+Lookup strategy: the 64-bit hash is stored as four 16-bit indexed bands. For
+thresholds below the band count any match must share at least one band
+exactly, so candidates come from indexed equality lookups and are then
+verified by exact Hamming distance. Larger thresholds fall back to a scan.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from src.common.perceptual_hash import BAND_COUNT, hamming_distance, hash_to_hex, hex_to_hash, split_bands
+from src.persistence.connection import connection
+
+DEFAULT_MAX_DISTANCE = 3  # bits out of 64; must stay < BAND_COUNT for indexed lookup
+
+
+def record_image_hash(db_path: str, *, file_hash: str, filename: str, phash: int) -> None:
+    """Insert (or refresh) the perceptual hash for an image document."""
+    bands = split_bands(phash)
+    with connection(db_path) as con:
+        con.execute(
+            """
+            INSERT OR REPLACE INTO image_hashes(file_hash, filename, phash, band0, band1, band2, band3)
+            VALUES (?,?,?,?,?,?,?)
+            """,
+            (file_hash, filename, hash_to_hex(phash), *bands),
+        )
+        con.commit()
+
+
+def find_near_duplicates(
+    db_path: str,
+    phash: int,
+    *,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    exclude_file_hash: str | None = None,
+) -> list[dict[str, Any]]:
+    """Return stored images within `max_distance` bits of `phash`, closest first."""
+    if max_distance < 0:
+        raise ValueError("max_distance must be >= 0")
+    with connection(db_path) as con:
+        if max_distance < BAND_COUNT:
+            bands = split_bands(phash)
+            cur = con.execute(
+                "SELECT file_hash, filename, phash FROM image_hashes "
+                "WHERE band0=? OR band1=? OR band2=? OR band3=?",
+                bands,
+            )
+        else:
+            cur = con.execute("SELECT file_hash, filename, phash FROM image_hashes")
+        matches: list[dict[str, Any]] = []
+        for file_hash, filename, stored in cur.fetchall():
+            if file_hash == exclude_file_hash:
+                continue
+            distance = hamming_distance(phash, hex_to_hash(stored))
+            if distance <= max_distance:
+                matches.append({"file_hash": file_hash, "filename": filename, "distance": distance})
+        matches.sort(key=lambda m: (m["distance"], m["file_hash"]))
+        return matches
+
+
+__all__ = ["record_image_hash", "find_near_duplicates", "DEFAULT_MAX_DISTANCE"]
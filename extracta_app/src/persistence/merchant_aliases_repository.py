@@ -0,0 +1,102 @@
+"""Merchant alias dictionary repository (schema v8).
+
+Curated aliases map statement fragments ("AMZN MKTP") to a canonical
+counterparty name ("Amazon"). Aliases are keyed by their normalized text
+(`normalize_alias_text`: lowercase, runs of non-alphanumerics collapsed to
+one space), which is also how descriptions are normalized before matching.
+Every change bumps `merchant_alias_state.revision` through triggers; the
+compiled matcher (`src.normalization.merchant_aliases`) rebuilds only when
+the revision moves.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+from src.logging.json_logger import emit_log_event
+from src.persistence.connection import connection
+
+_NON_ALNUM_RUN = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_alias_text(text: str) -> str:
+    return _NON_ALNUM_RUN.sub(" ", text.lower()).strip()
+
+
+def upsert_aliases(db_path: str, aliases: Iterable[tuple[str, str]]) -> int:
+    """Insert or update (alias, canonical_name) pairs; returns pairs written.
+
+    Aliases that normalize to an empty string are ignored.
+    """
+    params = []
+    for alias, canonical in aliases:
+        key = normalize_alias_text(alias)
+        if key and canonical.strip():
+            params.append((alias, key, canonical.strip()))
+    if not params:
+        return 0
+    with connection(db_path) as con:
+        con.executemany(
+            """
+            INSERT INTO merchant_aliases(alias, alias_normalized, canonical_name) VALUES (?,?,?)
+            ON CONFLICT(alias_normalized) DO UPDATE SET alias=excluded.alias, canonical_name=excluded.canonical_name
+            WHERE merchant_aliases.canonical_name IS NOT excluded.canonical_name
+            """,
+            params,
+        )
+        con.commit()
+    emit_log_event({"event": "merchant_alias_upsert", "alias_count": len(params)})
+    return len(params)
+
+
+def delete_alias(db_path: str, alias_id: int) -> bool:
+    with connection(db_path) as con:
+        cur = con.execute("DELETE FROM merchant_aliases WHERE alias_id=?", (alias_id,))
+        con.commit()
+        return cur.rowcount > 0
+
+
+def list_aliases(db_path: str) -> list[dict[str, Any]]:
+    with connection(db_path) as con:
+        cur = con.execute(
+            "SELECT alias_id, alias, alias_normalized, canonical_name, created_at FROM merchant_aliases "
+            "ORDER BY canonical_name, alias_normalized"
+        )
+        return [
+            {
+                "alias_id": r[0],
+                "alias": r[1],
+                "alias_normalized": r[2],
+                "canonical_name": r[3],
+                "created_at": r[4],
+            }
+            for r in cur.fetchall()
+        ]
+
+
+def alias_revision(db_path: str) -> int:
+    """Current alias table revision (bumped by triggers on every change)."""
+    with connection(db_path) as con:
+        row = con.execute("SELECT revision FROM merchant_alias_state WHERE id = 1").fetchone()
+        return int(row[0]) if row else 0
+
+
+def load_alias_snapshot(db_path: str) -> tuple[int, list[tuple[str, str]]]:
+    """(revision, [(alias_normalized, canonical_name)]) read consistently in one transaction."""
+    with connection(db_path) as con:
+        con.execute("BEGIN")
+        row = con.execute("SELECT revision FROM merchant_alias_state WHERE id = 1").fetchone()
+        pairs = con.execute("SELECT alias_normalized, canonical_name FROM merchant_aliases").fetchall()
+        con.rollback()
+        return (int(row[0]) if row else 0), pairs
+
+
+__all__ = [
+    "normalize_alias_text",
+    "upsert_aliases",
+    "delete_alias",
+    "list_aliases",
+    "alias_revision",
+    "load_alias_snapshot",
+]
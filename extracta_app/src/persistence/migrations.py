@@ -12,6 +12,90 @@ Schema version 2 additions (Feature 002):
     - transactions.counterparty_id column (nullable; FK logical relation)
     - Backfill documents from existing transactions distinct (source_file, source_file_hash)
 
+Schema version 3 additions:
+    - image_hashes (perceptual dHash per image document, banded for indexed
+      near-duplicate lookup)
+
+Schema version 4 additions:
+    - documents.fingerprint column (size + head/tail block hash) with index,
+      used as a cheap prefilter before full-file SHA256 duplicate checks
+
+Schema version 5 additions:
+    - raw_artifacts (parsed pre-normalization rows + header map per document)
+      so documents can be re-normalized when mapping/logic versions change
+    - transactions(source_file_hash) index for per-document lookups and swaps
+
+Schema version 6 additions:
+    - quarantined_rows (rows rejected by tolerant-mode validation, with the
+      reason, kept per document + row index for later bulk replay)
+
+Schema version 7 additions:
+    - partial index on transactions(source_file_hash) covering only rows still
+      awaiting counterparty derivation (counterparty NULL / '' / 'Unknown'),
+      so derivation reads pending rows (optionally of one document) directly
+
+Schema version 8 additions:
+    - merchant_aliases (curated alias -> canonical counterparty name)
+    - merchant_alias_state (single-row revision counter bumped by triggers on
+      any alias change, so the compiled alias matcher is rebuilt only then)
+
+Schema version 9 additions:
+    - counterparty_signatures (MinHash signature per counterparty name)
+    - counterparty_lsh_buckets (LSH band buckets, indexed by (band, bucket))
+    - triggers dropping a counterparty's signature / buckets when it is
+      deleted (merge) or its normalized name changes (rename), so refreshes
+      only (re)compute missing signatures
+
+Schema version 10 additions:
+    - transactions(counterparty_id, transaction_date) index (set-based
+      counterparty merge, per-counterparty lookups, and the v12 first/last
+      date recomputation when a boundary transaction leaves a counterparty)
+
+Schema version 11 additions (only when SQLite is built with FTS5; search
+falls back to LIKE scans otherwise):
+    - counterparties_fts / transactions_fts: FTS5 tables with the trigram
+      tokenizer over counterparties.name and transactions.description
+      (substring search), built from existing rows once.
+      counterparties_fts is external-content, kept in sync by triggers.
+      transactions_fts keeps its own copy of the descriptions and is synced
+      in batches by transactions_repository (one INSERT ... SELECT per write
+      call): per-row triggers cut bulk insert throughput ~5x, and an own
+      copy lets rows missing from the index be deleted without corrupting it
+
+Schema version 12 additions:
+    - counterparty_stats (per counterparty: transaction count, total in/out
+      in integer cents, first/last transaction date), backfilled once and
+      then maintained in batches by the repositories that write
+      counterparty_id (one aggregate upsert per write call, see
+      counterparties_repository); per-row triggers cut derivation
+      throughput ~4.7x and document deletes ~1.8x. Keyed by id, so renames
+      need no maintenance; a counterparty delete drops its row (trigger)
+    - counterparty_stats(tx_count) / (last_date) indexes for activity sorts
+
+Schema version 13 additions (deletes by source_file_hash and merges by
+counterparty_id are served by the v5 / v10 indexes):
+    - two covering report indexes over transactions, so no report reads the
+      wide table rows:
+      (transaction_date, year, month, category_id, amount_in, amount_out):
+      date range filters seek it, unfiltered shapes scan it;
+      (category_id, month, year, amount_in, amount_out): the category
+      in-use check (categorization.service.delete_category) and
+      category_ids filters seek it, by-category groupings scan it in order.
+      A narrow (category_id, month) index was tried: the planner then walks
+      it for category groupings with a table lookup per row (by category
+      226 -> 529 ms, two categories by month 32 -> 65 ms at 300k rows)
+    - measured at 300k rows: one quarter by month 41 -> 8 ms, two
+      categories by month 40 -> 8 ms, by category 170 -> 30 ms, category
+      in-use check 27 -> <0.1 ms (medians, tests/performance/
+      test_report_query_perf.py). Bulk insert, 100k rows into 100k: 35.6k
+      rows/s without report indexes, 34.1k with the date index, 28.2k with
+      both (narrow category variant: 30.5k); 20k rows into 300k: ~46k ->
+      ~29k rows/s with both
+    - built with a temporarily enlarged page cache for the index sort,
+      followed by ANALYZE of transactions (sampled via analysis_limit) so
+      the planner picks it on large databases; both pragmas are restored,
+      as the migration runs on the shared cached connection
+
 Design Principles:
  - Idempotent: safe to call multiple times.
  - Forward-only: version increments, no downgrade path (append-only philosophy).
@@ -20,10 +104,12 @@ Design Principles:
 from __future__ import annotations
 
 import sqlite3
-from typing import Iterable
+from collections.abc import Callable, Iterable
 from pathlib import Path
 
-CURRENT_SCHEMA_VERSION = 2  # bump when new structural elements added
+from src.persistence.connection import connection
+
+CURRENT_SCHEMA_VERSION = 13  # bump when new structural elements added
 CURRENT_APP_VERSION = "0.1.0"
 
 BASE_DDL: list[str] = [
@@ -86,6 +172,183 @@ V2_DDL: list[str] = [
 ]
 
 
+# v3 perceptual hashes (near-duplicate image detection)
+V3_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS image_hashes (
+        file_hash TEXT PRIMARY KEY,
+        filename TEXT NOT NULL,
+        phash TEXT NOT NULL,
+        band0 INTEGER NOT NULL,
+        band1 INTEGER NOT NULL,
+        band2 INTEGER NOT NULL,
+        band3 INTEGER NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ','now'))
+    );""",
+    "CREATE INDEX IF NOT EXISTS idx_image_hashes_band0 ON image_hashes(band0)",
+    "CREATE INDEX IF NOT EXISTS idx_image_hashes_band1 ON image_hashes(band1)",
+    "CREATE INDEX IF NOT EXISTS idx_image_hashes_band2 ON image_hashes(band2)",
+    "CREATE INDEX IF NOT EXISTS idx_image_hashes_band3 ON image_hashes(band3)",
+]
+
+
+# v4 documents fingerprint prefilter (column added conditionally, see _apply_v4)
+V4_DDL: list[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_documents_fingerprint ON documents(fingerprint)",
+]
+
+
+# v5 raw artifact cache for re-normalization
+V5_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS raw_artifacts (
+        file_hash TEXT PRIMARY KEY,
+        source_file TEXT NOT NULL,
+        header_map TEXT NOT NULL,
+        rows TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ','now'))
+    );""",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_source_file_hash ON transactions(source_file_hash)",
+]
+
+V6_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS quarantined_rows (
+        quarantine_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source_file_hash TEXT NOT NULL,
+        source_file TEXT NOT NULL,
+        row_index INTEGER NOT NULL,
+        row TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ','now')),
+        UNIQUE(source_file_hash, row_index)
+    );""",
+]
+
+# Must match counterparty_derivation's filter verbatim for the planner to use it
+PENDING_COUNTERPARTY_FILTER = "counterparty IS NULL OR counterparty IN ('', 'Unknown')"
+
+V7_DDL: list[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_transactions_counterparty_pending ON transactions(source_file_hash) "
+    f"WHERE {PENDING_COUNTERPARTY_FILTER}",
+]
+
+V8_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS merchant_aliases (
+        alias_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        alias TEXT NOT NULL,
+        alias_normalized TEXT NOT NULL UNIQUE,
+        canonical_name TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ','now'))
+    );""",
+    """CREATE TABLE IF NOT EXISTS merchant_alias_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        revision INTEGER NOT NULL
+    );""",
+    "INSERT OR IGNORE INTO merchant_alias_state(id, revision) VALUES (1, 0)",
+    """CREATE TRIGGER IF NOT EXISTS trg_merchant_aliases_ai AFTER INSERT ON merchant_aliases
+    BEGIN UPDATE merchant_alias_state SET revision = revision + 1 WHERE id = 1; END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_merchant_aliases_au AFTER UPDATE ON merchant_aliases
+    BEGIN UPDATE merchant_alias_state SET revision = revision + 1 WHERE id = 1; END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_merchant_aliases_ad AFTER DELETE ON merchant_aliases
+    BEGIN UPDATE merchant_alias_state SET revision = revision + 1 WHERE id = 1; END;""",
+]
+
+V9_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS counterparty_signatures (
+        counterparty_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL
+    );""",
+    """CREATE TABLE IF NOT EXISTS counterparty_lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        counterparty_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, counterparty_id)
+    ) WITHOUT ROWID;""",
+    "CREATE INDEX IF NOT EXISTS idx_lsh_buckets_counterparty ON counterparty_lsh_buckets(counterparty_id)",
+    """CREATE TRIGGER IF NOT EXISTS trg_counterparties_ad_signature AFTER DELETE ON counterparties
+    BEGIN
+        DELETE FROM counterparty_signatures WHERE counterparty_id = OLD.counterparty_id;
+        DELETE FROM counterparty_lsh_buckets WHERE counterparty_id = OLD.counterparty_id;
+    END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_counterparties_au_signature AFTER UPDATE OF name_normalized ON counterparties
+    WHEN OLD.name_normalized IS NOT NEW.name_normalized
+    BEGIN
+        DELETE FROM counterparty_signatures WHERE counterparty_id = OLD.counterparty_id;
+        DELETE FROM counterparty_lsh_buckets WHERE counterparty_id = OLD.counterparty_id;
+    END;""",
+]
+
+V10_DDL: list[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_transactions_counterparty_date ON transactions(counterparty_id, transaction_date)",
+]
+
+V11_FTS_DDL: list[str] = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS counterparties_fts USING fts5(
+        name, content='counterparties', content_rowid='counterparty_id', tokenize='trigram'
+    );""",
+    """CREATE TRIGGER IF NOT EXISTS trg_counterparties_fts_ai AFTER INSERT ON counterparties BEGIN
+        INSERT INTO counterparties_fts(rowid, name) VALUES (NEW.counterparty_id, NEW.name);
+    END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_counterparties_fts_ad AFTER DELETE ON counterparties BEGIN
+        INSERT INTO counterparties_fts(counterparties_fts, rowid, name) VALUES ('delete', OLD.counterparty_id, OLD.name);
+    END;""",
+    """CREATE TRIGGER IF NOT EXISTS trg_counterparties_fts_au AFTER UPDATE OF name ON counterparties BEGIN
+        INSERT INTO counterparties_fts(counterparties_fts, rowid, name) VALUES ('delete', OLD.counterparty_id, OLD.name);
+        INSERT INTO counterparties_fts(rowid, name) VALUES (NEW.counterparty_id, NEW.name);
+    END;""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(description, tokenize='trigram');""",
+    # Index rows that predate the tables
+    "INSERT INTO counterparties_fts(counterparties_fts) VALUES ('rebuild')",
+    "INSERT INTO transactions_fts(rowid, description) SELECT rowid, description FROM transactions",
+]
+
+# Per-counterparty aggregate of transactions; totals are summed as integer
+# cents so incremental maintenance never accumulates float error
+COUNTERPARTY_STATS_AGGREGATE = (
+    "SELECT counterparty_id, COUNT(*), SUM(CAST(ROUND(amount_in * 100) AS INTEGER)),"
+    " SUM(CAST(ROUND(amount_out * 100) AS INTEGER)), MIN(transaction_date), MAX(transaction_date)"
+    " FROM transactions WHERE counterparty_id IS NOT NULL"
+)
+
+V12_DDL: list[str] = [
+    """CREATE TABLE IF NOT EXISTS counterparty_stats (
+        counterparty_id INTEGER PRIMARY KEY,
+        tx_count INTEGER NOT NULL,
+        total_in_cents INTEGER NOT NULL,
+        total_out_cents INTEGER NOT NULL,
+        first_date TEXT,
+        last_date TEXT
+    );""",
+    "CREATE INDEX IF NOT EXISTS idx_counterparty_stats_tx_count ON counterparty_stats(tx_count)",
+    "CREATE INDEX IF NOT EXISTS idx_counterparty_stats_last_date ON counterparty_stats(last_date)",
+    """CREATE TRIGGER IF NOT EXISTS trg_counterparties_ad_stats AFTER DELETE ON counterparties
+    BEGIN
+        DELETE FROM counterparty_stats WHERE counterparty_id = OLD.counterparty_id;
+    END;""",
+    # Backfill from existing rows
+    "INSERT OR REPLACE INTO counterparty_stats(counterparty_id, tx_count, total_in_cents, total_out_cents,"
+    f" first_date, last_date) {COUNTERPARTY_STATS_AGGREGATE} GROUP BY counterparty_id",
+]
+
+V13_DDL: list[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_transactions_report_date ON transactions("
+    "transaction_date, year, month, category_id, amount_in, amount_out)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_report_category ON transactions("
+    "category_id, month, year, amount_in, amount_out)",
+]
+V13_BUILD_CACHE_KIB = 262144  # page cache while sorting index keys (256 MiB)
+V13_ANALYSIS_LIMIT = 1000  # rows sampled per index by ANALYZE
+
+
+def fts5_available(con: sqlite3.Connection) -> bool:
+    """True when this SQLite build has FTS5 with the trigram tokenizer (3.34+)."""
+    try:
+        con.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        con.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
 def _table_columns(con: sqlite3.Connection, table: str) -> set[str]:
     cur = con.execute(f"PRAGMA table_info({table})")
     return {row[1] for row in cur.fetchall()}
@@ -128,6 +391,100 @@ def _ensure_version_row(con: sqlite3.Connection) -> None:
         )
 
 
+def _apply_v2(con: sqlite3.Connection) -> None:
+    for ddl in V2_DDL:
+        con.execute(ddl)
+    _add_counterparty_id_column(con)
+    _backfill_documents(con)
+
+
+def _apply_v3(con: sqlite3.Connection) -> None:
+    for ddl in V3_DDL:
+        con.execute(ddl)
+
+
+def _apply_v4(con: sqlite3.Connection) -> None:
+    if "fingerprint" not in _table_columns(con, "documents"):
+        con.execute("ALTER TABLE documents ADD COLUMN fingerprint TEXT")
+    for ddl in V4_DDL:
+        con.execute(ddl)
+
+
+def _apply_v5(con: sqlite3.Connection) -> None:
+    for ddl in V5_DDL:
+        con.execute(ddl)
+
+
+def _apply_v6(con: sqlite3.Connection) -> None:
+    for ddl in V6_DDL:
+        con.execute(ddl)
+
+
+def _apply_v7(con: sqlite3.Connection) -> None:
+    for ddl in V7_DDL:
+        con.execute(ddl)
+
+
+def _apply_v8(con: sqlite3.Connection) -> None:
+    for ddl in V8_DDL:
+        con.execute(ddl)
+
+
+def _apply_v9(con: sqlite3.Connection) -> None:
+    for ddl in V9_DDL:
+        con.execute(ddl)
+
+
+def _apply_v10(con: sqlite3.Connection) -> None:
+    for ddl in V10_DDL:
+        con.execute(ddl)
+
+
+def _apply_v11(con: sqlite3.Connection) -> None:
+    if not fts5_available(con):
+        return
+    for ddl in V11_FTS_DDL:
+        con.execute(ddl)
+
+
+def _apply_v12(con: sqlite3.Connection) -> None:
+    for ddl in V12_DDL:
+        con.execute(ddl)
+
+
+def _apply_v13(con: sqlite3.Connection) -> None:
+    cache_size = con.execute("PRAGMA cache_size").fetchone()[0]
+    analysis_limit = con.execute("PRAGMA analysis_limit").fetchone()[0]
+    con.execute(f"PRAGMA cache_size=-{V13_BUILD_CACHE_KIB}")
+    try:
+        for ddl in V13_DDL:
+            con.execute(ddl)
+        # transactions only: statistics for the FTS5 shadow tables, taken while
+        # they are small, would mislead FTS5's own queries as the index grows
+        con.execute(f"PRAGMA analysis_limit={V13_ANALYSIS_LIMIT}")
+        con.execute("ANALYZE transactions")
+    finally:
+        con.execute(f"PRAGMA cache_size={cache_size}")
+        con.execute(f"PRAGMA analysis_limit={analysis_limit}")
+
+
+# Ordered forward-only steps: (target version, apply function)
+MIGRATIONS: list[tuple[int, Callable[[sqlite3.Connection], None]]] = [
+    (2, _apply_v2),
+    (3, _apply_v3),
+    (4, _apply_v4),
+    (5, _apply_v5),
+    (6, _apply_v6),
+    (7, _apply_v7),
+    (8, _apply_v8),
+    (9, _apply_v9),
+    (10, _apply_v10),
+    (11, _apply_v11),
+    (12, _apply_v12),
+    (13, _apply_v13),
+]
+
+
 def init_db(db_path: str) -> None:
     """Create required tables if absent and record schema version.
 
@@ -135,8 +492,7 @@ def init_db(db_path: str) -> None:
     """
     p = Path(db_path)
     p.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(p)
-    try:
+    with connection(p) as con:
         # create base schema
         for ddl in BASE_DDL:
             con.execute(ddl)
@@ -144,15 +500,11 @@ def init_db(db_path: str) -> None:
         cur = con.execute("SELECT version FROM schema_version ORDER BY applied_at DESC LIMIT 1")
         row = cur.fetchone()
         existing_version = row[0] if row else 0
-        # apply v2 if needed
-        if existing_version < 2:
-            for ddl in V2_DDL:
-                con.execute(ddl)
-            _add_counterparty_id_column(con)
-            _backfill_documents(con)
+        # apply pending versions in order
+        for version, apply in MIGRATIONS:
+            if existing_version < version:
+                apply(con)
         _ensure_version_row(con)
         con.commit()
-    finally:
-        con.close()
 
-__all__ = ["init_db", "CURRENT_SCHEMA_VERSION"]
+__all__ = ["init_db", "CURRENT_SCHEMA_VERSION", "PENDING_COUNTERPARTY_FILTER", "fts5_available"]
@@ -0,0 +1,123 @@
+"""Quarantined rows repository (schema v6).
+
+Rows rejected by tolerant-mode normalization are stored per document
+(source_file_hash, row_index) with the raw row as JSON and the rejection
+reason. Saving the same (document, row_index) again replaces the entry, so
+re-running a file does not duplicate its quarantine.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable
+from typing import Any
+
+from src.persistence.connection import connection
+
+_SELECT = "SELECT quarantine_id, source_file_hash, source_file, row_index, row, reason, created_at FROM quarantined_rows"
+
+
+def _dump(row: dict[str, Any]) -> str:
+    return json.dumps(row, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def write_quarantined_rows(
+    con: sqlite3.Connection,
+    *,
+    source_file_hash: str,
+    source_file: str,
+    entries: Iterable[dict[str, Any]],
+    replace: bool = False,
+) -> int:
+    """`save_quarantined_rows` on `con` without committing (part of a caller's transaction)."""
+    if replace:
+        con.execute("DELETE FROM quarantined_rows WHERE source_file_hash=?", (source_file_hash,))
+    cur = con.executemany(
+        """
+        INSERT OR REPLACE INTO quarantined_rows(source_file_hash, source_file, row_index, row, reason)
+        VALUES (?,?,?,?,?)
+        """,
+        (
+            (source_file_hash, source_file, e["row_index"], _dump(e["row"]), e["reason"])
+            for e in entries
+        ),
+    )
+    return cur.rowcount if cur.rowcount is not None and cur.rowcount >= 0 else 0
+
+
+def save_quarantined_rows(
+    db_path: str,
+    *,
+    source_file_hash: str,
+    source_file: str,
+    entries: Iterable[dict[str, Any]],
+    replace: bool = False,
+) -> int:
+    """Store {"row_index", "row", "reason"} entries; returns number saved.
+
+    With replace=True the document's previous entries are dropped first (in
+    the same transaction), e.g. after a full re-normalization.
+    """
+    with connection(db_path) as con:
+        saved = write_quarantined_rows(
+            con, source_file_hash=source_file_hash, source_file=source_file, entries=entries, replace=replace
+        )
+        con.commit()
+        return saved
+
+
+def list_quarantined_rows(db_path: str, *, source_file_hash: str | None = None) -> list[dict[str, Any]]:
+    """Quarantined rows (decoded), ordered by document then row index."""
+    sql = _SELECT
+    params: list[Any] = []
+    if source_file_hash is not None:
+        sql += " WHERE source_file_hash=?"
+        params.append(source_file_hash)
+    sql += " ORDER BY source_file_hash, row_index"
+    with connection(db_path) as con:
+        cur = con.execute(sql, params)
+        return [
+            {
+                "quarantine_id": r[0],
+                "source_file_hash": r[1],
+                "source_file": r[2],
+                "row_index": r[3],
+                "row": json.loads(r[4]),
+                "reason": r[5],
+                "created_at": r[6],
+            }
+            for r in cur.fetchall()
+        ]
+
+
+def count_quarantined_rows(db_path: str, *, source_file_hash: str | None = None) -> int:
+    with connection(db_path) as con:
+        if source_file_hash is None:
+            cur = con.execute("SELECT COUNT(*) FROM quarantined_rows")
+        else:
+            cur = con.execute("SELECT COUNT(*) FROM quarantined_rows WHERE source_file_hash=?", (source_file_hash,))
+        return int(cur.fetchone()[0])
+
+
+def remove_quarantined_rows(con: sqlite3.Connection, quarantine_ids: Iterable[int]) -> int:
+    """`delete_quarantined_rows` on `con` without committing (part of a caller's transaction)."""
+    cur = con.executemany("DELETE FROM quarantined_rows WHERE quarantine_id=?", ((i,) for i in quarantine_ids))
+    return cur.rowcount if cur.rowcount is not None and cur.rowcount >= 0 else 0
+
+
+def delete_quarantined_rows(db_path: str, quarantine_ids: Iterable[int]) -> int:
+    """Delete entries by id; returns rows removed."""
+    with connection(db_path) as con:
+        removed = remove_quarantined_rows(con, quarantine_ids)
+        con.commit()
+        return removed
+
+
+__all__ = [
+    "save_quarantined_rows",
+    "write_quarantined_rows",
+    "list_quarantined_rows",
+    "count_quarantined_rows",
+    "delete_quarantined_rows",
+    "remove_quarantined_rows",
+]
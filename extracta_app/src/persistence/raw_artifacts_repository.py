@@ -0,0 +1,72 @@
+"""Raw artifact cache repository (schema v5).
+
+Stores, per document (file hash), the parsed pre-normalization rows and the
+header map they were normalized with. Re-normalization replays these through
+`normalize_records` instead of requiring the original upload again.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from typing import Any
+
+from src.persistence.connection import connection
+
+
+def write_raw_artifact(
+    con: sqlite3.Connection,
+    *,
+    file_hash: str,
+    source_file: str,
+    rows: list[dict[str, Any]],
+    header_map: dict[str, str],
+) -> None:
+    """`save_raw_artifact` on `con` without committing (part of a caller's transaction)."""
+    con.execute(
+        """
+        INSERT OR REPLACE INTO raw_artifacts(file_hash, source_file, header_map, rows, row_count)
+        VALUES (?,?,?,?,?)
+        """,
+        (
+            file_hash,
+            source_file,
+            json.dumps(header_map, separators=(",", ":"), ensure_ascii=False),
+            json.dumps(rows, separators=(",", ":"), ensure_ascii=False),
+            len(rows),
+        ),
+    )
+
+
+def save_raw_artifact(
+    db_path: str,
+    *,
+    file_hash: str,
+    source_file: str,
+    rows: list[dict[str, Any]],
+    header_map: dict[str, str],
+) -> None:
+    """Insert or replace the cached rows for a document."""
+    with connection(db_path) as con:
+        write_raw_artifact(con, file_hash=file_hash, source_file=source_file, rows=rows, header_map=header_map)
+        con.commit()
+
+
+def get_raw_artifact(db_path: str, file_hash: str) -> dict[str, Any] | None:
+    with connection(db_path) as con:
+        cur = con.execute(
+            "SELECT file_hash, source_file, header_map, rows, row_count FROM raw_artifacts WHERE file_hash=?",
+            (file_hash,),
+        )
+        r = cur.fetchone()
+        if r is None:
+            return None
+        return {
+            "file_hash": r[0],
+            "source_file": r[1],
+            "header_map": json.loads(r[2]),
+            "rows": json.loads(r[3]),
+            "row_count": r[4],
+        }
+
+
+__all__ = ["save_raw_artifact", "write_raw_artifact", "get_raw_artifact"]
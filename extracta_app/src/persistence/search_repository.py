@@ -0,0 +1,109 @@
+"""Substring search over counterparty names and transaction descriptions (schema v11).
+
+Queries run against the trigram FTS5 indexes `counterparties_fts` and
+`transactions_fts` (kept in sync by counterparty triggers and by the batch
+writes in transactions_repository), so "contains" search is an
+index lookup ranked by bm25 instead of a full scan. The trigram index can
+only answer queries of three or more characters; shorter queries, and
+databases whose SQLite lacks FTS5, fall back to a LIKE scan with the same
+LIMIT. Matching is case-insensitive either way.
+
+`transactions_fts` is keyed by the implicit rowid of `transactions`; an
+explicit VACUUM may renumber those, and bulk loads that bypass
+transactions_repository are not indexed. `rebuild_search_indexes` re-reads
+both tables in either case.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Any
+
+from src.persistence.connection import connection
+from src.persistence.transactions_repository import TX_COLUMNS
+
+DEFAULT_LIMIT = 50
+MIN_FTS_QUERY = 3  # trigram tokenizer: shorter strings have no index entry
+
+
+def _fts_phrase(query: str) -> str:
+    # One quoted phrase: FTS5 operators and punctuation in the query are literal
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _use_fts(con: sqlite3.Connection, table: str, query: str) -> bool:
+    if len(query) < MIN_FTS_QUERY:
+        return False
+    row = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    return row is not None
+
+
+def rebuild_search_indexes(db_path: str) -> bool:
+    """Re-index both FTS tables from their content tables; False without FTS5."""
+    with connection(db_path) as con:
+        if not _use_fts(con, "transactions_fts", "x" * MIN_FTS_QUERY):
+            return False
+        con.execute("INSERT INTO counterparties_fts(counterparties_fts) VALUES ('rebuild')")
+        con.execute("DELETE FROM transactions_fts")
+        con.execute("INSERT INTO transactions_fts(rowid, description) SELECT rowid, description FROM transactions")
+        con.commit()
+        return True
+
+
+def search_counterparties(db_path: str, query: str, *, limit: int = DEFAULT_LIMIT) -> list[dict[str, Any]]:
+    """Counterparties whose name contains `query`, best match first."""
+    query = query.strip()
+    if not query:
+        return []
+    with connection(db_path) as con:
+        if _use_fts(con, "counterparties_fts", query):
+            cur = con.execute(
+                "SELECT c.counterparty_id, c.name, c.name_normalized, c.created_at "
+                "FROM counterparties_fts f JOIN counterparties c ON c.counterparty_id = f.rowid "
+                "WHERE counterparties_fts MATCH ? ORDER BY f.rank, c.name LIMIT ?",
+                (_fts_phrase(query), limit),
+            )
+        else:
+            cur = con.execute(
+                "SELECT counterparty_id, name, name_normalized, created_at FROM counterparties "
+                "WHERE name LIKE ? ESCAPE '\\' ORDER BY name LIMIT ?",
+                (_like_pattern(query), limit),
+            )
+        return [
+            {
+                "counterparty_id": r[0],
+                "name": r[1],
+                "name_normalized": r[2],
+                "created_at": r[3],
+            }
+            for r in cur.fetchall()
+        ]
+
+
+def search_transactions(db_path: str, query: str, *, limit: int = DEFAULT_LIMIT) -> list[dict[str, Any]]:
+    """Transactions whose description contains `query`, best match first (newest on ties)."""
+    query = query.strip()
+    if not query:
+        return []
+    columns = ",".join(f"t.{col}" for col in TX_COLUMNS)
+    with connection(db_path) as con:
+        if _use_fts(con, "transactions_fts", query):
+            cur = con.execute(
+                f"SELECT {columns} FROM transactions_fts f JOIN transactions t ON t.rowid = f.rowid "
+                "WHERE transactions_fts MATCH ? ORDER BY f.rank, t.transaction_date DESC LIMIT ?",
+                (_fts_phrase(query), limit),
+            )
+        else:
+            cur = con.execute(
+                f"SELECT {columns} FROM transactions t WHERE t.description LIKE ? ESCAPE '\\' "
+                "ORDER BY t.transaction_date DESC LIMIT ?",
+                (_like_pattern(query), limit),
+            )
+        return [{col: raw[i] for i, col in enumerate(TX_COLUMNS)} for raw in cur.fetchall()]
+
+
+__all__ = ["search_counterparties", "search_transactions", "rebuild_search_indexes", "DEFAULT_LIMIT", "MIN_FTS_QUERY"]
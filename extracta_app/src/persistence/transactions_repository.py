@@ -1,42 +1,100 @@
 """Transactions repository (Task 34).
 
 Provides append-only bulk insert + simple fetch APIs.
-Idempotency: duplicate primary keys ignored (INSERT OR IGNORE).
+Idempotency: duplicate primary keys ignored (INSERT OR IGNORE);
+`insert_new_transactions` instead inserts all rows or none.
+Rows may be `TransactionRecord` tuples (bound as-is, column order matches
+TX_COLUMNS) or dicts.
+`replace_document_transactions` swaps one document's rows atomically (used by
+re-normalization).
+
+The schema v11 `transactions_fts` search index has no per-row triggers: the
+writers here index the rows they add with one INSERT ... SELECT per call, and
+`unindex_document_transactions` drops a document's entries before its rows
+are deleted. Rows inserted into `transactions` directly are not searchable
+until `search_repository.rebuild_search_indexes` runs. `counterparty_stats`
+(schema v12) is maintained the same way for the rows that carry a
+counterparty_id.
 """
 from __future__ import annotations
 
 import sqlite3
 import time
-from collections.abc import Iterable
+from collections import defaultdict, deque
+from collections.abc import Iterable, Sequence
 from typing import Any
 
+from src.common.records import TX_FIELDS, TransactionRecord
 from src.logging.json_logger import emit_log_event
+from src.persistence.connection import connection
+from src.persistence.counterparties_repository import (
+    add_counterparty_stats,
+    remove_counterparty_stats,
+    settle_counterparty_stats,
+)
 
-TX_COLUMNS = [
-    "transaction_id",
-    "transaction_date",
-    "description",
-    "amount_in",
-    "amount_out",
-    "counterparty",
-    "category_id",
-    "source_file",
-    "source_file_hash",
-    "normalization_hash",
-    "year",
-    "month",
-    "mapping_version",
-    "logic_version",
-]
+TX_COLUMNS = list(TX_FIELDS)
 
 INSERT_SQL = (
     "INSERT OR IGNORE INTO transactions (" + ",".join(TX_COLUMNS) + ") VALUES (" + ",".join(["?"] * len(TX_COLUMNS)) + ")"
 )
 
+INSERT_WITH_COUNTERPARTY_SQL = (
+    "INSERT OR IGNORE INTO transactions (" + ",".join(TX_COLUMNS) + ",counterparty_id) VALUES ("
+    + ",".join(["?"] * (len(TX_COLUMNS) + 1)) + ")"
+)
+
+INSERT_STRICT_SQL = INSERT_SQL.replace("INSERT OR IGNORE", "INSERT", 1)
+
 SELECT_BASE = "SELECT " + ",".join(TX_COLUMNS) + " FROM transactions"
 
+FTS_TABLE = "transactions_fts"
+
+
+def _has_search_index(con: sqlite3.Connection) -> bool:
+    row = con.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (FTS_TABLE,)).fetchone()
+    return row is not None
+
+
+def _max_rowid(con: sqlite3.Connection) -> int:
+    return int(con.execute("SELECT COALESCE(MAX(rowid), 0) FROM transactions").fetchone()[0])
 
-def bulk_insert_transactions(db_path: str, rows: Iterable[dict[str, Any]]) -> int:
+
+def _insert_indexed(con: sqlite3.Connection, sql: str, params: Iterable[Sequence[Any]]) -> int:
+    """executemany `sql` and index the rows it added; returns their count."""
+    indexed_upto = _max_rowid(con) if _has_search_index(con) else None
+    cur = con.executemany(sql, params)
+    inserted = cur.rowcount if cur.rowcount is not None else 0
+    if indexed_upto is not None and inserted:
+        _index_transactions_after(con, indexed_upto)
+    return inserted
+
+
+def _index_transactions_after(con: sqlite3.Connection, rowid: int) -> None:
+    # New rows get rowids above the current maximum, so one range select finds them
+    con.execute(
+        f"INSERT OR REPLACE INTO {FTS_TABLE}(rowid, description) "
+        "SELECT rowid, description FROM transactions WHERE rowid > ?",
+        (rowid,),
+    )
+
+
+def unindex_document_transactions(con: sqlite3.Connection, source_file_hash: str) -> None:
+    """Remove one document's rows from the search index; call before deleting them on `con`."""
+    if _has_search_index(con):
+        con.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT rowid FROM transactions WHERE source_file_hash=?)",
+            (source_file_hash,),
+        )
+
+
+def _params(row: TransactionRecord | dict[str, Any]) -> Sequence[Any]:
+    if isinstance(row, tuple):
+        return row
+    return [row.get(col) for col in TX_COLUMNS]
+
+
+def bulk_insert_transactions(db_path: str, rows: Iterable[TransactionRecord | dict[str, Any]]) -> int:
     """Bulk insert rows; returns number of inserted (new) rows.
 
     Duplicate transaction_id rows are ignored.
@@ -57,19 +115,10 @@ def bulk_insert_transactions(db_path: str, rows: Iterable[dict[str, Any]]) -> in
             })
             return 0
 
-        con = sqlite3.connect(db_path)
-        try:
-            cur = con.executemany(
-                INSERT_SQL,
-                [
-                    [
-                        r.get(col) for col in TX_COLUMNS
-                    ]
-                    for r in rows_list
-                ],
-            )
+        with connection(db_path) as con:
+            con.execute("BEGIN IMMEDIATE")
+            inserted_count = _insert_indexed(con, INSERT_SQL, map(_params, rows_list))
             con.commit()
-            inserted_count = cur.rowcount if cur.rowcount is not None else 0
 
             # Log successful persistence
             emit_log_event({
@@ -82,8 +131,6 @@ def bulk_insert_transactions(db_path: str, rows: Iterable[dict[str, Any]]) -> in
             })
 
             return inserted_count
-        finally:
-            con.close()
 
     except Exception as e:
         # Log failed persistence
@@ -100,21 +147,127 @@ def bulk_insert_transactions(db_path: str, rows: Iterable[dict[str, Any]]) -> in
         raise
 
 
+def write_new_transactions(con: sqlite3.Connection, records: Iterable[TransactionRecord]) -> bool:
+    """`insert_new_transactions` on `con` without committing (part of a caller's transaction).
+
+    A savepoint undoes a partial insert, leaving the caller's other writes intact.
+    """
+    con.execute("SAVEPOINT new_transactions")
+    try:
+        _insert_indexed(con, INSERT_STRICT_SQL, records)
+    except sqlite3.IntegrityError:
+        con.execute("ROLLBACK TO new_transactions")
+        con.execute("RELEASE new_transactions")
+        return False
+    con.execute("RELEASE new_transactions")
+    return True
+
+
+def insert_new_transactions(db_path: str, records: Iterable[TransactionRecord]) -> bool:
+    """Insert every record in one transaction; nothing is inserted (False) if any id already exists."""
+    with connection(db_path) as con:
+        con.execute("BEGIN IMMEDIATE")
+        if not write_new_transactions(con, records):
+            con.rollback()
+            return False
+        con.commit()
+        return True
+
+
+def document_transaction_ids(db_path: str, source_file_hash: str) -> dict[str, set[str]]:
+    """Stored transaction ids of one document, grouped by normalization_hash."""
+    ids: dict[str, set[str]] = defaultdict(set)
+    with connection(db_path) as con:
+        cur = con.execute(
+            "SELECT normalization_hash, transaction_id FROM transactions WHERE source_file_hash=?",
+            (source_file_hash,),
+        )
+        for h, tx_id in cur.fetchall():
+            ids[h].add(tx_id)
+    return dict(ids)
+
+
 def get_transactions(db_path: str, *, limit: int | None = None) -> list[dict[str, Any]]:
     sql = SELECT_BASE
     params: list[Any] = []
     if limit is not None:
         sql += " LIMIT ?"
         params.append(limit)
-    con = sqlite3.connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute(sql, params)
         rows = cur.fetchall()
         result: list[dict[str, Any]] = []
         for raw in rows:
             result.append({col: raw[i] for i, col in enumerate(TX_COLUMNS)})
         return result
-    finally:
-        con.close()
 
-__all__ = ["bulk_insert_transactions", "get_transactions"]
+
+def swap_document_transactions(
+    con: sqlite3.Connection, source_file_hash: str, records: Iterable[TransactionRecord]
+) -> dict[str, int]:
+    """Replace every transaction of one document with `records` on `con` (no commit).
+
+    Assignments on the old rows are carried over to new rows with the same
+    content (date, description, amounts; n-th duplicate to n-th duplicate):
+    category_id when set, counterparty + counterparty_id when a counterparty
+    was assigned. Returns {"removed", "inserted", "carried"} where `carried`
+    counts rows that kept at least one assignment.
+    """
+    cur = con.execute(
+        "SELECT transaction_date, description, amount_in, amount_out, category_id, counterparty, counterparty_id "
+        "FROM transactions WHERE source_file_hash=? ORDER BY rowid",
+        (source_file_hash,),
+    )
+    old = cur.fetchall()
+    assigned: dict[tuple[Any, ...], deque[tuple[Any, Any, Any]]] = defaultdict(deque)
+    for date, desc, amount_in, amount_out, category_id, counterparty, counterparty_id in old:
+        assigned[(date, desc, amount_in, amount_out)].append((category_id, counterparty, counterparty_id))
+
+    params: list[tuple[Any, ...]] = []
+    carried = 0
+    for r in records:
+        state = assigned.get((r.transaction_date, r.description, r.amount_in, r.amount_out))
+        if not state:
+            params.append((*r, None))
+            continue
+        category_id, counterparty, counterparty_id = state.popleft()
+        if category_id is not None or counterparty_id is not None:
+            carried += 1
+        if counterparty_id is None:
+            counterparty = r.counterparty
+        params.append((
+            *r[:5], counterparty, category_id if category_id is not None else r.category_id, *r[7:], counterparty_id
+        ))
+
+    unindex_document_transactions(con, source_file_hash)
+    touched = remove_counterparty_stats(con, "source_file_hash=?", (source_file_hash,))
+    con.execute("DELETE FROM transactions WHERE source_file_hash=?", (source_file_hash,))
+    settle_counterparty_stats(con, touched)
+    inserted_after = _max_rowid(con)
+    inserted = _insert_indexed(con, INSERT_WITH_COUNTERPARTY_SQL, params)
+    if inserted:
+        add_counterparty_stats(con, "rowid > ?", (inserted_after,))
+    return {"removed": len(old), "inserted": inserted, "carried": carried}
+
+
+def replace_document_transactions(
+    db_path: str, source_file_hash: str, records: Iterable[TransactionRecord]
+) -> dict[str, int]:
+    """`swap_document_transactions` in a single committed transaction."""
+    with connection(db_path) as con:
+        con.execute("BEGIN IMMEDIATE")
+        swap = swap_document_transactions(con, source_file_hash, records)
+        con.commit()
+        return swap
+
+
+__all__ = [
+    "bulk_insert_transactions",
+    "get_transactions",
+    "replace_document_transactions",
+    "swap_document_transactions",
+    "insert_new_transactions",
+    "write_new_transactions",
+    "document_transaction_ids",
+    "unindex_document_transactions",
+]
@@ -5,11 +5,11 @@ and returns dictionary with rows + metadata.
 """
 from __future__ import annotations
 
-import sqlite3
 import time
 from typing import Any
 
 from src.logging.json_logger import emit_log_event
+from src.persistence.connection import connection
 from src.reporting.query_builder import build_report_query
 
 
@@ -18,13 +18,10 @@ def execute_report(db_path: str, request: dict[str, Any]) -> dict[str, Any]:
 
     try:
         sql, params = build_report_query(request)
-        con = sqlite3.connect(db_path)
-        try:
+        with connection(db_path) as con:
             cur = con.execute(sql, params)
             columns = [d[0] for d in cur.description]
             rows = [dict(zip(columns, r, strict=False)) for r in cur.fetchall()]
-        finally:
-            con.close()
 
         result = {
             "sql": sql,
@@ -8,12 +8,9 @@ Idempotent save semantics:
 from __future__ import annotations
 
 import json
-import sqlite3
 from typing import Any
 
-
-def _connect(db_path: str) -> sqlite3.Connection:
-    return sqlite3.connect(db_path)
+from src.persistence.connection import connection
 
 
 def _canonical_json(d: dict[str, Any]) -> str:
@@ -25,8 +22,7 @@ def save_template(db_path: str, name: str, definition: dict[str, Any]) -> int:
     if not name.strip():
         raise ValueError("Template name required")
     cj = _canonical_json(definition)
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute(
             "SELECT template_id, definition_json FROM report_templates WHERE name=?",
             (name,),
@@ -49,13 +45,10 @@ def save_template(db_path: str, name: str, definition: dict[str, Any]) -> int:
         )
         con.commit()
         return int(template_id)
-    finally:
-        con.close()
 
 
 def get_template_by_name(db_path: str, name: str) -> dict[str, Any] | None:
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute(
             "SELECT template_id, name, definition_json, created_at, updated_at FROM report_templates WHERE name=?",
             (name,),
@@ -70,13 +63,10 @@ def get_template_by_name(db_path: str, name: str) -> dict[str, Any] | None:
             "created_at": row[3],
             "updated_at": row[4],
         }
-    finally:
-        con.close()
 
 
 def list_templates(db_path: str) -> list[dict[str, Any]]:
-    con = _connect(db_path)
-    try:
+    with connection(db_path) as con:
         cur = con.execute(
             "SELECT template_id, name, definition_json, created_at, updated_at FROM report_templates ORDER BY name"
         )
@@ -92,8 +82,6 @@ def list_templates(db_path: str) -> list[dict[str, Any]]:
                 }
             )
         return out
-    finally:
-        con.close()
 
 
 __all__ = ["save_template", "get_template_by_name", "list_templates"]
@@ -25,22 +25,44 @@ import streamlit as st
 # Import business logic modules
 try:
     from src.categorization.service import assign_category, create_category, list_categories
+    from src.ingestion.dedup import check_duplicate
     from src.ingestion.pipeline import ingest_file
-    from src.normalization.engine import normalize_rows
+    from src.normalization.counterparty_suggestions import suggest_merge_clusters
+    from src.normalization.engine import normalize_records
+    from src.normalization.quarantine import replay_quarantined
+    from src.normalization.renormalization import find_stale_documents, renormalize
     try:
         from src.normalization.counterparty_derivation import derive_counterparties  # type: ignore
     except ImportError:  # pragma: no cover
         derive_counterparties = None  # type: ignore
+    from src.persistence.counterparties_repository import (
+        PAGE_SORTS,
+        RenameCollisionError,
+        count_counterparties,
+        list_counterparties_page,
+    )
+    from src.persistence.counterparties_repository import merge as merge_counterparties
+    from src.persistence.counterparties_repository import rename as rename_counterparty
+    from src.persistence.documents_repository import create_document, delete_document_by_file_hash, list_documents
+    from src.persistence.image_hashes_repository import record_image_hash
+    from src.persistence.merchant_aliases_repository import list_aliases, upsert_aliases
     from src.persistence.migrations import init_db
+    from src.persistence.quarantine_repository import count_quarantined_rows, save_quarantined_rows
+    from src.persistence.raw_artifacts_repository import save_raw_artifact
+    from src.persistence.search_repository import search_counterparties, search_transactions
     from src.persistence.transactions_repository import bulk_insert_transactions, get_transactions
-    from src.persistence.documents_repository import create_document, list_documents, delete_document_by_file_hash
-    from src.persistence.counterparties_repository import list_counterparties, rename as rename_counterparty, merge as merge_counterparties, RenameCollisionError
     from src.reporting.executor import execute_report
     from src.reporting.templates import list_templates, save_template
 except ImportError as e:
     st.error(f"Import error: {e}")
     st.stop()
 
+# Versions stamped on normalized rows; bumping either marks stored documents
+# stale for re-normalization (Document Management tab).
+MAPPING_VERSION = "v1"
+# 0.2.0: amounts parse with the file's inferred decimal/thousands convention
+LOGIC_VERSION = "0.2.0"
+
 
 def parse_raw_text_to_structured_data(raw_rows: list[dict[str, str]]) -> list[dict[str, str]]:
     """
@@ -48,35 +70,35 @@ def parse_raw_text_to_structured_data(raw_rows: list[dict[str, str]]) -> list[di
     This is a simple parser - in production you'd want more sophisticated parsing.
     """
     import re
-    from datetime import datetime
-    
+
     structured_rows = []
-    
+
     for row in raw_rows:
         raw_text = row.get('raw_text', '').strip()
         if not raw_text:
             continue
-            
+
         # Simple parsing logic - look for patterns like:
         # "€632.39 €31.62 2025-10-31" (amount amount date)
         # or other common transaction patterns
-        
+
         # Pattern 1: Look for amount and date
-        amount_date_pattern = r'€?(-?\d+[.,]\d+).*?(\d{4}-\d{2}-\d{2})'
+        # (keeps thousands separators: 1.234,56 / 1,234.56 are resolved per file by the normalizer)
+        amount_date_pattern = r'€?(-?(?:\d{1,3}(?:[.,]\d{3})+|\d+)[.,]\d+).*?(\d{4}-\d{2}-\d{2})'
         match = re.search(amount_date_pattern, raw_text)
-        
+
         if match:
-            amount_str = match.group(1).replace(',', '.')
+            amount_str = match.group(1)
             date_str = match.group(2)
-            
+
             # Extract description (everything before the amount/date part)
             description = raw_text[:match.start()].strip()
             if not description:
                 description = raw_text.replace(match.group(0), '').strip()
-                
+
             if not description:
                 description = raw_text
-                
+
             structured_rows.append({
                 "Date": date_str,
                 "Description": description,
@@ -86,14 +108,14 @@ def parse_raw_text_to_structured_data(raw_rows: list[dict[str, str]]) -> list[di
             # Pattern 2: Look for just dates
             date_pattern = r'(\d{4}-\d{2}-\d{2})'
             date_match = re.search(date_pattern, raw_text)
-            
+
             if date_match:
                 structured_rows.append({
                     "Date": date_match.group(1),
                     "Description": raw_text,
                     "Amount": "0.00"
                 })
-    
+
     return structured_rows
 
 
@@ -114,6 +136,29 @@ def _resolve_document_type(user_value: str | None) -> str:
     return value if value else "Other"
 
 
+def _record_document(raw_artifact: dict, filename: str, doc_type: str | None) -> None:
+    """Persist the document (and its image hash) once its rows have been stored."""
+    try:
+        create_document(
+            st.session_state.db_path,
+            filename=filename,
+            file_hash=raw_artifact['source_file_hash'],
+            document_type=_resolve_document_type(doc_type),
+            fingerprint=raw_artifact['source_file_fingerprint'],
+        )
+    except Exception as e:  # pragma: no cover - UI surface
+        st.warning(f"Could not persist document record: {e}")
+        return
+    # Only a persisted document may flag later re-scans as near-duplicates
+    if raw_artifact.get('perceptual_hash') is not None:
+        record_image_hash(
+            st.session_state.db_path,
+            file_hash=raw_artifact['source_file_hash'],
+            filename=filename,
+            phash=raw_artifact['perceptual_hash'],
+        )
+
+
 def upload_section():
     """File upload and extraction preview section."""
     st.header("📁 Upload Financial Documents")
@@ -142,23 +187,30 @@ def upload_section():
                     tmp_path = tmp_file.name
 
                 try:
-                    # Extract raw data
-                    with st.spinner("Extracting data..."):
-                        raw_artifact = ingest_file(tmp_path)
+                    duplicate = check_duplicate(st.session_state.db_path, tmp_path)
+                    existing = duplicate.existing
+                    if existing:
+                        st.info(f"ℹ️ Already imported as {existing['filename']} ({existing['upload_date']}); skipped.")
+                        continue
 
-                    st.success(f"✅ Extracted {raw_artifact['record_count_raw']} rows")
+                    # Extract raw data (reusing the hashes computed by the duplicate check)
+                    with st.spinner("Extracting data..."):
+                        raw_artifact = ingest_file(
+                            tmp_path,
+                            db_path=st.session_state.db_path,
+                            file_hash=duplicate.file_hash,
+                            fingerprint=duplicate.fingerprint,
+                        )
 
-                    # Persist document metadata (idempotent on file_hash)
-                    effective_type = _resolve_document_type(doc_type)
-                    try:
-                        create_document(
-                            st.session_state.db_path,
-                            filename=uploaded_file.name,
-                            file_hash=raw_artifact['source_file_hash'],
-                            document_type=effective_type,
+                    near_duplicate = raw_artifact.get('near_duplicate_of')
+                    if near_duplicate and not raw_artifact['rows']:
+                        st.warning(
+                            f"⚠️ Skipped: looks like a re-scan of {near_duplicate['filename']} "
+                            f"(perceptual distance {near_duplicate['distance']})"
                         )
-                    except Exception as e:  # pragma: no cover - UI surface
-                        st.warning(f"Could not persist document record: {e}")
+                        continue
+
+                    st.success(f"✅ Extracted {raw_artifact['record_count_raw']} rows")
 
                     # Show preview
                     if raw_artifact['rows']:
@@ -169,7 +221,7 @@ def upload_section():
                     parsed_rows = []
                     with st.spinner("Parsing extracted text..."):
                         parsed_rows = parse_raw_text_to_structured_data(raw_artifact['rows'])
-                        
+
                         if parsed_rows:
                             st.subheader("Parsed Structured Data")
                             st.dataframe(parsed_rows[:10])  # Show first 10 parsed rows
@@ -184,20 +236,34 @@ def upload_section():
                     # Normalize data
                     with st.spinner("Normalizing data..."):
                         # Load mapping config (you might want to make this configurable)
-                        mapping_config = {"version": "v1", "synonyms": {}, "rules": {
+                        mapping_config = {"version": MAPPING_VERSION, "synonyms": {}, "rules": {
                             "Date": "transaction_date",
                             "Description": "description",
                             "Amount": "amount_out"  # Simplified mapping
                         }}
 
-                        normalized_rows = normalize_rows(
+                        quarantined = []  # tolerant mode: bad rows are set aside, not fatal
+                        normalized_rows = normalize_records(
                             parsed_rows,  # Use parsed data instead of raw
                             header_map=mapping_config['rules'],
                             mapping_version=mapping_config['version'],
-                            logic_version="0.1.0",
+                            logic_version=LOGIC_VERSION,
                             source_file=uploaded_file.name,
-                            source_file_hash=raw_artifact['source_file_hash']
+                            source_file_hash=raw_artifact['source_file_hash'],
+                            deterministic_ids=True,  # re-imports become INSERT OR IGNORE no-ops
+                            quarantined=quarantined
                         )
+                        if quarantined:
+                            save_quarantined_rows(
+                                st.session_state.db_path,
+                                source_file_hash=raw_artifact['source_file_hash'],
+                                source_file=uploaded_file.name,
+                                entries=quarantined,
+                            )
+                            st.warning(
+                                f"⚠️ {len(quarantined)} row(s) quarantined (see Document Management); "
+                                "the rest of the file was imported"
+                            )
 
                     if normalized_rows:
                         st.success(f"✅ Normalized {len(normalized_rows)} transactions")
@@ -205,11 +271,24 @@ def upload_section():
                         # Insert into database
                         with st.spinner("Saving to database..."):
                             bulk_insert_transactions(st.session_state.db_path, normalized_rows)
+                            # Cache parser output so version bumps can re-normalize without re-upload
+                            save_raw_artifact(
+                                st.session_state.db_path,
+                                file_hash=raw_artifact['source_file_hash'],
+                                source_file=uploaded_file.name,
+                                rows=parsed_rows,
+                                header_map=mapping_config['rules'],
+                            )
+                        # Document metadata last: a failed upload leaves no record that would
+                        # make the duplicate check skip the next attempt
+                        _record_document(raw_artifact, uploaded_file.name, doc_type)
 
                         # Derive counterparties (idempotent) - Phase 4 integration
                         if derive_counterparties:
                             with st.spinner("Deriving counterparties..."):
-                                stats = derive_counterparties(st.session_state.db_path)
+                                stats = derive_counterparties(
+                                    st.session_state.db_path, source_file_hash=raw_artifact['source_file_hash']
+                                )
                             st.info(f"Counterparties assigned: {stats['assigned']} (skipped {stats['skipped']})")
 
                         st.success("✅ Saved to database")
@@ -219,6 +298,9 @@ def upload_section():
                             'name': uploaded_file.name,
                             'rows': len(normalized_rows)
                         })
+                    elif quarantined:
+                        # Every row quarantined: keep the document so its rows can be replayed
+                        _record_document(raw_artifact, uploaded_file.name, doc_type)
 
                 except (FileNotFoundError, ValueError, RuntimeError) as e:
                     st.error(f"Error processing {uploaded_file.name}: {e}")
@@ -297,6 +379,10 @@ def transactions_section():
 
     # Display transactions table
     st.subheader("📄 Transactions Table")
+    search_text = st.text_input("Search descriptions (contains):", "", key="tx_search")
+    if search_text.strip():
+        transactions = search_transactions(st.session_state.db_path, search_text, limit=100)
+        st.caption(f"{len(transactions)} matching transactions (best matches first)")
     st.dataframe(transactions, use_container_width=True)
 
 
@@ -440,6 +526,37 @@ def document_management_section():
     with st.expander("Raw Table View"):
         st.dataframe(docs)
 
+    stale = find_stale_documents(
+        st.session_state.db_path, mapping_version=MAPPING_VERSION, logic_version=LOGIC_VERSION
+    )
+    if stale:
+        st.subheader("Re-normalization")
+        st.write(f"{len(stale)} document(s) were normalized with older mapping/logic versions.")
+        if st.button("Re-normalize stale documents"):
+            bar = st.progress(0.0)
+            stats = renormalize(
+                st.session_state.db_path,
+                mapping_version=MAPPING_VERSION,
+                logic_version=LOGIC_VERSION,
+                progress=lambda done, total, _fh: bar.progress(done / total),
+            )
+            st.success(
+                f"Re-normalized {stats['renormalized']} document(s) "
+                f"({stats['rows_inserted']} rows, {stats['failed']} failed)."
+            )
+
+    quarantined_count = count_quarantined_rows(st.session_state.db_path)
+    if quarantined_count:
+        st.subheader("Quarantined Rows")
+        st.write(f"{quarantined_count} row(s) failed validation and were set aside.")
+        if st.button("Replay quarantined rows"):
+            stats = replay_quarantined(
+                st.session_state.db_path, mapping_version=MAPPING_VERSION, logic_version=LOGIC_VERSION
+            )
+            st.success(
+                f"Replayed {stats['replayed']} row(s); {stats['still_quarantined']} still quarantined."
+            )
+
 
 def main():
     """Main Streamlit application."""
@@ -477,17 +594,48 @@ def main():
         counterparty_management_section()
 
 
+def merchant_aliases_editor():
+    """Curated merchant aliases applied ahead of the counterparty heuristic."""
+    with st.expander("Merchant Aliases"):
+        aliases = list_aliases(st.session_state.db_path)
+        st.write(f"{len(aliases)} alias(es) defined. New aliases apply to counterparties derived afterwards.")
+        if aliases:
+            st.dataframe(aliases[:200])
+        col_a1, col_a2, col_a3 = st.columns([3, 3, 1])
+        with col_a1:
+            alias_text = st.text_input("Statement text (e.g. AMZN MKTP)")
+        with col_a2:
+            canonical = st.text_input("Counterparty name (e.g. Amazon)")
+        with col_a3:
+            if st.button("Save Alias") and alias_text.strip() and canonical.strip():
+                upsert_aliases(st.session_state.db_path, [(alias_text, canonical)])
+                st.success("Alias saved")
+                st.rerun()
+
+
 def counterparty_management_section():
     st.header("🤝 Counterparty Management")
-    cps = list_counterparties(st.session_state.db_path)
-    if not cps:
+    merchant_aliases_editor()
+    total = count_counterparties(st.session_state.db_path)
+    if not total:
         st.info("No counterparties yet. Upload transactions to derive them.")
         return
 
-    st.subheader(f"Counterparties ({len(cps)})")
+    st.subheader(f"Counterparties ({total})")
     filter_text = st.text_input("Filter (contains):", "")
-    filtered = [c for c in cps if filter_text.lower() in c["name"].lower()]
-    st.dataframe(filtered[:100])
+    if filter_text.strip():
+        st.dataframe(search_counterparties(st.session_state.db_path, filter_text, limit=100))
+    else:
+        page_size = 100
+        col_p1, col_p2 = st.columns(2)
+        with col_p1:
+            sort = st.selectbox("Sort by", PAGE_SORTS, key="cp_sort")
+        listed = count_counterparties(st.session_state.db_path, active_only=sort != "name")
+        with col_p2:
+            page = st.number_input("Page", min_value=1, max_value=max(1, -(-listed // page_size)), value=1, step=1)
+        st.dataframe(list_counterparties_page(
+            st.session_state.db_path, sort=sort, limit=page_size, offset=(int(page) - 1) * page_size
+        ))
 
     st.subheader("Rename")
     col_r1, col_r2, col_r3 = st.columns([2, 2, 1])
@@ -522,6 +670,26 @@ def counterparty_management_section():
             except Exception as e:  # pragma: no cover
                 st.error(f"Merge failed: {e}")
 
+    st.subheader("Suggested Merges")
+    suggestions = suggest_merge_clusters(st.session_state.db_path, limit=10)
+    if not suggestions:
+        st.write("No likely duplicates found.")
+    for i, cluster in enumerate(suggestions):
+        names = ", ".join(
+            f"{m['name']} (#{m['counterparty_id']}, {m['transactions']} tx, last {m['last_seen'] or '-'})"
+            for m in cluster["members"]
+        )
+        col_s1, col_s2 = st.columns([6, 1])
+        with col_s1:
+            st.write(f"{names} — similarity {cluster['similarity']:.0%}")
+        with col_s2:
+            if st.button("Merge", key=f"suggested_merge_{i}"):
+                reassigned = merge_counterparties(
+                    st.session_state.db_path, winner_id=cluster["winner_id"], losing_ids=cluster["losing_ids"]
+                )
+                st.success(f"Merged into #{cluster['winner_id']}. Reassigned {reassigned} transactions.")
+                st.rerun()
+
 
 if __name__ == "__main__":
     main()
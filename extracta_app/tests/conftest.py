@@ -5,10 +5,16 @@ see the directory *containing* the ``src`` package (i.e. ``extracta_app``), not
 the ``src`` directory itself. Previously we appended ``<repo>/extracta_app/src``
 which made subpackages directly importable (``from common import hashing``) but
 left ``src.*`` imports failing. This fixes the path to the parent directory.
+
+Wall-clock benchmarks carry the ``perf`` marker and are skipped unless
+EXTRACTA_PERF=1 is set, so timing noise never fails the default suite.
 """
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 SRC_PACKAGE_DIR = PROJECT_ROOT / "src"  # contains __init__.py
 if SRC_PACKAGE_DIR.is_dir():
@@ -16,3 +22,16 @@ if SRC_PACKAGE_DIR.is_dir():
     if project_path not in sys.path:
         # Prepend so local sources shadow any env-installed similarly named pkgs.
         sys.path.insert(0, project_path)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "perf: wall-clock benchmark; runs only with EXTRACTA_PERF=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("EXTRACTA_PERF") == "1":
+        return
+    skip_perf = pytest.mark.skip(reason="benchmark; set EXTRACTA_PERF=1 to run")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
@@ -63,3 +63,115 @@ def test_counterparty_derivation_assigns_and_is_idempotent(tmp_path: Path):
     second_result = derive_counterparties(str(db_path))
     assert second_result["assigned"] == 0
     assert second_result["skipped"] >= 1
+
+
+def test_counterparty_derivation_scoped_to_document(tmp_path: Path):
+    import sqlite3
+
+    from extracta_app.src.normalization.counterparty_derivation import derive_counterparties  # type: ignore
+    from extracta_app.src.persistence.migrations import PENDING_COUNTERPARTY_FILTER
+
+    db_path = str(tmp_path / "scoped.db")
+    init_db(db_path)
+    bulk_insert_transactions(db_path, [
+        _make_tx("PAYMENT TO ACME CORPORATION", "a.pdf", "h1"),
+        _make_tx("CARD PURCHASE - COFFEE SHOP", "b.pdf", "h2"),
+        _make_tx("POS: BAKERY", "b.pdf", "h2"),
+    ])
+
+    result = derive_counterparties(db_path, source_file_hash="h2")
+    assert result == {"scanned": 2, "assigned": 2, "skipped": 0}
+    by_file = {t["description"]: t["counterparty"] for t in get_transactions(db_path)}
+    assert by_file["PAYMENT TO ACME CORPORATION"] is None  # other document untouched
+    # Unscoped run only examines what is still pending
+    assert derive_counterparties(db_path) == {"scanned": 1, "assigned": 1, "skipped": 0}
+
+    con = sqlite3.connect(db_path)
+    try:
+        plan = con.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM transactions "
+            f"WHERE ({PENDING_COUNTERPARTY_FILTER}) AND source_file_hash=?",
+            ("h2",),
+        ).fetchall()
+    finally:
+        con.close()
+    assert "idx_transactions_counterparty_pending" in plan[0][-1]
+
+
+def test_merchant_aliases_take_precedence_and_matcher_rebuilds_on_change(tmp_path: Path):
+    from src.normalization.merchant_aliases import alias_matcher_for
+    from src.persistence.merchant_aliases_repository import alias_revision, delete_alias, list_aliases, upsert_aliases
+
+    from extracta_app.src.normalization.counterparty_derivation import derive_counterparties  # type: ignore
+
+    db_path = str(tmp_path / "aliases.db")
+    init_db(db_path)
+    assert upsert_aliases(db_path, [("AMZN MKTP", "Amazon"), ("amzn digital", "Amazon")]) == 2
+    matcher = alias_matcher_for(db_path)
+    assert alias_matcher_for(db_path) is matcher  # unchanged table: no rebuild
+    upsert_aliases(db_path, [("AMZN MKTP", "Amazon")])  # no-op update keeps the revision
+    assert alias_matcher_for(db_path) is matcher
+
+    bulk_insert_transactions(db_path, [
+        _make_tx("CARD PURCHASE AMZN Mktp DE*1234", "a.pdf", "h1"),
+        _make_tx("AMZN DIGITAL 998", "a.pdf", "h1"),
+        _make_tx("POS: LIDL", "a.pdf", "h1"),
+    ])
+    derive_counterparties(db_path)
+    by_desc = {t["description"]: t["counterparty"] for t in get_transactions(db_path)}
+    assert by_desc["CARD PURCHASE AMZN Mktp DE*1234"] == "Amazon"
+    assert by_desc["AMZN DIGITAL 998"] == "Amazon"
+    assert by_desc["POS: LIDL"] == "Lidl"  # heuristic fallback
+
+    revision = alias_revision(db_path)
+    delete_alias(db_path, list_aliases(db_path)[0]["alias_id"])
+    assert alias_revision(db_path) == revision + 1
+    assert alias_matcher_for(db_path) is not matcher
+
+
+def test_derivation_resolves_ids_for_more_names_than_one_lookup_chunk(tmp_path: Path, monkeypatch):
+    import sqlite3
+
+    import extracta_app.src.normalization.counterparty_derivation as derivation
+    from extracta_app.src.persistence.counterparties_repository import get_or_create
+
+    monkeypatch.setattr(derivation, "ID_LOOKUP_CHUNK", 3)
+    db_path = str(tmp_path / "chunks.db")
+    init_db(db_path)
+    existing = get_or_create(db_path, display_name="Merchant 2", normalized="merchant 2")
+    bulk_insert_transactions(db_path, [_make_tx(f"POS: MERCHANT {i}", "a.pdf", "h1") for i in range(8)])
+
+    assert derivation.derive_counterparties(db_path, source_file_hash="h1")["assigned"] == 8
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute(
+            "SELECT t.counterparty, t.counterparty_id, c.counterparty_id FROM transactions t "
+            "JOIN counterparties c ON c.name_normalized = lower(t.counterparty)"
+        ).fetchall()
+    finally:
+        con.close()
+    assert len(rows) == 8
+    assert all(tx_cp_id == cp_id for _, tx_cp_id, cp_id in rows)
+    assert {cp_id for name, cp_id, _ in rows if name == "Merchant 2"} == {existing}
+
+
+def test_scoped_derivation_reads_only_the_upload(tmp_path: Path):
+    from src.persistence.connection import connection
+
+    from extracta_app.src.normalization.counterparty_derivation import derive_counterparties  # type: ignore
+
+    db_path = str(tmp_path / "upload.db")
+    init_db(db_path)
+    bulk_insert_transactions(db_path, [_make_tx(f"POS: OLD SHOP {i}", "a.pdf", "h1") for i in range(50)])
+    derive_counterparties(db_path)
+    bulk_insert_transactions(db_path, [_make_tx("POS: NEW SHOP", "b.pdf", "h2")])
+
+    statements: list[str] = []
+    with connection(db_path) as con:
+        con.set_trace_callback(statements.append)
+        try:
+            assert derive_counterparties(db_path, source_file_hash="h2")["assigned"] == 1
+        finally:
+            con.set_trace_callback(None)
+    reads = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert reads and all("WHERE" in s.upper() for s in reads)  # no full-table name -> id load
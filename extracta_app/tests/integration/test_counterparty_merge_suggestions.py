@@ -0,0 +1,62 @@
+import sqlite3
+from pathlib import Path
+
+from src.normalization.counterparty_suggestions import (
+    refresh_signatures,
+    similar_counterparties,
+    suggest_merge_clusters,
+)
+from src.persistence.counterparties_repository import get_or_create, merge, rebuild_counterparty_stats, rename
+from src.persistence.migrations import init_db
+
+NAMES = [
+    "Amazon Eu Sarl", "Amazon Eu S A R L", "Amazon Eu Sarl Luxembourg",
+    "Coffee Island Vilnius", "Coffee Island Vilnus",
+    "Lidl Lietuva", "Maxima Lt", "Bolt Operations",
+]
+
+
+def _seed(db: str) -> dict[str, int]:
+    init_db(db)
+    ids = {n: get_or_create(db, display_name=n, normalized=n.lower()) for n in NAMES}
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, source_file, source_file_hash,"
+        " normalization_hash, year, month, counterparty_id) VALUES (?, '2025-01-01', 'x', 'a', 'h', ?, 2025, '2025-01', ?)",
+        [(f"t{i}", f"n{i}", ids["Amazon Eu S A R L"]) for i in range(3)],
+    )
+    con.commit()
+    con.close()
+    rebuild_counterparty_stats(db)
+    return ids
+
+
+def test_suggestions_cluster_near_duplicates(tmp_path: Path):
+    db = str(tmp_path / "sugg.db")
+    ids = _seed(db)
+    clusters = suggest_merge_clusters(db)
+    as_names = [sorted(m["name"] for m in c["members"]) for c in clusters]
+    assert sorted(["Amazon Eu Sarl", "Amazon Eu S A R L", "Amazon Eu Sarl Luxembourg"]) in as_names
+    assert sorted(["Coffee Island Vilnius", "Coffee Island Vilnus"]) in as_names
+    assert all("Lidl Lietuva" not in names for names in as_names)
+    amazon = clusters[0]  # largest first
+    assert amazon["winner_id"] == ids["Amazon Eu S A R L"]  # most transactions
+    assert sorted(amazon["losing_ids"]) == sorted([ids["Amazon Eu Sarl"], ids["Amazon Eu Sarl Luxembourg"]])
+
+    merge(db, winner_id=amazon["winner_id"], losing_ids=amazon["losing_ids"])
+    remaining = suggest_merge_clusters(db)
+    assert [sorted(m["name"] for m in c["members"]) for c in remaining] == [
+        ["Coffee Island Vilnius", "Coffee Island Vilnus"]
+    ]
+
+
+def test_signatures_are_incremental(tmp_path: Path):
+    db = str(tmp_path / "incr.db")
+    ids = _seed(db)
+    assert refresh_signatures(db) == len(NAMES)
+    assert refresh_signatures(db) == 0
+    new_id = get_or_create(db, display_name="Bolt Operations Ou", normalized="bolt operations ou")
+    assert refresh_signatures(db) == 1
+    assert [c["counterparty_id"] for c in similar_counterparties(db, new_id)] == [ids["Bolt Operations"]]
+    rename(db, counterparty_id=ids["Maxima Lt"], new_display_name="Maxima Lietuva")
+    assert refresh_signatures(db) == 1  # rename trigger dropped the stale signature
@@ -0,0 +1,141 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from src.common.records import TransactionRecord
+from src.normalization.counterparty_derivation import derive_counterparties
+from src.persistence.counterparties_repository import (
+    count_counterparties,
+    get_or_create,
+    list_counterparties_page,
+    merge,
+    rebuild_counterparty_stats,
+    rename,
+)
+from src.persistence.migrations import init_db
+from src.persistence.transactions_repository import replace_document_transactions
+
+ROWS = [
+    # (transaction_id, date, description, amount_in, amount_out, source_file_hash)
+    ("t1", "2025-01-03", "POS: Coffee Island", 0.0, 3.5, "h1"),
+    ("t2", "2025-01-09", "POS: Coffee Island", 0.0, 4.0, "h1"),
+    ("t3", "2025-02-01", "POS: Coffee Island", 0.0, 2.5, "h2"),
+    ("t4", "2025-01-15", "POS: Lidl", 0.0, 20.0, "h1"),
+    ("t5", "2025-01-20", "Transfer from: Employer", 1500.0, 0.0, "h2"),
+]
+
+
+def _seed(db: str) -> None:
+    init_db(db)
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, amount_in, amount_out, source_file,"
+        " source_file_hash, normalization_hash, year, month) VALUES (?, ?, ?, ?, ?, 'a.pdf', ?, ?, 2025, '2025-01')",
+        [(tid, d, desc, a_in, a_out, h, f"n{tid}") for tid, d, desc, a_in, a_out, h in ROWS],
+    )
+    con.commit()
+    con.close()
+    derive_counterparties(db)
+
+
+def _record(tid: str, date: str, desc: str, amount_out: float, h: str) -> TransactionRecord:
+    return TransactionRecord(
+        tid, date, desc, 0.0, amount_out, None, None, "a.pdf", h, f"n{tid}", 2025, date[:7], "m1", "l1"
+    )
+
+
+def _stats(db: str) -> dict[int, tuple]:
+    con = sqlite3.connect(db)
+    try:
+        return {r[0]: tuple(r[1:]) for r in con.execute("SELECT * FROM counterparty_stats")}
+    finally:
+        con.close()
+
+
+def _assert_matches_rebuild(db: str) -> dict[int, tuple]:
+    incremental = _stats(db)
+    rebuild_counterparty_stats(db)
+    assert _stats(db) == incremental
+    return incremental
+
+
+def _id(db: str, name: str) -> int:
+    return get_or_create(db, display_name=name, normalized=name.lower())
+
+
+def test_stats_follow_derivation_and_replacement(tmp_path: Path):
+    db = str(tmp_path / "stats.db")
+    _seed(db)
+    stats = _assert_matches_rebuild(db)
+    assert stats[_id(db, "Coffee Island")] == (3, 0, 1000, "2025-01-03", "2025-02-01")
+    assert stats[_id(db, "Employer")] == (1, 150000, 0, "2025-01-20", "2025-01-20")
+
+    # t2 changes: its row is new content, so it drops out until derivation names it again
+    replace_document_transactions(db, "h1", [
+        _record("t1", "2025-01-03", "POS: Coffee Island", 3.5, "h1"),
+        _record("t2", "2024-12-30", "POS: Coffee Island", 6.0, "h1"),
+        _record("t4", "2025-01-15", "POS: Lidl", 20.0, "h1"),
+    ])
+    assert _assert_matches_rebuild(db)[_id(db, "Coffee Island")] == (2, 0, 600, "2025-01-03", "2025-02-01")
+    derive_counterparties(db, source_file_hash="h1")
+    assert _assert_matches_rebuild(db)[_id(db, "Coffee Island")] == (3, 0, 1200, "2024-12-30", "2025-02-01")
+
+
+def test_stats_totals_are_exact_cents(tmp_path: Path):
+    db = str(tmp_path / "stats.db")
+    init_db(db)
+    replace_document_transactions(db, "h1", [_record(f"t{i}", "2025-01-01", "POS: Kiosk", 0.1, "h1") for i in range(10)])
+    replace_document_transactions(db, "h2", [_record("u", "2025-01-02", "POS: Kiosk", 0.2, "h2")])
+    derive_counterparties(db)
+    replace_document_transactions(db, "h1", [])
+    kiosk = list_counterparties_page(db)[0]
+    assert (kiosk["tx_count"], kiosk["total_out"]) == (1, 0.2)
+    assert _assert_matches_rebuild(db)[kiosk["counterparty_id"]] == (1, 0, 20, "2025-01-02", "2025-01-02")
+
+
+def test_stats_follow_merge_delete_and_rename(tmp_path: Path):
+    db = str(tmp_path / "stats.db")
+    _seed(db)
+    coffee, lidl = _id(db, "Coffee Island"), _id(db, "Lidl")
+    merge(db, winner_id=coffee, losing_ids=[lidl])
+    stats = _assert_matches_rebuild(db)
+    assert lidl not in stats
+    assert stats[coffee] == (4, 0, 3000, "2025-01-03", "2025-02-01")
+
+    rename(db, counterparty_id=coffee, new_display_name="Coffee Island LT")
+    assert _stats(db)[coffee] == stats[coffee]
+
+    # removing the boundary rows recomputes first / last date
+    replace_document_transactions(db, "h2", [])
+    stats = _assert_matches_rebuild(db)
+    assert stats[coffee] == (3, 0, 2750, "2025-01-03", "2025-01-15")
+    assert _id(db, "Employer") not in stats
+
+
+def test_pages_sort_by_activity_without_scanning(tmp_path: Path):
+    db = str(tmp_path / "stats.db")
+    _seed(db)
+    _id(db, "Never Used")
+    assert count_counterparties(db) == 4
+    assert count_counterparties(db, active_only=True) == 3
+    by_count = list_counterparties_page(db, sort="transactions")
+    assert [c["name"] for c in by_count] == ["Coffee Island", "Employer", "Lidl"]
+    assert by_count[0]["tx_count"] == 3 and by_count[0]["last_date"] == "2025-02-01"
+    assert [c["name"] for c in list_counterparties_page(db, sort="last_seen", limit=2)] == ["Coffee Island", "Employer"]
+    assert [c["name"] for c in list_counterparties_page(db, sort="last_seen", limit=2, offset=2)] == ["Lidl"]
+    by_name = list_counterparties_page(db, sort="name")
+    assert [c["name"] for c in by_name][-1] == "Never Used"
+    assert by_name[-1]["tx_count"] == 0 and by_name[-1]["last_date"] is None
+    with pytest.raises(ValueError):
+        list_counterparties_page(db, sort="amount")
+
+    con = sqlite3.connect(db)
+    plan = " ".join(
+        r[-1] for r in con.execute(
+            "EXPLAIN QUERY PLAN SELECT s.counterparty_id FROM counterparty_stats s JOIN counterparties c"
+            " ON c.counterparty_id = s.counterparty_id ORDER BY s.tx_count DESC, s.counterparty_id DESC LIMIT 5"
+        )
+    )
+    con.close()
+    assert "idx_counterparty_stats_tx_count" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,180 @@
+from pathlib import Path
+
+import pytest
+from src.normalization.engine import normalize_records, normalize_rows_streaming
+from src.normalization.quarantine import replay_quarantined
+from src.normalization.renormalization import renormalize
+from src.persistence.documents_repository import delete_document_by_file_hash
+from src.persistence.migrations import init_db
+from src.persistence.quarantine_repository import (
+    count_quarantined_rows,
+    list_quarantined_rows,
+    save_quarantined_rows,
+)
+from src.persistence.raw_artifacts_repository import get_raw_artifact, save_raw_artifact
+from src.persistence.transactions_repository import bulk_insert_transactions, get_transactions
+
+HEADER_MAP = {"Date": "Date", "Description": "Description", "Amount": "Amount"}
+FILE_HASH = "c" * 64
+ROWS = [
+    {"Date": "05/01/2025", "Description": "Coffee", "Amount": "-3,50"},
+    {"Date": "06/01/2025", "Description": "Bakery", "Amount": "-2,10"},
+    {"Date": "O7/01/2025", "Description": "Salary", "Amount": "1.000,00"},  # OCR: letter O
+    {"Date": "08/01/2025", "Description": "Refund", "Amount": "12,5O"},
+    {"Date": "09/01/2025", "Amount": "-1,00"},
+    {"Date": "13/01/2025", "Description": "Rent", "Amount": "-700,00"},
+]
+
+
+def _normalize(rows, quarantined):
+    return normalize_records(
+        rows,
+        header_map=HEADER_MAP,
+        mapping_version="v1",
+        logic_version="0.1.0",
+        source_file="stmt.csv",
+        source_file_hash=FILE_HASH,
+        deterministic_ids=True,
+        quarantined=quarantined,
+    )
+
+
+def test_tolerant_normalization_keeps_good_rows():
+    quarantined = []
+    records = _normalize(ROWS, quarantined)
+    assert sorted(r.description for r in records) == ["Bakery", "Coffee", "Rent"]
+    assert [(q["row_index"], q["reason"].split(":")[0]) for q in quarantined] == [
+        (2, "Unrecognized date format"),
+        (3, "Invalid numeric value"),
+        (4, "Missing required columns in row"),
+    ]
+    # Without the collector the first bad row still aborts the file
+    with pytest.raises(ValueError):
+        _normalize(ROWS, None)
+
+
+def test_streaming_quarantine_indexes_span_chunks():
+    quarantined = []
+    chunks = list(normalize_rows_streaming(
+        ROWS, header_map=HEADER_MAP, mapping_version="v1", logic_version="0.1.0",
+        source_file="stmt.csv", source_file_hash=FILE_HASH, chunk_size=2, quarantined=quarantined,
+    ))
+    assert sum(len(c) for c in chunks) == 3
+    assert [q["row_index"] for q in quarantined] == [2, 3, 4]
+
+
+def _setup(tmp_path: Path) -> str:
+    db = str(tmp_path / "quarantine.db")
+    init_db(db)
+    quarantined = []
+    bulk_insert_transactions(db, _normalize(ROWS, quarantined))
+    save_raw_artifact(db, file_hash=FILE_HASH, source_file="stmt.csv", rows=ROWS, header_map=HEADER_MAP)
+    save_quarantined_rows(db, source_file_hash=FILE_HASH, source_file="stmt.csv", entries=quarantined)
+    return db
+
+
+def _fix(row):
+    if "Description" not in row:
+        return None  # leave for manual review
+    return {**row, "Date": row["Date"].replace("O", "0"), "Amount": row["Amount"].replace("O", "0")}
+
+
+def test_replay_with_fix_inserts_rows_and_patches_artifact(tmp_path: Path):
+    db = _setup(tmp_path)
+    # Saving the same entries again does not duplicate them
+    save_quarantined_rows(
+        db, source_file_hash=FILE_HASH, source_file="stmt.csv",
+        entries=[{"row_index": 2, "row": ROWS[2], "reason": "again"}],
+    )
+    assert count_quarantined_rows(db) == 3
+
+    stats = replay_quarantined(db, mapping_version="v1", logic_version="0.1.0", fix=_fix)
+    assert stats == {"replayed": 2, "inserted": 2, "still_quarantined": 0, "skipped": 1}
+    rows = {t["description"]: t for t in get_transactions(db)}
+    # File formats (day-first dates, decimal comma) come from the whole artifact
+    assert rows["Salary"]["transaction_date"] == "2025-01-07"
+    assert rows["Salary"]["amount_in"] == 1000.0
+    assert rows["Refund"]["amount_in"] == 12.5
+    assert [q["row_index"] for q in list_quarantined_rows(db)] == [4]
+    assert get_raw_artifact(db, FILE_HASH)["rows"][2]["Date"] == "07/01/2025"
+
+    # Re-normalization now sees the corrected rows and keeps only row 4 quarantined
+    stats = renormalize(db, mapping_version="v1", logic_version="0.2.0")
+    assert stats["rows_inserted"] == 5 and stats["quarantined"] == 1
+    assert [q["row_index"] for q in list_quarantined_rows(db)] == [4]
+
+
+def test_replay_without_fix_updates_reasons_and_delete_cascades(tmp_path: Path):
+    db = _setup(tmp_path)
+    stats = replay_quarantined(db, mapping_version="v1", logic_version="0.1.0")
+    assert stats["replayed"] == 0 and stats["still_quarantined"] == 3
+    assert count_quarantined_rows(db, source_file_hash=FILE_HASH) == 3
+    delete_document_by_file_hash(db, FILE_HASH)
+    assert count_quarantined_rows(db) == 0
+
+
+DUPLICATE_ROWS = [
+    {"Date": "05/01/2025", "Description": "Coffee", "Amount": "-3,50"},
+    {"Date": "05/01/2025", "Description": "Coffee", "Amount": "-3,5O"},  # same purchase twice, OCR slip
+    {"Date": "06/01/2025", "Description": "Bakery", "Amount": "-2,10"},
+]
+
+
+def _setup_duplicate(tmp_path: Path) -> str:
+    db = str(tmp_path / "quarantine.db")
+    init_db(db)
+    quarantined = []
+    bulk_insert_transactions(db, _normalize(DUPLICATE_ROWS, quarantined))
+    save_raw_artifact(db, file_hash=FILE_HASH, source_file="stmt.csv", rows=DUPLICATE_ROWS, header_map=HEADER_MAP)
+    save_quarantined_rows(db, source_file_hash=FILE_HASH, source_file="stmt.csv", entries=quarantined)
+    return db
+
+
+def test_replayed_repeat_of_stored_row_gets_next_ordinal(tmp_path: Path):
+    db = _setup_duplicate(tmp_path)
+    stats = replay_quarantined(db, mapping_version="v1", logic_version="0.1.0", fix=_fix)
+    assert stats == {"replayed": 1, "inserted": 1, "still_quarantined": 0, "skipped": 0}
+    coffee = [t for t in get_transactions(db) if t["description"] == "Coffee"]
+    assert len(coffee) == 2 and len({t["transaction_id"] for t in coffee}) == 2
+    assert count_quarantined_rows(db) == 0
+    # Same ids as importing the corrected file in one go
+    expected = {r.transaction_id for r in _normalize([_fix(r) for r in DUPLICATE_ROWS], [])}
+    assert {t["transaction_id"] for t in get_transactions(db)} == expected
+
+
+def test_replay_keeps_rows_quarantined_when_insert_conflicts(tmp_path: Path, monkeypatch):
+    import src.normalization.quarantine as quarantine
+
+    db = _setup_duplicate(tmp_path)
+    # Pretend the stored rows are invisible: ordinal 0 then collides with the imported Coffee row
+    monkeypatch.setattr(quarantine, "document_transaction_ids", lambda *_: {})
+    stats = replay_quarantined(db, mapping_version="v1", logic_version="0.1.0", fix=_fix)
+    assert stats == {"replayed": 0, "inserted": 0, "still_quarantined": 1, "skipped": 0}
+    assert len(get_transactions(db)) == 2
+    assert [q["reason"] for q in list_quarantined_rows(db)] == [quarantine.REPLAY_CONFLICT_REASON]
+
+
+def test_failed_quarantine_write_rolls_back_the_replayed_insert(tmp_path: Path, monkeypatch):
+    import sqlite3
+
+    import src.normalization.quarantine as quarantine
+
+    db = _setup(tmp_path)
+    before = sorted(t["transaction_id"] for t in get_transactions(db))
+    quarantined = [(q["row_index"], q["reason"]) for q in list_quarantined_rows(db)]
+
+    def failing_write(con, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(quarantine, "write_quarantined_rows", failing_write)
+    with pytest.raises(sqlite3.OperationalError):
+        replay_quarantined(db, mapping_version="v1", logic_version="0.1.0", fix=_fix)
+    assert sorted(t["transaction_id"] for t in get_transactions(db)) == before
+    assert [(q["row_index"], q["reason"]) for q in list_quarantined_rows(db)] == quarantined
+    assert get_raw_artifact(db, FILE_HASH)["rows"][2]["Date"] == "O7/01/2025"
+
+    # Nothing was half-applied: the next replay inserts each row exactly once
+    monkeypatch.undo()
+    stats = replay_quarantined(db, mapping_version="v1", logic_version="0.1.0", fix=_fix)
+    assert stats["inserted"] == 2
+    assert len(get_transactions(db)) == len(before) + 2
@@ -0,0 +1,101 @@
+import sqlite3
+from pathlib import Path
+
+from src.categorization.service import assign_category, create_category
+from src.normalization import renormalization
+from src.normalization.engine import normalize_records
+from src.normalization.renormalization import find_stale_documents, renormalize
+from src.persistence.migrations import init_db
+from src.persistence.raw_artifacts_repository import save_raw_artifact
+from src.persistence.transactions_repository import bulk_insert_transactions, get_transactions
+
+HEADER_MAP = {"Date": "Date", "Description": "Description", "Amount": "Amount"}
+
+
+def _ingest(db: str, file_hash: str, rows: list[dict]) -> None:
+    records = normalize_records(
+        rows,
+        header_map=HEADER_MAP,
+        mapping_version="v1",
+        logic_version="0.1.0",
+        source_file=f"{file_hash[:4]}.csv",
+        source_file_hash=file_hash,
+        deterministic_ids=True,
+    )
+    bulk_insert_transactions(db, records)
+    save_raw_artifact(db, file_hash=file_hash, source_file=f"{file_hash[:4]}.csv", rows=rows, header_map=HEADER_MAP)
+
+
+def _setup(tmp_path: Path) -> str:
+    db = str(tmp_path / "renorm.db")
+    init_db(db)
+    _ingest(db, "a" * 64, [
+        {"Date": "2025-01-02", "Description": "Coffee", "Amount": "-3.50"},
+        {"Date": "2025-01-03", "Description": "Salary", "Amount": "1000"},
+    ])
+    _ingest(db, "b" * 64, [{"Date": "2025-02-01", "Description": "Rent", "Amount": "-700"}])
+    return db
+
+
+def test_renormalize_replays_stale_documents_and_carries_categories(tmp_path: Path):
+    db = _setup(tmp_path)
+    cat = create_category(db, "Food")
+    coffee = next(t for t in get_transactions(db) if t["description"] == "Coffee")
+    assign_category(db, coffee["transaction_id"], cat)
+
+    assert find_stale_documents(db, mapping_version="v1", logic_version="0.1.0") == []
+    assert find_stale_documents(db, mapping_version="v1", logic_version="0.2.0") == ["a" * 64, "b" * 64]
+
+    progress = []
+    stats = renormalize(
+        db, mapping_version="v1", logic_version="0.2.0",
+        progress=lambda done, total, h: progress.append((done, total)),
+    )
+    assert stats["stale"] == 2 and stats["renormalized"] == 2 and stats["failed"] == 0
+    assert stats["rows_removed"] == stats["rows_inserted"] == 3
+    assert stats["carried"] == 1
+    assert progress == [(1, 2), (2, 2)]
+
+    rows = get_transactions(db)
+    assert len(rows) == 3
+    assert {r["logic_version"] for r in rows} == {"0.2.0"}
+    assert next(r for r in rows if r["description"] == "Coffee")["category_id"] == cat
+
+    # Nothing stale afterwards: a second run is a no-op
+    assert renormalize(db, mapping_version="v1", logic_version="0.2.0")["stale"] == 0
+
+
+def test_renormalize_resumes_after_partial_run(tmp_path: Path):
+    db = _setup(tmp_path)
+    first = renormalize(db, mapping_version="v2", logic_version="0.1.0", max_documents=1)
+    assert first["renormalized"] == 1
+    assert find_stale_documents(db, mapping_version="v2", logic_version="0.1.0") == ["b" * 64]
+
+    second = renormalize(db, mapping_version="v2", logic_version="0.1.0", workers=2)
+    assert second["stale"] == 1 and second["renormalized"] == 1
+    assert {r["mapping_version"] for r in get_transactions(db)} == {"v2"}
+
+
+def test_documents_without_artifact_are_reported(tmp_path: Path):
+    db = _setup(tmp_path)
+    con = sqlite3.connect(db)
+    con.execute("DELETE FROM raw_artifacts WHERE file_hash=?", ("b" * 64,))
+    con.commit()
+    con.close()
+    stats = renormalize(db, mapping_version="v1", logic_version="0.2.0")
+    assert stats["renormalized"] == 1
+    assert stats["missing_artifacts"] == 1
+
+
+def test_failed_quarantine_write_rolls_back_the_row_swap(tmp_path: Path, monkeypatch):
+    db = _setup(tmp_path)
+    before = sorted((t["transaction_id"], t["logic_version"]) for t in get_transactions(db))
+
+    def failing_write(con, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(renormalization, "write_quarantined_rows", failing_write)
+    stats = renormalize(db, mapping_version="v1", logic_version="0.2.0")
+    assert stats["failed"] == 2 and stats["renormalized"] == 0
+    assert sorted((t["transaction_id"], t["logic_version"]) for t in get_transactions(db)) == before
+    assert len(find_stale_documents(db, mapping_version="v1", logic_version="0.2.0")) == 2
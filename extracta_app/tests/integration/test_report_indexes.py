@@ -0,0 +1,115 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from src.persistence import migrations
+from src.persistence.connection import connection
+from src.persistence.migrations import CURRENT_SCHEMA_VERSION, init_db
+from src.reporting.query_builder import build_report_query
+
+SUM_OUT = [{"field": "amount_out", "func": "sum"}]
+REPORT_INDEX = "idx_transactions_report_date"
+CATEGORY_INDEX = "idx_transactions_report_category"
+
+
+def _insert(db: str, n: int) -> None:
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, amount_out, source_file,"
+        " source_file_hash, normalization_hash, year, month, category_id) VALUES (?, ?, 'x', ?, 'a', 'h', ?, ?, ?, ?)",
+        (
+            (f"t{i}", f"{2023 + i % 3}-{i % 12 + 1:02d}-{i % 28 + 1:02d}", float(i % 50), f"n{i}", 2023 + i % 3,
+             f"{2023 + i % 3}-{i % 12 + 1:02d}", i % 7 or None)
+            for i in range(n)
+        ),
+    )
+    con.commit()
+    con.close()
+
+
+def _plan(db: str, sql: str, params) -> str:
+    con = sqlite3.connect(db)
+    try:
+        return " | ".join(r[-1] for r in con.execute("EXPLAIN QUERY PLAN " + sql, params))
+    finally:
+        con.close()
+
+
+def test_upgrade_builds_report_indexes_and_analyzes(tmp_path: Path, monkeypatch):
+    db = str(tmp_path / "upgrade.db")
+    with monkeypatch.context() as m:
+        m.setattr(migrations, "MIGRATIONS", [step for step in migrations.MIGRATIONS if step[0] < 13])
+        m.setattr(migrations, "CURRENT_SCHEMA_VERSION", 12)
+        init_db(db)
+    _insert(db, 5000)
+
+    init_db(db)
+    con = sqlite3.connect(db)
+    try:
+        indexes = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        analyzed = {r[0] for r in con.execute("SELECT idx FROM sqlite_stat1 WHERE tbl='transactions'")}
+        version = con.execute("SELECT MAX(version) FROM schema_version").fetchone()[0]
+    finally:
+        con.close()
+    assert {REPORT_INDEX, CATEGORY_INDEX} <= indexes
+    assert {REPORT_INDEX, CATEGORY_INDEX} <= analyzed
+    assert version == CURRENT_SCHEMA_VERSION
+
+
+@pytest.mark.parametrize(
+    "request_, index, seek",
+    [
+        # Unfiltered shapes scan whichever covering index is narrower
+        ({"grouping": ["month"], "aggregations": SUM_OUT}, None, False),
+        ({"grouping": ["category_id"], "aggregations": SUM_OUT}, CATEGORY_INDEX, False),
+        ({"grouping": ["year"], "aggregations": SUM_OUT}, None, False),
+        ({"aggregations": [{"field": "amount_in", "func": "count"}]}, None, False),
+        ({"filters": {"date_from": "2024-01-01", "date_to": "2024-03-31"}, "grouping": ["month"],
+          "aggregations": SUM_OUT}, REPORT_INDEX, True),
+        ({"filters": {"category_ids": [1, 2]}, "grouping": ["month", "category_id"], "aggregations": SUM_OUT},
+         CATEGORY_INDEX, True),
+        ({"filters": {"category_ids": [4]}, "grouping": ["year"], "aggregations": SUM_OUT}, CATEGORY_INDEX, True),
+    ],
+)
+def test_report_queries_are_answered_from_the_report_indexes(tmp_path: Path, request_, index, seek):
+    db = str(tmp_path / "reports.db")
+    init_db(db)
+    _insert(db, 2000)
+    plan = _plan(db, *build_report_query(request_))
+    indexes = [index] if index else [REPORT_INDEX, CATEGORY_INDEX]
+    assert any(f"COVERING INDEX {name}" in plan for name in indexes)
+    assert plan.startswith("SEARCH" if seek else "SCAN")
+
+
+def test_date_and_category_filters_seek_a_report_index(tmp_path: Path):
+    db = str(tmp_path / "reports.db")
+    init_db(db)
+    _insert(db, 2000)
+    request_ = {"filters": {"date_from": "2024-01-01", "category_ids": [3]}, "grouping": ["year", "month"],
+                "aggregations": [{"field": "amount_in", "func": "avg"}]}
+    # The planner seeks whichever index is more selective; only the category index needs table lookups
+    plan = _plan(db, *build_report_query(request_))
+    assert plan.startswith(f"SEARCH transactions USING COVERING INDEX {REPORT_INDEX}") or plan.startswith(
+        f"SEARCH transactions USING INDEX {CATEGORY_INDEX}"
+    )
+
+
+def test_category_in_use_check_seeks_the_category_index(tmp_path: Path):
+    db = str(tmp_path / "reports.db")
+    init_db(db)
+    _insert(db, 2000)
+    plan = _plan(db, "SELECT 1 FROM transactions WHERE category_id=? LIMIT 1", [3])
+    assert plan.startswith(f"SEARCH transactions USING COVERING INDEX {CATEGORY_INDEX} (category_id=?)")
+
+
+def test_upgrade_restores_connection_pragmas(tmp_path: Path, monkeypatch):
+    db = str(tmp_path / "pragmas.db")
+    with monkeypatch.context() as m:
+        m.setattr(migrations, "MIGRATIONS", [step for step in migrations.MIGRATIONS if step[0] < 13])
+        m.setattr(migrations, "CURRENT_SCHEMA_VERSION", 12)
+        init_db(db)
+    with connection(db) as con:
+        before = [con.execute(f"PRAGMA {p}").fetchone()[0] for p in ("analysis_limit", "cache_size")]
+    init_db(db)
+    with connection(db) as con:
+        assert [con.execute(f"PRAGMA {p}").fetchone()[0] for p in ("analysis_limit", "cache_size")] == before
@@ -0,0 +1,123 @@
+import sqlite3
+from pathlib import Path
+
+from src.persistence.counterparties_repository import get_or_create, merge, rename
+from src.persistence.documents_repository import create_document, delete_document_by_file_hash
+from src.persistence.migrations import init_db
+from src.persistence.search_repository import (
+    rebuild_search_indexes,
+    search_counterparties,
+    search_transactions,
+)
+from src.persistence.transactions_repository import bulk_insert_transactions, replace_document_transactions
+
+NAMES = ["Amazon Eu Sarl", "Coffee Island Vilnius", "Lidl Lietuva", "100% Cotton_Shop"]
+
+
+def _insert_tx(db: str, rows: list[tuple[str, str, str]], file_hash: str = "h") -> None:
+    bulk_insert_transactions(db, [
+        {
+            "transaction_id": tid,
+            "transaction_date": date,
+            "description": desc,
+            "amount_in": 0.0,
+            "amount_out": 0.0,
+            "source_file": "a.pdf",
+            "source_file_hash": file_hash,
+            "normalization_hash": f"n{tid}",
+            "year": 2025,
+            "month": "2025-01",
+        }
+        for tid, date, desc in rows
+    ])
+
+
+def _fts_intact(db: str) -> bool:
+    con = sqlite3.connect(db)
+    try:
+        con.execute("INSERT INTO transactions_fts(transactions_fts, rank) VALUES ('integrity-check', 1)")
+        return True
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        con.close()
+
+
+def _seed(db: str) -> dict[str, int]:
+    init_db(db)
+    ids = {n: get_or_create(db, display_name=n, normalized=n.lower()) for n in NAMES}
+    _insert_tx(db, [
+        ("t1", "2025-01-02", "CARD PURCHASE Coffee Island Vilnius"),
+        ("t2", "2025-01-05", "CARD PURCHASE coffee island kaunas"),
+        ("t3", "2025-01-03", "Transfer to savings"),
+    ])
+    return ids
+
+
+def test_substring_search_is_case_insensitive_and_ranked(tmp_path: Path):
+    db = str(tmp_path / "search.db")
+    _seed(db)
+    assert [c["name"] for c in search_counterparties(db, "ISLAND")] == ["Coffee Island Vilnius"]
+    assert [c["name"] for c in search_counterparties(db, "li")] == ["Lidl Lietuva"]
+    assert [t["transaction_id"] for t in search_transactions(db, "coffee island")] == ["t2", "t1"]
+    assert [t["transaction_id"] for t in search_transactions(db, "coffee island", limit=1)] == ["t2"]
+    assert search_transactions(db, "  ") == []
+
+
+def test_query_syntax_and_like_wildcards_are_literal(tmp_path: Path):
+    db = str(tmp_path / "search.db")
+    _seed(db)
+    assert [c["name"] for c in search_counterparties(db, '0% "Cot')] == []
+    assert [c["name"] for c in search_counterparties(db, "0% Cot")] == ["100% Cotton_Shop"]
+    assert [c["name"] for c in search_counterparties(db, "n_")] == ["100% Cotton_Shop"]
+    assert [c["name"] for c in search_counterparties(db, "AND")] == ["Coffee Island Vilnius"]
+
+
+def test_indexes_follow_inserts_renames_merges_and_deletes(tmp_path: Path):
+    db = str(tmp_path / "search.db")
+    ids = _seed(db)
+    rename(db, counterparty_id=ids["Lidl Lietuva"], new_display_name="Lidl Kaunas")
+    assert search_counterparties(db, "Lietuva") == []
+    assert [c["name"] for c in search_counterparties(db, "kaunas")] == ["Lidl Kaunas"]
+
+    merge(db, winner_id=ids["Amazon Eu Sarl"], losing_ids=[ids["Lidl Lietuva"]])
+    assert search_counterparties(db, "kaunas") == []
+
+    replace_document_transactions(db, "h", [])
+    assert search_transactions(db, "coffee") == []
+    _insert_tx(db, [("t9", "2025-02-01", "POS Maxima Vilnius")])
+    assert [t["transaction_id"] for t in search_transactions(db, "maxima")] == ["t9"]
+    assert _fts_intact(db)
+
+
+def test_transaction_index_is_synced_per_write_not_per_row(tmp_path: Path):
+    db = str(tmp_path / "search.db")
+    _seed(db)
+    con = sqlite3.connect(db)
+    triggers = {r[0] for r in con.execute("SELECT tbl_name FROM sqlite_master WHERE type='trigger' AND sql LIKE '%_fts%'")}
+    con.close()
+    assert triggers == {"counterparties"}
+
+    create_document(db, filename="b.pdf", file_hash="h2", document_type="Bank Statement")
+    _insert_tx(db, [("t5", "2025-01-09", "POS Maxima Siauliai"), ("t6", "2025-01-10", "POS Rimi Siauliai")], "h2")
+    _insert_tx(db, [("t5", "2025-01-09", "POS Maxima Siauliai")], "h2")  # ignored duplicate: not indexed twice
+    assert [t["transaction_id"] for t in search_transactions(db, "siauliai")] == ["t6", "t5"]
+
+    delete_document_by_file_hash(db, "h2")
+    assert search_transactions(db, "siauliai") == []
+    _insert_tx(db, [("t7", "2025-01-11", "POS Norfa Siauliai")])  # reuses the freed top rowids
+    assert [t["transaction_id"] for t in search_transactions(db, "siauliai")] == ["t7"]
+    assert _fts_intact(db)
+
+
+def test_search_uses_fts_index_and_rebuild_keeps_results(tmp_path: Path):
+    db = str(tmp_path / "search.db")
+    _seed(db)
+    con = sqlite3.connect(db)
+    plan = con.execute(
+        "EXPLAIN QUERY PLAN SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?", ('"coffee"',)
+    ).fetchall()
+    con.close()
+    assert "VIRTUAL TABLE INDEX" in plan[0][-1]
+    assert rebuild_search_indexes(db) is True
+    assert [t["transaction_id"] for t in search_transactions(db, "savings")] == ["t3"]
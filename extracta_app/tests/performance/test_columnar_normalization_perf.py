@@ -0,0 +1,54 @@
+"""Benchmark: columnar (NumPy) normalization vs the row engine.
+
+Marked ``perf``: runs only with EXTRACTA_PERF=1 (parity is covered by the
+unit tests). Row count defaults to a CI-friendly size; set
+EXTRACTA_PERF_ROWS=1000000 for the full-scale measurement. Timings print with
+``pytest -s``.
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from src.normalization.columnar import columns_to_rows, normalize_columns  # noqa: E402
+from src.normalization.engine import normalize_rows  # noqa: E402
+
+ROWS = int(os.environ.get("EXTRACTA_PERF_ROWS", "50000"))
+HEADER_MAP = {"Date": "transaction_date", "Description": "description", "Amount": "amount"}
+PARAMS = {"mapping_version": "v1", "logic_version": "0.1.0", "source_file": "bench.pdf", "source_file_hash": "b" * 64}
+
+
+@pytest.mark.perf
+def test_columnar_engine_is_identical_and_faster():
+    raw = [
+        {
+            "Date": f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}",
+            "Description": f"Transaction {i:07d}",
+            "Amount": f"{'-' if i % 3 else ''}{(i * 1.23) % 5000:,.2f}",
+        }
+        for i in range(ROWS)
+    ]
+    dates = [r["Date"] for r in raw]
+    descriptions = [r["Description"] for r in raw]
+    amounts = [r["Amount"] for r in raw]
+
+    start = time.perf_counter()
+    row_result = normalize_rows(raw, header_map=HEADER_MAP, **PARAMS)
+    row_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    col_result = normalize_columns(dates, descriptions, amounts, **PARAMS)
+    col_s = time.perf_counter() - start
+
+    print(f"\nnormalization ({ROWS} rows): row engine {row_s:.3f}s, columnar {col_s:.3f}s, "
+          f"speedup {row_s / col_s:.2f}x")
+    assert col_result["normalization_hash"].tolist() == [r["normalization_hash"] for r in row_result]
+    sample = columns_to_rows({k: v[:100] for k, v in col_result.items()})
+    for got, want in zip(sample, row_result[:100], strict=True):
+        want = dict(want, transaction_id=got["transaction_id"])
+        assert got == want
+    assert col_s < row_s
@@ -0,0 +1,136 @@
+"""Benchmark: per-call latency of repository functions with the shared connection manager.
+
+The former repositories opened a fresh connection per call with SQLite's
+defaults (rollback journal, synchronous=FULL). Both sides run the same
+statements: a primary-key read (`get_document_by_file_hash`) and a
+single-row committed write (`assign_category`); the former path is
+reproduced on a copy of the database switched back to the rollback
+journal. EXTRACTA_PERF_CALLS sets the number of calls. Timings print with
+``pytest -s``.
+
+Bulk inserts are measured too but carry no expectation: one executemany in
+one transaction already amortized the connect and the commit fsync, and
+throughput is dominated by index / search-index maintenance, so the manager
+leaves it roughly unchanged.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+
+from src.categorization.service import assign_category, create_category
+from src.persistence.connection import close_connections
+from src.persistence.documents_repository import create_document, get_document_by_file_hash
+from src.persistence.migrations import init_db
+from src.persistence.transactions_repository import INSERT_SQL, TX_COLUMNS, bulk_insert_transactions
+
+CALLS = int(os.environ.get("EXTRACTA_PERF_CALLS", "2000"))
+WRITES = max(CALLS // 4, 1)
+TRANSACTIONS = 10000
+BULK_ROWS = int(os.environ.get("EXTRACTA_PERF_BULK_ROWS", "20000"))
+
+
+def _seed(db: str) -> int:
+    init_db(db)
+    create_document(db, filename="a.csv", file_hash="doc", document_type="bank_statement")
+    category_id = create_category(db, "Groceries")
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, source_file, source_file_hash,"
+        " normalization_hash, year, month) VALUES (?, '2025-01-01', 'x', 'a.csv', 'doc', ?, 2025, '2025-01')",
+        ((f"t{i}", f"n{i}") for i in range(TRANSACTIONS)),
+    )
+    con.commit()
+    con.close()
+    return category_id
+
+
+def _legacy_read(db: str) -> None:
+    con = sqlite3.connect(db)
+    try:
+        con.execute(
+            "SELECT document_id, filename, file_hash, upload_date, status, document_type FROM documents WHERE file_hash=?",
+            ("doc",),
+        ).fetchone()
+    finally:
+        con.close()
+
+
+def _legacy_write(db: str, transaction_id: str, category_id: int) -> None:
+    con = sqlite3.connect(db)
+    try:
+        con.execute("SELECT 1 FROM categories WHERE category_id=?", (category_id,)).fetchone()
+        con.execute("UPDATE transactions SET category_id=? WHERE transaction_id=?", (category_id, transaction_id))
+        con.commit()
+    finally:
+        con.close()
+
+
+def _per_call_us(fn, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def test_cached_connection_cuts_per_call_latency(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    managed_db, legacy_db = str(tmp_path / "managed.db"), str(tmp_path / "legacy.db")
+    category_id = _seed(managed_db)
+    _seed(legacy_db)
+    close_connections()
+    con = sqlite3.connect(legacy_db)
+    con.execute("PRAGMA journal_mode=DELETE")
+    con.close()
+
+    legacy_read_us = _per_call_us(lambda i: _legacy_read(legacy_db), CALLS)
+    managed_read_us = _per_call_us(lambda i: get_document_by_file_hash(managed_db, "doc"), CALLS)
+    legacy_write_us = _per_call_us(lambda i: _legacy_write(legacy_db, f"t{i}", category_id), WRITES)
+    managed_write_us = _per_call_us(lambda i: assign_category(managed_db, f"t{i}", category_id), WRITES)
+    print(f"\nper-call latency: read {legacy_read_us:.0f} -> {managed_read_us:.0f} us, "
+          f"write {legacy_write_us:.0f} -> {managed_write_us:.0f} us ({CALLS} reads, {WRITES} writes)")
+
+    assert get_document_by_file_hash(managed_db, "doc")["filename"] == "a.csv"
+    assert managed_read_us * 2 < legacy_read_us
+    assert managed_write_us < legacy_write_us
+
+
+def _bulk_rows(prefix: str) -> list[dict]:
+    return [
+        {
+            "transaction_id": f"{prefix}{i}", "transaction_date": "2025-01-01", "description": f"CARD Shop {i % 500}",
+            "amount_in": 0.0, "amount_out": 1.0, "source_file": "b.csv", "source_file_hash": "bulk",
+            "normalization_hash": f"{prefix}n{i}", "year": 2025, "month": "2025-01",
+        }
+        for i in range(BULK_ROWS)
+    ]
+
+
+def test_bulk_insert_throughput_reported(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    managed_db, legacy_db = str(tmp_path / "managed.db"), str(tmp_path / "legacy.db")
+    init_db(managed_db)
+    init_db(legacy_db)
+    close_connections()
+    con = sqlite3.connect(legacy_db)
+    con.execute("PRAGMA journal_mode=DELETE")
+    con.close()
+
+    rows = _bulk_rows("l")
+    start = time.perf_counter()
+    con = sqlite3.connect(legacy_db)
+    try:
+        con.executemany(INSERT_SQL, ([r.get(c) for c in TX_COLUMNS] for r in rows))
+        con.commit()
+    finally:
+        con.close()
+    legacy_rate = BULK_ROWS / (time.perf_counter() - start)
+
+    rows = _bulk_rows("m")
+    start = time.perf_counter()
+    inserted = bulk_insert_transactions(managed_db, rows)
+    managed_rate = BULK_ROWS / (time.perf_counter() - start)
+    print(f"\nbulk insert ({BULK_ROWS} rows): connect-per-call {legacy_rate:,.0f} rows/s, "
+          f"managed {managed_rate:,.0f} rows/s (search index sync included)")
+    assert inserted == BULK_ROWS
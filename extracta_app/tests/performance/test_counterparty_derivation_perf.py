@@ -0,0 +1,152 @@
+"""Benchmark: set-based counterparty derivation vs the former row-by-row loop.
+
+The former implementation opened a connection and committed per row
+(`get_or_create` as it was before the shared connection manager, reproduced
+here) and logged each heuristic failure with its own file append; it runs on a smaller slice and is compared per row. Row count
+defaults to a CI-friendly size; set EXTRACTA_PERF_ROWS=1000000 for the
+full-scale measurement. Timings print with ``pytest -s``.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+
+from src.logging.json_logger import emit_log_event
+from src.normalization import counterparty_heuristic
+from src.normalization.counterparty_derivation import derive_counterparties
+from src.normalization.counterparty_heuristic import extract_counterparty_name, extract_counterparty_names
+from src.persistence.migrations import init_db
+
+ROWS = int(os.environ.get("EXTRACTA_PERF_ROWS", "50000"))
+LEGACY_ROWS = min(ROWS, 5000)
+MERCHANTS = 2000
+
+
+def _legacy_get_or_create(db_path: str, *, display_name: str, normalized: str) -> int:
+    con = sqlite3.connect(db_path)
+    try:
+        row = con.execute("SELECT counterparty_id FROM counterparties WHERE name_normalized=?", (normalized,)).fetchone()
+        if row:
+            return int(row[0])
+        con.execute("INSERT INTO counterparties(name, name_normalized) VALUES (?, ?)", (display_name, normalized))
+        con.commit()
+        return int(con.execute(
+            "SELECT counterparty_id FROM counterparties WHERE name_normalized=?", (normalized,)
+        ).fetchone()[0])
+    finally:
+        con.close()
+
+
+def _legacy_derive(db_path: str) -> int:
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute("SELECT transaction_id, description, counterparty FROM transactions").fetchall()
+        to_update = []
+        for tx_id, desc, existing in rows:
+            if existing not in (None, "", "Unknown"):
+                continue
+            name = extract_counterparty_name(desc or "")
+            if name == "Unknown":
+                emit_log_event({"event": "counterparty_autoderive_fail", "transaction_id": tx_id,
+                                "reason": "heuristic_unknown"})
+                continue
+            to_update.append((name, _legacy_get_or_create(db_path, display_name=name, normalized=name.lower()), tx_id))
+        for cp, cp_id, tid in to_update:
+            con.execute("UPDATE transactions SET counterparty=?, counterparty_id=? WHERE transaction_id=?",
+                        (cp, cp_id, tid))
+        con.commit()
+        return len(to_update)
+    finally:
+        con.close()
+
+
+def _seed(db_path: str, n: int) -> None:
+    init_db(db_path)
+    con = sqlite3.connect(db_path)
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, source_file, source_file_hash,"
+        " normalization_hash, year, month) VALUES (?, '2025-01-01', ?, 'bench.pdf', 'h', ?, 2025, '2025-01')",
+        (
+            # every 20th description is numeric-only -> heuristic Unknown
+            (f"t{i}", f"{i % 97} {i}" if i % 20 == 0 else f"CARD PURCHASE Merchant {i % MERCHANTS:04d}x", f"n{i}")
+            for i in range(n)
+        ),
+    )
+    con.commit()
+    con.close()
+
+
+def _assignments(db_path: str) -> list[tuple]:
+    con = sqlite3.connect(db_path)
+    try:
+        return con.execute(
+            "SELECT t.transaction_id, t.counterparty, c.name_normalized FROM transactions t "
+            "LEFT JOIN counterparties c ON c.counterparty_id = t.counterparty_id ORDER BY t.transaction_id"
+        ).fetchall()
+    finally:
+        con.close()
+
+
+def test_derivation_batched_matches_and_beats_row_by_row(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # keep the benchmark's log lines out of the repo log
+    legacy_db, batched_db, full_db = (str(tmp_path / f"{n}.db") for n in ("legacy", "batched", "full"))
+    _seed(legacy_db, LEGACY_ROWS)
+    _seed(batched_db, LEGACY_ROWS)
+    _seed(full_db, ROWS)
+
+    start = time.perf_counter()
+    legacy_assigned = _legacy_derive(legacy_db)
+    legacy_s = time.perf_counter() - start
+    stats = derive_counterparties(batched_db)
+    assert stats["assigned"] == legacy_assigned
+    assert _assignments(batched_db) == _assignments(legacy_db)
+
+    start = time.perf_counter()
+    full = derive_counterparties(full_db)
+    full_s = time.perf_counter() - start
+    print(f"\ncounterparty derivation: row-by-row {LEGACY_ROWS / legacy_s:,.0f} rows/s; "
+          f"batched {ROWS} rows in {full_s:.2f}s ({ROWS / full_s:,.0f} rows/s)")
+    assert full["scanned"] == ROWS
+    assert full["assigned"] == ROWS - len(range(0, ROWS, 20))
+    assert ROWS / full_s > 10 * (LEGACY_ROWS / legacy_s)
+    assert derive_counterparties(full_db)["assigned"] == 0
+
+
+def test_incremental_derivation_scales_with_upload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "incremental.db")
+    _seed(db, ROWS)
+    derive_counterparties(db)
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, source_file, source_file_hash,"
+        " normalization_hash, year, month) VALUES (?, '2025-02-01', ?, 'new.pdf', 'upload', ?, 2025, '2025-02')",
+        ((f"u{i}", f"POS: Shop {i % 50}", f"un{i}") for i in range(200)),
+    )
+    con.commit()
+    con.close()
+
+    start = time.perf_counter()
+    stats = derive_counterparties(db, source_file_hash="upload")
+    upload_s = time.perf_counter() - start
+    print(f"\nincremental derivation: 200-row upload into {ROWS} rows in {upload_s * 1000:.1f} ms")
+    assert stats == {"scanned": 200, "assigned": 200, "skipped": 0}
+    assert upload_s < 0.5
+
+
+def test_memoized_heuristic_batch_beats_uncached():
+    descriptions = [f"CARD PURCHASE Merchant {i % MERCHANTS:04d}x" for i in range(ROWS)]
+    counterparty_heuristic.clear_name_cache()
+    start = time.perf_counter()
+    uncached = [counterparty_heuristic._extract(d) for d in descriptions]
+    uncached_s = time.perf_counter() - start
+    start = time.perf_counter()
+    cached = extract_counterparty_names(descriptions)
+    cached_s = time.perf_counter() - start
+    stats = counterparty_heuristic.name_cache_stats()
+    print(f"\nheuristic ({ROWS} descriptions, {MERCHANTS} distinct): uncached {uncached_s:.2f}s, "
+          f"memoized batch {cached_s:.2f}s, hit rate {stats['hit_rate']:.1%}")
+    assert cached == uncached
+    assert stats["misses"] == MERCHANTS
+    assert cached_s < uncached_s / 3
@@ -0,0 +1,78 @@
+"""Benchmark: paging counterparties by activity from counterparty_stats.
+
+Before schema v12 every activity figure meant aggregating the whole
+transactions table (GROUP BY counterparty_id). Seeds
+EXTRACTA_PERF_STATS_ROWS transactions (default CI-friendly; set 1000000 for
+the full-scale measurement) directly, builds the stats with
+`rebuild_counterparty_stats`, then compares one page from
+`list_counterparties_page` with the aggregate it replaces. Marked ``perf``:
+runs only with EXTRACTA_PERF=1. Timings print with ``pytest -s``.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+
+import pytest
+from src.persistence.counterparties_repository import list_counterparties_page, rebuild_counterparty_stats
+from src.persistence.migrations import init_db
+
+ROWS = int(os.environ.get("EXTRACTA_PERF_STATS_ROWS", "300000"))
+COUNTERPARTIES = 20000
+BUDGET_MS = 20.0
+
+
+def _seed(db: str) -> None:
+    init_db(db)
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO counterparties(counterparty_id, name, name_normalized) VALUES (?, ?, ?)",
+        ((i, f"Merchant {i}", f"merchant {i}") for i in range(1, COUNTERPARTIES + 1)),
+    )
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, amount_out, source_file,"
+        " source_file_hash, normalization_hash, year, month, counterparty_id) VALUES (?, ?, 'x', ?, 'b.pdf', 'h', ?,"
+        " 2025, '2025-01', ?)",
+        (
+            # skewed activity: low ids are busiest
+            (f"t{i}", f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", float(i % 50), f"n{i}",
+             int(COUNTERPARTIES ** ((i % 997) / 997)))
+            for i in range(ROWS)
+        ),
+    )
+    con.commit()
+    con.close()
+
+
+@pytest.mark.perf
+def test_activity_page_is_instant_vs_aggregate(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "stats.db")
+    _seed(db)
+    start = time.perf_counter()
+    rebuild_counterparty_stats(db)
+    rebuild_s = time.perf_counter() - start
+
+    con = sqlite3.connect(db)
+    start = time.perf_counter()
+    aggregate = con.execute(
+        "SELECT counterparty_id, COUNT(*) AS n FROM transactions WHERE counterparty_id IS NOT NULL"
+        " GROUP BY counterparty_id ORDER BY n DESC, counterparty_id DESC LIMIT 50"
+    ).fetchall()
+    aggregate_ms = (time.perf_counter() - start) * 1000
+    con.close()
+
+    start = time.perf_counter()
+    page = list_counterparties_page(db, sort="transactions", limit=50)
+    page_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    deep = list_counterparties_page(db, sort="last_seen", limit=50, offset=500)
+    deep_ms = (time.perf_counter() - start) * 1000
+    print(f"\nstats over {ROWS} transactions rebuilt in {rebuild_s:.2f}s; top-50 page: stats {page_ms:.1f} ms, "
+          f"GROUP BY {aggregate_ms:.1f} ms; last-seen page at offset 500: {deep_ms:.1f} ms")
+
+    assert [(c["counterparty_id"], c["tx_count"]) for c in page] == aggregate
+    assert len(deep) == 50
+    assert page_ms < BUDGET_MS
+    assert deep_ms < BUDGET_MS
@@ -0,0 +1,70 @@
+"""Benchmark: MinHash/LSH merge suggestions scale near-linearly.
+
+Builds synthetic counterparty tables with planted near-duplicates (spacing /
+typo / suffix variants) at N/2 and N names and times signature refresh plus
+suggestion. Pairwise comparison would grow 4x between the two sizes; LSH
+should stay close to 2x. N defaults to a CI-friendly size; set
+EXTRACTA_PERF_COUNTERPARTIES for larger runs. Timings print with ``pytest -s``.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import time
+
+from src.normalization.counterparty_suggestions import refresh_signatures, suggest_merge_clusters
+from src.persistence.migrations import init_db
+
+COUNTERPARTIES = int(os.environ.get("EXTRACTA_PERF_COUNTERPARTIES", "20000"))
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _variant(rng: random.Random, name: str) -> str:
+    kind = rng.randrange(3)
+    if kind == 0:
+        return " ".join(name.replace(" ", ""))  # "k a r o ..." spacing
+    if kind == 1:
+        i = rng.randrange(1, len(name) - 1)
+        return name[:i] + name[i + 1:]  # dropped letter
+    return name + " uab"
+
+
+def _seed(db: str, n: int) -> set[frozenset[int]]:
+    rng = random.Random(n)
+    init_db(db)
+    names, planted = [], []
+    while len(names) < n:
+        base = " ".join("".join(rng.choices(LETTERS, k=rng.randint(5, 9))) for _ in range(2))
+        names.append(base)
+        if rng.random() < 0.1:
+            names.append(_variant(rng, base))
+            planted.append((len(names) - 1, len(names)))  # 1-based ids of the pair
+    con = sqlite3.connect(db)
+    con.executemany("INSERT OR IGNORE INTO counterparties(counterparty_id, name, name_normalized) VALUES (?, ?, ?)",
+                    ((i + 1, nm.title(), nm) for i, nm in enumerate(names)))
+    con.commit()
+    con.close()
+    return {frozenset(p) for p in planted}
+
+
+def _run(tmp_path, n: int) -> tuple[float, float]:
+    db = str(tmp_path / f"cp{n}.db")
+    planted = _seed(db, n)
+    start = time.perf_counter()
+    refresh_signatures(db)
+    clusters = suggest_merge_clusters(db)
+    elapsed = time.perf_counter() - start
+    found = {frozenset((a, b)) for c in clusters for a in (m["counterparty_id"] for m in c["members"])
+             for b in (m["counterparty_id"] for m in c["members"]) if a < b}
+    return elapsed, len(planted & found) / len(planted)
+
+
+def test_suggestions_scale_near_linearly(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    half_s, _ = _run(tmp_path, COUNTERPARTIES // 2)
+    full_s, recall = _run(tmp_path, COUNTERPARTIES)
+    print(f"\nmerge suggestions: {COUNTERPARTIES // 2} names {half_s:.2f}s, {COUNTERPARTIES} names {full_s:.2f}s, "
+          f"planted-duplicate recall {recall:.1%}")
+    assert recall > 0.85
+    assert full_s < 3 * half_s
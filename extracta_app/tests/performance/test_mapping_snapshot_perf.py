@@ -0,0 +1,54 @@
+"""Benchmark: worker start-up from a JSON mapping snapshot vs the libyaml parse.
+
+A fresh `MappingConfigManager` (a new worker) loads a mapping config of
+EXTRACTA_PERF_MAPPING_ENTRIES synonym / rule entries, once with the JSON
+snapshot already written by another worker and once without (CSafeLoader
+parse). Each side's median of REPEATS runs is compared. Marked ``perf``:
+runs only with EXTRACTA_PERF=1. Timings print with ``pytest -s``.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import statistics
+import time
+
+import pytest
+from src.common.mapping_config_manager import SNAPSHOT_DIRNAME, MappingConfigManager
+from src.common.mapping_loader import YAML_SAFE_LOADER
+
+ENTRIES = int(os.environ.get("EXTRACTA_PERF_MAPPING_ENTRIES", "200"))
+REPEATS = 15
+
+
+def _mapping_yaml(n: int) -> str:
+    lines = ["version: v1", "synonyms:"]
+    lines += [f'  Column Name {i}: ["Alias {i} A", "Alias {i} B", "alias_{i}_c"]' for i in range(n)]
+    lines += ["rules:"] + [f"  Field{i}: target_{i}" for i in range(n)]
+    lines += ["file_overrides:"]
+    lines += [f"  - pattern: 'bank{i}_*.pdf'\n    rules:\n      Amt{i}: amount" for i in range(n // 10)]
+    return "\n".join(lines) + "\n"
+
+
+def _median_start_ms(cfg_path, *, keep_snapshot: bool) -> float:
+    runs = []
+    for _ in range(REPEATS):
+        if not keep_snapshot:
+            shutil.rmtree(cfg_path.parent / SNAPSHOT_DIRNAME, ignore_errors=True)
+        start = time.perf_counter()
+        MappingConfigManager(cfg_path).get()
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+@pytest.mark.perf
+def test_snapshot_start_beats_yaml_parse(tmp_path):
+    cfg_path = tmp_path / "mappings.yml"
+    cfg_path.write_text(_mapping_yaml(ENTRIES), encoding="utf-8")
+
+    parse_ms = _median_start_ms(cfg_path, keep_snapshot=False)
+    MappingConfigManager(cfg_path).get()  # another worker wrote the snapshot
+    snapshot_ms = _median_start_ms(cfg_path, keep_snapshot=True)
+    print(f"\n{ENTRIES} entries ({cfg_path.stat().st_size / 1024:.0f} KiB, {YAML_SAFE_LOADER.__name__}): "
+          f"parse + snapshot write {parse_ms:.2f} ms, snapshot load {snapshot_ms:.2f} ms")
+    assert snapshot_ms * 5 < parse_ms
@@ -0,0 +1,56 @@
+"""Benchmark: batched normalization_hashes vs per-row normalization_hash.
+
+The timing comparison is marked ``perf`` and runs only with EXTRACTA_PERF=1.
+The row count defaults to a CI-friendly size; set EXTRACTA_PERF_ROWS=1000000
+for the full backfill-scale measurement. Timings print with ``pytest -s``.
+The default suite keeps only the parity check.
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+from src.common.hashing import normalization_hash, normalization_hashes
+
+ROWS = int(os.environ.get("EXTRACTA_PERF_ROWS", "50000"))
+
+
+def _rows(n: int) -> list[dict]:
+    return [
+        {
+            "transaction_date": f"2025-01-{(i % 28) + 1:02d}",
+            "description": f"Transaction {i:07d}",
+            "amount_in": 0.0,
+            "amount_out": (i * 1.23) % 1000,
+            "counterparty": f"Merchant {i % 500}",
+            "source_file": "backfill.pdf",
+            "source_file_hash": "f" * 64,
+            "year": 2025,
+            "month": "2025-01",
+        }
+        for i in range(n)
+    ]
+
+
+def test_batch_hashing_is_identical():
+    rows = _rows(2000)
+    assert normalization_hashes(rows, "v1", "0.1.0") == [normalization_hash(r, "v1", "0.1.0") for r in rows]
+
+
+@pytest.mark.perf
+def test_batch_hashing_is_faster():
+    rows = _rows(ROWS)
+
+    start = time.perf_counter()
+    single = [normalization_hash(r, "v1", "0.1.0") for r in rows]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = normalization_hashes(rows, "v1", "0.1.0")
+    batch_s = time.perf_counter() - start
+
+    print(f"\nnormalization hashes ({ROWS} rows): per-row {single_s:.3f}s, batch {batch_s:.3f}s, "
+          f"speedup {single_s / batch_s:.2f}x")
+    assert batch == single
+    assert batch_s < single_s
@@ -0,0 +1,87 @@
+"""Benchmark: trigram FTS5 substring search vs scanning every row.
+
+Seeds EXTRACTA_PERF_SEARCH_ROWS transactions (default CI-friendly; set
+1000000 or more for the full-scale measurement) with random descriptions and
+a counterparty table, then compares `search_transactions` /
+`search_counterparties` against a LIKE scan and the former load-all-and-
+filter-in-Python approach. Timings print with ``pytest -s``.
+"""
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import string
+import time
+
+from src.persistence.counterparties_repository import list_counterparties
+from src.persistence.migrations import init_db
+from src.persistence.search_repository import rebuild_search_indexes, search_counterparties, search_transactions
+
+ROWS = int(os.environ.get("EXTRACTA_PERF_SEARCH_ROWS", "200000"))
+COUNTERPARTIES = max(ROWS // 10, 1000)
+NEEDLE = "zqxwv merchant"
+NEEDLE_EVERY = 1000
+BUDGET_MS = 50.0
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+
+def _seed(db: str) -> None:
+    init_db(db)
+    rng = random.Random(7)
+    con = sqlite3.connect(db)
+    con.executemany(
+        "INSERT INTO counterparties(counterparty_id, name, name_normalized) VALUES (?, ?, ?)",
+        (
+            (i, name, name.lower())
+            for i in range(1, COUNTERPARTIES + 1)
+            for name in [f"{_word(rng).title()} {_word(rng).title()} {i}"]
+        ),
+    )
+    con.executemany(
+        "INSERT INTO transactions(transaction_id, transaction_date, description, source_file, source_file_hash,"
+        " normalization_hash, year, month) VALUES (?, '2025-01-01', ?, 'b.pdf', 'h', ?, 2025, '2025-01')",
+        (
+            (f"t{i}", f"CARD {NEEDLE.upper()} {i}" if i % NEEDLE_EVERY == 0 else f"CARD {_word(rng)} {_word(rng)}",
+             f"n{i}")
+            for i in range(ROWS)
+        ),
+    )
+    con.commit()
+    con.close()
+    rebuild_search_indexes(db)  # raw bulk load bypasses the repository's index sync
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def test_fts_search_stays_in_milliseconds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = str(tmp_path / "search.db")
+    _seed(db)
+
+    search_transactions(db, NEEDLE)  # warm the page cache for a fair comparison
+    hits, fts_ms = _timed(search_transactions, db, NEEDLE, limit=50)
+    con = sqlite3.connect(db)
+    (like_count,), like_ms = _timed(
+        lambda: con.execute("SELECT COUNT(*) FROM transactions WHERE description LIKE ?", (f"%{NEEDLE}%",)).fetchone()
+    )
+    con.close()
+    print(f"\ntransactions search over {ROWS} rows: fts {fts_ms:.1f} ms, LIKE scan {like_ms:.1f} ms")
+    assert like_count == len(range(0, ROWS, NEEDLE_EVERY))
+    assert len(hits) == min(50, like_count)
+    assert all(NEEDLE in h["description"].lower() for h in hits)
+    assert fts_ms < BUDGET_MS
+
+    target = f" {COUNTERPARTIES // 2}"
+    cps, python_ms = _timed(lambda: [c for c in list_counterparties(db) if target in c["name"].lower()])
+    found, cp_ms = _timed(search_counterparties, db, target, limit=100)
+    print(f"counterparty filter over {COUNTERPARTIES} names: fts {cp_ms:.1f} ms, load-all + filter {python_ms:.1f} ms")
+    assert {c["counterparty_id"] for c in found} == {c["counterparty_id"] for c in cps}
+    assert cp_ms < BUDGET_MS
@@ -0,0 +1,98 @@
+"""Benchmark: TransactionRecord pipeline vs the former dict-per-stage pipeline.
+
+The baseline reproduces the former engine loop: dict rows through every
+stage, one normalization_hash call per row, uuid4 ids from map_row. Both
+sides share the current validation and mapping helpers.
+
+The benchmark measures normalization throughput and peak traced memory of the
+normalized output, plus insert time into SQLite. It is marked ``perf`` and
+runs only with EXTRACTA_PERF=1. The row count defaults to a CI-friendly size;
+set EXTRACTA_PERF_ROWS=1000000 for the full-scale measurement. Timings print
+with ``pytest -s``. The default suite keeps only the output-parity check.
+"""
+from __future__ import annotations
+
+import gc
+import os
+import time
+import tracemalloc
+
+import pytest
+from src.common.hashing import normalization_hash
+from src.normalization.engine import normalize_records
+from src.normalization.mapping import map_row
+from src.normalization.validation import validate_rows
+from src.persistence.migrations import init_db
+from src.persistence.transactions_repository import bulk_insert_transactions
+
+ROWS = int(os.environ.get("EXTRACTA_PERF_ROWS", "20000"))  # tracemalloc makes traced runs slow
+HEADER_MAP = {"Date": "transaction_date", "Description": "description", "Amount": "amount"}
+PARAMS = {"mapping_version": "v1", "logic_version": "0.1.0", "source_file": "bench.pdf", "source_file_hash": "c" * 64}
+
+
+def _dict_pipeline(raw: list[dict]) -> list[dict]:
+    """The pre-record pipeline: copy, map to dict, update, hash per row, sort."""
+    validated, _ = validate_rows(raw, required_columns=["Date", "Description", "Amount"])
+    out = []
+    for r in validated:
+        mapped = map_row(r, HEADER_MAP, source_file=PARAMS["source_file"], source_file_hash=PARAMS["source_file_hash"])
+        date_str = mapped["transaction_date"]
+        mapped.update({"year": int(date_str[:4]), "month": date_str[:7],
+                       "mapping_version": "v1", "logic_version": "0.1.0"})
+        mapped["normalization_hash"] = normalization_hash(mapped, mapping_version="v1", logic_version="0.1.0")
+        out.append(mapped)
+    out.sort(key=lambda r: r["normalization_hash"])
+    return out
+
+
+def _measure(fn):
+    """Return (result, seconds, peak traced bytes); timing runs untraced."""
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def _raw(n: int) -> list[dict]:
+    return [
+        {"Date": f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}", "Description": f"Transaction {i:07d}",
+         "Amount": f"-{(i * 1.23) % 1000:.2f}"}
+        for i in range(n)
+    ]
+
+
+def test_record_pipeline_matches_dict_pipeline():
+    raw = _raw(500)
+    fields = ("transaction_date", "description", "amount_in", "amount_out", "year", "month", "normalization_hash")
+    expected = [tuple(row[f] for f in fields) for row in _dict_pipeline(raw)]
+    records = normalize_records(raw, header_map=HEADER_MAP, **PARAMS)
+    assert [tuple(getattr(rec, f) for f in fields) for rec in records] == expected
+
+
+@pytest.mark.perf
+def test_record_pipeline_memory_and_throughput(tmp_path):
+    raw = _raw(ROWS)
+
+    dict_rows, dict_s, dict_peak = _measure(lambda: _dict_pipeline(raw))
+    del dict_rows
+    records, rec_s, rec_peak = _measure(lambda: normalize_records(raw, header_map=HEADER_MAP, **PARAMS))
+
+    db = str(tmp_path / "bench.db")
+    init_db(db)
+    start = time.perf_counter()
+    inserted = bulk_insert_transactions(db, records)
+    insert_s = time.perf_counter() - start
+
+    mib = 1024 * 1024
+    print(f"\nnormalization ({ROWS} rows): dicts {dict_s:.2f}s / peak {dict_peak / mib:.1f} MiB, "
+          f"records {rec_s:.2f}s / peak {rec_peak / mib:.1f} MiB; "
+          f"insert {insert_s:.2f}s ({ROWS / insert_s:,.0f} rows/s)")
+    assert inserted == ROWS
+    assert rec_peak < dict_peak
+    assert rec_s < dict_s
@@ -0,0 +1,115 @@
+"""Amount format inference and parsing."""
+import random
+
+import pytest
+from src.normalization.amounts import (
+    DEFAULT_AMOUNT_PARSER,
+    US_FORMAT,
+    AmountFormat,
+    AmountFormatConflictError,
+    AmountParser,
+    infer_amount_format,
+)
+from src.normalization.engine import normalize_rows
+
+EU = AmountFormat(decimal=",", thousands=".", currency="€")
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["1.234,56 €", "-12,00 €", "3,5 €"], EU),
+        (["$1,234.56", "-$12.00"], AmountFormat(decimal=".", thousands=",", currency="$")),
+        (["1,234", "1.234"], AmountFormat()),  # all ambiguous: legacy US reading
+        (["EUR 1 234,5"], AmountFormat(decimal=",", thousands=".", currency="EUR")),
+        (["1.234.567"], AmountFormat(decimal=",", thousands=".")),
+    ],
+)
+def test_infer_amount_format(values, expected):
+    assert infer_amount_format(values) == expected
+
+
+def test_parse_european_and_accounting_forms():
+    parser = AmountParser(EU)
+    assert parser.parse("1.234,56 €") == 1234.56
+    assert parser.parse("-1.234,56") == -1234.56
+    assert parser.parse("(12,50)") == -12.5
+    assert parser.parse("12,50-") == -12.5
+    assert parser.parse("− 7,25") == -7.25
+    assert parser.parse("£3,00") == 3.0  # other symbols take the slow path
+    assert parser.parse_many(["1,5", "abc", ""]) == [1.5, None, None]
+    with pytest.raises(ValueError, match="Invalid numeric value"):
+        parser.parse("12,50 EUR extra")
+
+
+def test_default_parser_matches_legacy_float():
+    rng = random.Random(11)
+    parts = ["1", "2", "0", "9", ",", ".", "-", "+", "e", " ", "x", "123", "000"]
+    for _ in range(20000):
+        value = "".join(rng.choice(parts) for _ in range(rng.randint(1, 6)))
+        try:
+            legacy = float(value.replace(",", "").strip())
+        except ValueError:
+            continue
+        try:
+            assert DEFAULT_AMOUNT_PARSER.parse(value) == legacy, value
+        except AmountFormatConflictError:  # decimal comma: legacy read it as a thousands comma
+            assert "," in value, value
+
+
+def test_parse_array_matches_parse_many():
+    np = pytest.importorskip("numpy")
+    parser = AmountParser(EU)
+    values = ["1.234,56 €", "-3,50", "(2,00)", "1e3", "0"]
+    assert parser.parse_array(values).tolist() == parser.parse_many(values)
+    assert isinstance(parser.parse_array(["1,0"]), np.ndarray)
+    with pytest.raises(AmountFormatConflictError):
+        parser.parse_array(["1.234,56", "1,234.56"])
+
+
+@pytest.mark.parametrize(
+    "amount_format, value",
+    [(EU, "1,234.56"), (EU, "-1,234,567"), (US_FORMAT, "1.234,56"), (US_FORMAT, "12,50"), (US_FORMAT, "€ 3,5")],
+)
+def test_minority_convention_amounts_conflict(amount_format, value):
+    parser = AmountParser(amount_format)
+    assert parser.try_parse(value) is None
+    with pytest.raises(AmountFormatConflictError):
+        parser.parse(value)
+
+
+def test_normalize_rows_quarantines_amount_conflicts():
+    rows = [
+        {"Date": "2025-01-02", "Description": "Rent", "Amount": "-1.250,00"},
+        {"Date": "2025-01-03", "Description": "Salary", "Amount": "2.400,50"},
+        {"Date": "2025-01-04", "Description": "Card", "Amount": "1,234.56"},
+    ]
+    params = {
+        "header_map": {"Date": "transaction_date", "Description": "description", "Amount": "amount"},
+        "mapping_version": "v1", "logic_version": "0.1.0", "source_file": "eu.pdf", "source_file_hash": "e" * 64,
+    }
+    with pytest.raises(AmountFormatConflictError):
+        normalize_rows(rows, **params)
+    quarantined = []
+    out = normalize_rows(rows, quarantined=quarantined, **params)
+    assert sorted(r["description"] for r in out) == ["Rent", "Salary"]
+    assert [q["row_index"] for q in quarantined] == [2]
+    assert "conflicts" in quarantined[0]["reason"]
+
+
+def test_normalize_rows_infers_european_amounts():
+    rows = [
+        {"Date": "2025-01-02", "Description": "Rent", "Amount": "-1.250,00"},
+        {"Date": "2025-01-03", "Description": "Salary", "Amount": "2.400,50"},
+    ]
+    out = normalize_rows(
+        rows,
+        header_map={"Date": "transaction_date", "Description": "description", "Amount": "amount"},
+        mapping_version="v1",
+        logic_version="0.1.0",
+        source_file="eu.pdf",
+        source_file_hash="e" * 64,
+    )
+    by_desc = {r["description"]: r for r in out}
+    assert by_desc["Rent"]["amount_out"] == 1250.0
+    assert by_desc["Salary"]["amount_in"] == 2400.5
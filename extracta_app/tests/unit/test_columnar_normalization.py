@@ -0,0 +1,124 @@
+"""Columnar engine parity with the row-based normalize_rows."""
+from datetime import date, datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.normalization import columnar, engine  # noqa: E402
+from src.normalization.columnar import columns_from_rows, columns_to_rows, normalize_columns  # noqa: E402
+from src.normalization.engine import normalize_rows  # noqa: E402
+from src.normalization.validation import DateFormatConflictError  # noqa: E402
+
+HEADER_MAP = {"Date": "transaction_date", "Description": "description", "Amount": "amount"}
+PARAMS = {"mapping_version": "v1", "logic_version": "0.1.0", "source_file": "statement.pdf", "source_file_hash": "a" * 64}
+
+RAW_ROWS = [
+    {"Date": "2025-01-15", "Description": "Coffee", "Amount": "-3.50"},
+    {"Date": "2025-01-16", "Description": "Refund", "Amount": "1,200.00"},
+    {"Date": "2025-01-31", "Description": "Zero", "Amount": " 0.00 "},
+    {"Date": "2025-01-15", "Description": "Coffee", "Amount": "-3.50"},
+    {"Date": "2025-02-01", "Description": "Salary", "Amount": "2500"},
+]
+
+
+def _strip_ids(rows):
+    return [{k: v for k, v in r.items() if k != "transaction_id"} for r in rows]
+
+
+def test_columnar_matches_row_engine():
+    expected = normalize_rows(RAW_ROWS, header_map=HEADER_MAP, **PARAMS)
+    cols = columns_from_rows(RAW_ROWS)
+    result = normalize_columns(cols["Date"], cols["Description"], cols["Amount"], **PARAMS)
+    rows = columns_to_rows(result)
+    assert _strip_ids(rows) == _strip_ids(expected)
+    assert isinstance(result["year"], np.ndarray) and result["year"].dtype == np.int64
+    assert all(type(r["amount_in"]) is float and type(r["year"]) is int for r in rows)
+    assert len({r["transaction_id"] for r in rows}) == len(rows)
+
+
+def test_columnar_amount_fallback_and_errors():
+    # "1_000" is accepted by float() but not by NumPy's string cast
+    result = normalize_columns(["2025-01-01"], ["Python literal"], ["1_000"], **PARAMS)
+    assert result["amount_in"].tolist() == [1000.0]
+    with pytest.raises(ValueError):
+        normalize_columns(["2025-01-01"], ["Bad"], ["abc"], **PARAMS)
+    with pytest.raises(ValueError):
+        normalize_columns(["2025-13-45"], ["Bad date"], ["1"], **PARAMS)
+    with pytest.raises(ValueError):
+        normalize_columns([], [], [], **PARAMS)
+
+
+def test_columnar_rejects_date_format_conflicts_like_row_engine():
+    dates = ["2025-01-15", "2025-01-16", "16/01/2025"]
+    raw = [{"Date": d, "Description": "x", "Amount": "1"} for d in dates]
+    with pytest.raises(DateFormatConflictError):
+        normalize_rows(raw, header_map=HEADER_MAP, **PARAMS)
+    with pytest.raises(DateFormatConflictError):
+        normalize_columns(dates, ["x"] * 3, ["1"] * 3, **PARAMS)
+
+
+BAD_ROWS = [
+    {"Date": "2025-01-15", "Description": "Coffee", "Amount": "-3.50", "Balance": "96.50"},
+    {"Date": "2025-01-16", "Amount": "1.00", "Balance": "97.50"},  # missing Description
+    {"Date": None, "Description": "No date", "Amount": "2.00"},
+    {"Date": datetime(2025, 1, 17), "Description": "Datetime cell", "Amount": "2.00"},
+    {"Date": date(2025, 1, 17), "Description": "Date cell", "Amount": "2.00"},
+    {"Date": "17/01/2025", "Description": "Other format", "Amount": "2.00"},
+    {"Date": "2025-01-18", "Description": "Bad amount", "Amount": None, "Page": 2},
+    {"Date": "2025-01-19", "Description": "Conflicting amount", "Amount": "12,50"},
+    {"Date": "2025-01-20", "Description": None, "Amount": " 0.00 "},
+    {"Date": "2025-02-01", "Description": "Salary", "Amount": "2,500.00"},
+]
+
+
+def _logged(monkeypatch, module):
+    events = []
+    monkeypatch.setattr(module, "emit_log_event", lambda e: events.append(
+        {k: v for k, v in e.items() if k != "duration_ms"}
+    ))
+    return events
+
+
+def test_columnar_tolerant_mode_matches_row_engine(monkeypatch):
+    row_events, col_events = _logged(monkeypatch, engine), _logged(monkeypatch, columnar)
+    expected_quarantine = []
+    expected = normalize_rows(
+        BAD_ROWS, header_map=HEADER_MAP, quarantined=expected_quarantine, deterministic_ids=True, **PARAMS
+    )
+    cols = columns_from_rows(BAD_ROWS)
+    quarantined = []
+    result = normalize_columns(
+        cols["Date"], cols["Description"], cols["Amount"],
+        quarantined=quarantined, raw_rows=BAD_ROWS, deterministic_ids=True, **PARAMS,
+    )
+    assert columns_to_rows(result) == expected
+    assert quarantined == expected_quarantine
+    assert [q["row_index"] for q in quarantined] == [1, 2, 3, 4, 5, 6, 7]
+    assert quarantined[0]["row"] == BAD_ROWS[1]
+    assert "'Balance': '97.50'" in quarantined[0]["reason"]
+    assert col_events == row_events
+    assert [e.get("out_count") for e in col_events] == [None, 3, 3]
+
+
+def test_columnar_without_raw_rows_quarantines_the_three_columns():
+    cols = columns_from_rows(BAD_ROWS)
+    quarantined = []
+    normalize_columns(cols["Date"], cols["Description"], cols["Amount"], quarantined=quarantined, **PARAMS)
+    assert quarantined[0]["row"] == {"Date": "2025-01-16", "Amount": "1.00"}
+    assert quarantined[5]["row"] == {"Date": "2025-01-18", "Description": "Bad amount", "Amount": None}
+
+
+def test_columnar_strict_mode_raises_like_row_engine(monkeypatch):
+    row_events, col_events = _logged(monkeypatch, engine), _logged(monkeypatch, columnar)
+    for bad in BAD_ROWS[1:8]:
+        row_events.clear()
+        col_events.clear()
+        rows = [BAD_ROWS[0], bad]
+        with pytest.raises((ValueError, TypeError)) as row_error:
+            normalize_rows(rows, header_map=HEADER_MAP, **PARAMS)
+        cols = columns_from_rows(rows)
+        with pytest.raises(row_error.type) as col_error:
+            normalize_columns(cols["Date"], cols["Description"], cols["Amount"], raw_rows=rows, **PARAMS)
+        assert str(col_error.value) == str(row_error.value)
+        assert col_events == row_events
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+from src.persistence import connection as connection_module
+from src.persistence.connection import MAX_CACHED_CONNECTIONS, close_connections, connection
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    close_connections()
+    yield
+    close_connections()
+
+
+def _pragma(con: sqlite3.Connection, name: str):
+    return con.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_connection_is_cached_per_thread_with_tuned_pragmas(tmp_path: Path):
+    db = str(tmp_path / "c.db")
+    with connection(db) as first:
+        pass
+    with connection(Path(db)) as second:
+        assert second is first
+        assert _pragma(second, "journal_mode") == "wal"
+        assert _pragma(second, "synchronous") == 1  # NORMAL
+        assert _pragma(second, "temp_store") == 2  # MEMORY
+        assert _pragma(second, "busy_timeout") == 5000
+
+    other: list[sqlite3.Connection] = []
+
+    def worker():
+        with connection(db) as con:
+            other.append(con)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert other and other[0] is not first
+
+
+def test_uncommitted_work_is_rolled_back_at_outermost_exit(tmp_path: Path):
+    db = str(tmp_path / "c.db")
+    with connection(db) as con:
+        con.execute("CREATE TABLE t (x INTEGER)")
+        con.commit()
+    with pytest.raises(RuntimeError):
+        with connection(db) as con:
+            con.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    with connection(db) as con:
+        con.execute("INSERT INTO t VALUES (2)")  # never committed
+    with connection(db) as outer:
+        outer.execute("INSERT INTO t VALUES (3)")
+        with connection(db) as inner:
+            assert inner is outer
+        assert outer.in_transaction  # inner exit leaves the shared transaction alone
+        outer.commit()
+    with connection(db) as con:
+        assert con.execute("SELECT x FROM t").fetchall() == [(3,)]
+
+
+def test_replaced_database_file_gets_a_new_connection(tmp_path: Path):
+    db = str(tmp_path / "c.db")
+    with connection(db) as con:
+        con.execute("CREATE TABLE t (x INTEGER)")
+        con.commit()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db + suffix):
+            os.remove(db + suffix)
+    with connection(db) as con:
+        assert con.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+
+def test_cache_is_bounded_per_thread(tmp_path: Path):
+    for i in range(MAX_CACHED_CONNECTIONS + 3):
+        with connection(str(tmp_path / f"{i}.db")):
+            pass
+    assert len(connection_module._cache()) == MAX_CACHED_CONNECTIONS
+
+
+def test_memory_databases_are_not_cached():
+    with connection(":memory:") as con:
+        con.execute("CREATE TABLE t (x INTEGER)")
+    with connection(":memory:") as con:
+        assert con.execute("SELECT name FROM sqlite_master").fetchall() == []
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_does_not_reuse_parent_connection(tmp_path: Path):
+    db = str(tmp_path / "c.db")
+    with connection(db) as parent_con:
+        parent_con.execute("CREATE TABLE t (x INTEGER)")
+        parent_con.commit()
+    pid = os.fork()
+    if pid == 0:  # child
+        code = 1
+        try:
+            with connection(db) as con:
+                if con is not parent_con:
+                    con.execute("INSERT INTO t VALUES (1)")
+                    con.commit()
+                    code = 0
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    with connection(db) as con:
+        assert con is parent_con
+        assert con.execute("SELECT x FROM t").fetchall() == [(1,)]
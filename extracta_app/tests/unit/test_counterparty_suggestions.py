@@ -0,0 +1,18 @@
+from src.normalization import counterparty_suggestions as cs
+
+
+def test_signature_deterministic_and_numpy_free_path_identical(monkeypatch):
+    sig = cs.minhash_signature("amazon eu sarl")
+    assert len(sig) == cs.NUM_PERM
+    assert sig == cs.minhash_signature("Amazon EU SARL")  # case / punctuation insensitive
+    monkeypatch.setattr(cs, "np", None)
+    assert cs.minhash_signature("amazon eu sarl") == sig
+
+
+def test_estimated_similarity_tracks_jaccard():
+    base = cs.minhash_signature("coffee island vilnius")
+    assert cs.estimated_similarity(base, base) == 1.0
+    near = cs.estimated_similarity(base, cs.minhash_signature("coffee island vilnus"))
+    far = cs.estimated_similarity(base, cs.minhash_signature("lidl lietuva"))
+    assert near > 0.6
+    assert far < 0.2
@@ -0,0 +1,109 @@
+import os
+from pathlib import Path
+
+from src.common import hashing
+from src.common.hashing import file_fingerprint, file_sha256
+from src.ingestion import dedup
+from src.ingestion.dedup import find_duplicate_document
+from src.persistence.documents_repository import create_document
+from src.persistence.migrations import init_db
+
+
+def test_fingerprint_reads_only_head_and_tail(tmp_path: Path):
+    block = 1024
+    a = tmp_path / "a.pdf"
+    b = tmp_path / "b.pdf"
+    head, middle, tail = b"H" * block, os.urandom(8 * block), b"T" * block
+    a.write_bytes(head + middle + tail)
+    b.write_bytes(head + os.urandom(8 * block) + tail)  # same size, head, tail
+    assert file_fingerprint(str(a), block) == file_fingerprint(str(b), block)
+    assert file_fingerprint(str(a), block).startswith(f"{10 * block}:")
+    c = tmp_path / "c.pdf"
+    c.write_bytes(head + middle + tail[:-1] + b"x")
+    assert file_fingerprint(str(a), block) != file_fingerprint(str(c), block)
+
+
+def test_new_file_skips_full_hash(monkeypatch, tmp_path: Path):
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    known = tmp_path / "known.pdf"
+    known.write_bytes(b"%PDF known statement")
+    create_document(
+        db, filename="known.pdf", file_hash=file_sha256(str(known)), document_type="Other",
+        fingerprint=file_fingerprint(str(known)),
+    )
+    full_reads: list[str] = []
+    monkeypatch.setattr(dedup, "file_sha256", lambda p: full_reads.append(p) or hashing.file_sha256(p))
+
+    fresh = tmp_path / "fresh.pdf"
+    fresh.write_bytes(b"%PDF a brand new statement")
+    assert find_duplicate_document(db, str(fresh)) is None
+    assert full_reads == []
+
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(known.read_bytes())
+    found = find_duplicate_document(db, str(copy))
+    assert found is not None and found["filename"] == "known.pdf"
+    assert full_reads == [str(copy)]
+
+
+def test_legacy_documents_without_fingerprint_still_detected(tmp_path: Path):
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    legacy = tmp_path / "legacy.pdf"
+    legacy.write_bytes(b"%PDF legacy")
+    create_document(db, filename="legacy.pdf", file_hash=file_sha256(str(legacy)), document_type="Other")
+    assert find_duplicate_document(db, str(legacy))["filename"] == "legacy.pdf"
+
+
+def test_new_file_is_read_once_for_check_and_ingest(monkeypatch, tmp_path: Path):
+    from src.ingestion import pipeline
+    from src.ingestion.dedup import check_duplicate
+
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    reads: list[str] = []
+    for module in (dedup, pipeline):
+        monkeypatch.setattr(module, "file_sha256", lambda p: reads.append("sha256") or hashing.file_sha256(p))
+        monkeypatch.setattr(module, "file_fingerprint", lambda p: reads.append("fingerprint") or hashing.file_fingerprint(p))
+    monkeypatch.setattr(pipeline.pdf_extractor, "extract_raw_rows", lambda p: [])
+
+    fresh = tmp_path / "fresh.pdf"
+    fresh.write_bytes(b"%PDF a brand new statement")
+    check = check_duplicate(db, str(fresh))
+    assert check.existing is None and check.file_hash is None
+    artifact = pipeline.ingest_file(
+        str(fresh), db_path=db, file_hash=check.file_hash, fingerprint=check.fingerprint
+    )
+    assert reads == ["fingerprint", "sha256"]
+    assert artifact["source_file_hash"] == file_sha256(str(fresh))
+    assert artifact["source_file_fingerprint"] == check.fingerprint
+
+
+def test_archive_rescan_rereads_only_changed_files(monkeypatch, tmp_path: Path):
+    from src.common import hash_service
+    from src.ingestion.dedup import scan_archive
+
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    archive = tmp_path / "archive"
+    (archive / "2024").mkdir(parents=True)
+    stored = archive / "2024" / "jan.pdf"
+    stored.write_bytes(b"%PDF january")
+    fresh = archive / "feb.png"
+    fresh.write_bytes(b"png february")
+    (archive / "notes.txt").write_bytes(b"not a statement")
+    create_document(db, filename="jan.pdf", file_hash=file_sha256(str(stored)), document_type="Other")
+    reads: list[str] = []
+    monkeypatch.setattr(hash_service, "file_sha256", lambda p: reads.append(p) or hashing.file_sha256(p))
+
+    scan = scan_archive(db, archive)
+    assert sorted(scan.hashes) == sorted([str(stored), str(fresh)])
+    assert scan.new == [str(fresh)]
+    assert scan.existing[str(stored)]["filename"] == "jan.pdf"
+    assert len(reads) == 2
+
+    fresh.write_bytes(b"png february, rescanned")
+    rescan = scan_archive(db, archive)
+    assert reads[2:] == [str(fresh)]
+    assert rescan.hashes[str(fresh)] == file_sha256(str(fresh))
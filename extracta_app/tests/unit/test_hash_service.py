@@ -0,0 +1,56 @@
+import hashlib
+import os
+from pathlib import Path
+
+from src.common import hash_service
+from src.common.hash_service import FileHashService
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+def test_hash_files_matches_hashlib_and_preserves_order(tmp_path: Path):
+    files = [_write(tmp_path / f"f{i}.pdf", os.urandom(1000 + i * 5000)) for i in range(6)]
+    svc = FileHashService(max_workers=3)
+    result = svc.hash_files(list(reversed(files)))
+    assert list(result) == [str(f) for f in reversed(files)]
+    for f in files:
+        assert result[str(f)] == hashlib.sha256(f.read_bytes()).hexdigest()
+
+
+def test_unchanged_files_are_not_reread(monkeypatch, tmp_path: Path):
+    files = [_write(tmp_path / f"s{i}.pdf", f"statement {i}".encode()) for i in range(3)]
+    reads: list[str] = []
+    real = hash_service.file_sha256
+
+    def counting(path):
+        reads.append(path)
+        return real(path)
+
+    monkeypatch.setattr(hash_service, "file_sha256", counting)
+    cache = tmp_path / "cache" / "hashes.json"
+    with FileHashService(cache) as svc:
+        first = svc.hash_files(files)
+    assert len(reads) == 3 and cache.exists()
+
+    # New instance loads the sidecar: nothing is re-read
+    svc2 = FileHashService(cache)
+    assert svc2.hash_files(files) == first
+    assert len(reads) == 3 and svc2.hits == 3
+
+    # Changing a file (size + mtime) invalidates only that entry
+    _write(files[1], b"statement 1 amended")
+    updated = svc2.hash_files(files)
+    assert len(reads) == 4
+    assert updated[str(files[1])] == hashlib.sha256(b"statement 1 amended").hexdigest()
+
+
+def test_corrupt_sidecar_starts_cold(tmp_path: Path):
+    cache = _write(tmp_path / "hashes.json", b"{not json")
+    f = _write(tmp_path / "a.pdf", b"abc")
+    svc = FileHashService(cache)
+    assert svc.hash_file(f) == hashlib.sha256(b"abc").hexdigest()
+    svc.save()
+    assert FileHashService(cache).hash_files([f])[str(f)] == hashlib.sha256(b"abc").hexdigest()
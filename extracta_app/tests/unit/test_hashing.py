@@ -79,3 +79,36 @@ def test_normalization_hash_numeric_formatting():
     h_a = normalization_hash(row_a, mapping_version, logic_version)
     h_b = normalization_hash(row_b, mapping_version, logic_version)
     assert h_a == h_b, "Hashes differ due to improper numeric normalization (should be identical)."
+
+
+def test_normalization_hashes_batch_bit_identical():
+    from src.common.hashing import normalization_hashes
+
+    rows = [
+        {
+            "transaction_date": f"2025-02-{(i % 28) + 1:02d}",
+            "description": f"Café {{brace}} #{i}",
+            "amount_in": str(i * 0.5) if i % 3 == 0 else 0,
+            "amount_out": 0.0 if i % 3 == 0 else i * 1.005,
+            "counterparty": None if i % 5 == 0 else f"Shop {i % 7}",
+            "source_file": "statement_feb.pdf",
+            "source_file_hash": "c" * 64,
+            "year": "2025" if i % 2 else 2025,
+            "month": "2025-02",
+        }
+        for i in range(200)
+    ]
+    for mapping_version, logic_version in [("v1", "0.1.0"), ("v{2}", "1.0|x")]:
+        expected = [normalization_hash(r, mapping_version, logic_version) for r in rows]
+        assert normalization_hashes(rows, mapping_version, logic_version) == expected
+
+
+def test_normalization_hashes_batch_errors_match_single():
+    import pytest
+    from src.common.hashing import normalization_hashes
+
+    row = {"transaction_date": "2025-01-01", "description": "x"}
+    with pytest.raises(KeyError, match="amount_in"):
+        normalization_hashes([row], "v1", "0.1.0")
+    with pytest.raises(ValueError):
+        normalization_hashes([], "", "0.1.0")
@@ -75,3 +75,15 @@ def test_json_logger_stack_truncation(tmp_path: Path):
     })
     parsed = json.loads(log_file.read_text(encoding='utf-8').strip())
     assert parsed['stack_excerpt'].count('\n') <= 1  # 2 lines => 1 newline
+
+
+def test_json_logger_emit_many_batch(tmp_path: Path):
+    log_file = tmp_path / 'pipeline.log'
+    logger = JsonLogger(path=log_file)
+    events = ({"event": "counterparty_autoderive_fail", "transaction_id": f"t{i}", "reason": "heuristic_unknown"}
+              for i in range(3))
+    assert logger.emit_many(events) == 3
+    assert logger.emit_many([]) == 0
+    lines = [json.loads(line) for line in log_file.read_text(encoding='utf-8').splitlines()]
+    assert [e["transaction_id"] for e in lines] == ["t0", "t1", "t2"]
+    assert all('ts' in e for e in lines)
@@ -0,0 +1,91 @@
+import json
+import os
+import textwrap
+from pathlib import Path
+
+from src.common import mapping_config_manager as mcm
+from src.common.mapping_config_manager import MappingConfigManager
+
+YAML_V1 = textwrap.dedent(
+    """
+    version: v1
+    rules:
+      Date: transaction_date
+    """
+)
+
+
+def _write(path: Path, text: str, mtime_ns: int | None = None) -> Path:
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_snapshot_shared_between_managers(monkeypatch, tmp_path: Path):
+    cfg_path = _write(tmp_path / "mappings.yml", YAML_V1)
+    parses: list[str] = []
+    real_parse = mcm.parse_mapping_yaml
+    monkeypatch.setattr(mcm, "parse_mapping_yaml", lambda text: parses.append(text) or real_parse(text))
+
+    first = MappingConfigManager(cfg_path, check_interval=0)
+    assert first.get().rules == {"Date": "transaction_date"}
+    assert first.version == 1 and len(parses) == 1
+
+    # A second "worker" reuses the JSON snapshot instead of re-parsing
+    second = MappingConfigManager(cfg_path, check_interval=0)
+    assert second.get().version == "v1"
+    assert len(parses) == 1
+
+    # Repeated gets on an unchanged file neither parse nor bump the version
+    for _ in range(5):
+        first.get()
+    assert first.version == 1 and len(parses) == 1
+
+
+def test_hot_reload_bumps_version_only_on_content_change(tmp_path: Path):
+    cfg_path = _write(tmp_path / "mappings.yml", YAML_V1, mtime_ns=1_000_000_000)
+    manager = MappingConfigManager(cfg_path, check_interval=0)
+    assert manager.get().version == "v1"
+
+    # Touch without content change: same config object, same version
+    before = manager.get()
+    _write(cfg_path, YAML_V1, mtime_ns=2_000_000_000)
+    assert manager.get() is before and manager.version == 1
+
+    _write(cfg_path, YAML_V1.replace("v1", "v2") + "  Amount: amount\n", mtime_ns=3_000_000_000)
+    cfg = manager.get()
+    assert cfg.version == "v2" and cfg.rules["Amount"] == "amount"
+    assert manager.version == 2
+    # Stale snapshot for the old content is pruned
+    assert len(list((tmp_path / ".mapping_snapshots").glob("mappings.*.json"))) == 1
+
+
+def test_check_interval_throttles_stat(tmp_path: Path):
+    cfg_path = _write(tmp_path / "mappings.yml", YAML_V1, mtime_ns=1_000_000_000)
+    manager = MappingConfigManager(cfg_path, check_interval=3600)
+    manager.get()
+    _write(cfg_path, YAML_V1.replace("v1", "v9"), mtime_ns=5_000_000_000)
+    assert manager.get().version == "v1"  # not re-checked yet
+    assert manager.refresh() is True
+    assert manager.get().version == "v9"
+
+
+def test_snapshots_are_plain_json_and_pickles_are_ignored(tmp_path: Path):
+    import pickle
+
+    cfg_path = _write(tmp_path / "mappings.yml", YAML_V1)
+    manager = MappingConfigManager(cfg_path, check_interval=0)
+    manager.get()
+    (snap,) = (tmp_path / ".mapping_snapshots").glob("mappings.*.json")
+    assert json.loads(snap.read_text(encoding="utf-8"))["rules"] == {"Date": "transaction_date"}
+
+    # Whatever sits in the snapshot file is only ever JSON-decoded
+    snap.write_bytes(pickle.dumps({"version": "evil"}))
+    assert MappingConfigManager(cfg_path, check_interval=0).get().version == "v1"
+
+
+def test_data_that_does_not_round_trip_through_json_is_not_snapshotted(tmp_path: Path):
+    cfg_path = _write(tmp_path / "mappings.yml", YAML_V1 + "synonyms:\n  2024: [Year]\n")
+    assert MappingConfigManager(cfg_path, check_interval=0).get().synonyms == {2024: ["Year"]}
+    assert not list((tmp_path / ".mapping_snapshots").glob("*.json"))
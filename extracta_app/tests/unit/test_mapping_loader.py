@@ -63,3 +63,58 @@ def test_header_resolution_no_match_returns_none(tmp_path: Path):
     headers = ["Unrelated"]
     result = resolve_headers(headers, source_file="other.pdf", config=cfg)
     assert result["Unrelated"] is None
+
+
+def _legacy_resolve(headers, source_file, cfg):
+    """Reference implementation (pre-resolver nested loops) for parity checks."""
+    from fnmatch import fnmatch
+
+    result = dict.fromkeys(headers)
+    lower_rules = {k.lower(): v for k, v in cfg.rules.items()}
+    synonym_lookup = {s.lower(): c for c, syns in cfg.synonyms.items() for s in syns}
+    for entry in cfg.file_overrides:
+        pattern = entry.get("pattern")
+        if pattern and fnmatch(source_file, pattern):
+            for hdr, canonical in (entry.get("headers") or {}).items():
+                for original in headers:
+                    if original.lower() == hdr.lower():
+                        result[original] = canonical
+    for original in headers:
+        if result[original] is None and original.lower() in lower_rules:
+            result[original] = lower_rules[original.lower()]
+    for original in headers:
+        if result[original] is None:
+            val = synonym_lookup.get(original.lower())
+            if val:
+                result[original] = val
+    return result
+
+
+def test_resolver_matches_legacy_with_many_overrides(tmp_path: Path):
+    from src.common.mapping_loader import MappingConfig
+
+    overrides = [{"pattern": f"bank_{i:04d}_*.pdf", "headers": {f"Col{i}": "amount_out"}} for i in range(2000)]
+    overrides.append({"pattern": "bank_0042_*", "headers": {"col42": "amount_in", "Memo": "description"}})
+    overrides.append({"pattern": "*.csv", "headers": {"Date": "transaction_date"}})
+    cfg = MappingConfig(
+        version="v2",
+        synonyms={"amount_out": ["debit"], "description": ["memo", "details"]},
+        rules={"Date": "transaction_date", "Booked": "transaction_date"},
+        file_overrides=overrides,
+    )
+    cases = [
+        (["Date", "Col42", "Memo", "Debit", "Other"], "bank_0042_jan.pdf"),
+        (["Date", "Col7", "details"], "bank_0007_feb.pdf"),
+        (["Booked", "Col7", "debit"], "unrelated.pdf"),
+        (["Date", "Amount"], "export.csv"),
+    ]
+    for headers, source_file in cases:
+        assert resolve_headers(headers, source_file, cfg) == _legacy_resolve(headers, source_file, cfg)
+
+    # Resolver is built once per config and caches per (headers, file)
+    assert cfg.resolver is cfg.resolver
+    before = cfg.resolver.cache_info().hits
+    first = resolve_headers(["Date", "Col42"], "bank_0042_jan.pdf", cfg)
+    first["Date"] = "mutated"  # callers get a copy, cache stays intact
+    assert resolve_headers(["Date", "Col42"], "bank_0042_jan.pdf", cfg)["Date"] == "transaction_date"
+    assert cfg.resolver.cache_info().hits == before + 1
@@ -0,0 +1,48 @@
+import random
+import re
+
+from src.normalization.merchant_aliases import AliasMatcher
+from src.persistence.merchant_aliases_repository import normalize_alias_text
+
+
+def test_alias_matches_whole_tokens_only():
+    m = AliasMatcher([("AMZN MKTP", "Amazon"), ("Rimi", "Rimi")])
+    assert m.match("POS 1234 AMZN Mktp*US 55") == "Amazon"
+    assert m.match("card payment RIMI-LIETUVA") == "Rimi"
+    assert m.match("PRIMITIVE GOODS") is None  # 'rimi' inside a word
+    assert m.match("AMZN MARKETPLACE") is None
+
+
+def test_longest_alias_wins_then_leftmost():
+    m = AliasMatcher([("uber", "Uber"), ("uber eats", "Uber Eats"), ("bolt", "Bolt"), ("wolt", "Wolt")])
+    assert m.match("UBER EATS ORDER 77") == "Uber Eats"
+    assert m.match("UBER TRIP") == "Uber"
+    assert m.match("wolt then bolt") == "Wolt"
+
+
+def test_overlapping_aliases_use_failure_links():
+    m = AliasMatcher([("a b c d", "Long"), ("b c", "Short"), ("c d e", "Tail")])
+    assert m.match("x a b c x") == "Short"  # falls back from the 'a b c d' branch
+    assert m.match("a b c d e") == "Long"
+
+
+def _naive(aliases, text):
+    padded = f" {normalize_alias_text(text)} "
+    best = None
+    for alias, canonical in aliases:
+        key = f" {normalize_alias_text(alias)} "
+        m = re.search(re.escape(key), padded)
+        if m and (best is None or len(key) > best[0] or (len(key) == best[0] and m.end() < best[2])):
+            best = (len(key), canonical, m.end())
+    return best[1] if best else None
+
+
+def test_matcher_agrees_with_naive_scan():
+    rng = random.Random(7)
+    words = ["ab", "abc", "bc", "cab", "b", "ca", "abca"]
+    aliases = list({" ".join(rng.choices(words, k=rng.randint(1, 3))): None for _ in range(60)})
+    pairs = [(a, f"N{i}") for i, a in enumerate(aliases)]
+    m = AliasMatcher(pairs)
+    for _ in range(500):
+        text = " ".join(rng.choices(words, k=rng.randint(1, 8)))
+        assert m.match(text) == _naive(pairs, text), text
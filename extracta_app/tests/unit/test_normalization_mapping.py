@@ -33,3 +33,15 @@ def test_map_row_missing_field_returns_none():
     raw = {"Description": "No date", "Amount": "5"}
     mapped = map_row(raw, HEADER_MAP, source_file="s.pdf", source_file_hash="h" * 64)
     assert mapped is None
+
+
+def test_random_transaction_ids_are_uuid4():
+    import uuid
+
+    from src.normalization.mapping import random_transaction_ids
+
+    ids = random_transaction_ids(500)
+    assert len(set(ids)) == 500
+    for tx_id in ids:
+        parsed = uuid.UUID(tx_id)
+        assert parsed.version == 4 and parsed.variant == uuid.RFC_4122 and str(parsed) == tx_id
@@ -0,0 +1,118 @@
+"""Perceptual hash near-duplicate detection (dHash + banded SQLite lookup)."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+from src.common.perceptual_hash import hamming_distance, image_dhash, split_bands
+from src.persistence.image_hashes_repository import find_near_duplicates, record_image_hash
+from src.persistence.migrations import init_db
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _scene(size=(120, 80)):
+    """Smooth synthetic 'receipt' with a few blocks of contrast."""
+    img = Image.new("L", size)
+    w, h = size
+    img.putdata([(x * 200 // w + (60 if (x // 30 + y // 20) % 2 else 0)) % 256 for y in range(h) for x in range(w)])
+    return img
+
+
+def _gradient(path: Path, *, scale: float = 1.0, fmt: str = "PNG") -> Path:
+    img = _scene()
+    if scale != 1.0:
+        img = img.resize((int(img.width * scale), int(img.height * scale)))
+    img.save(path, format=fmt)
+    return path
+
+
+def test_rescan_is_close_and_different_image_is_far(tmp_path: Path):
+    original = image_dhash(_gradient(tmp_path / "a.png"))
+    rescan = image_dhash(_gradient(tmp_path / "a_rescan.jpg", scale=2.0, fmt="JPEG"))
+    other_img = Image.new("L", (120, 80))
+    other_img.putdata([(y * 3 + (90 if x % 17 < 8 else 0)) % 256 for y in range(80) for x in range(120)])
+    other_img.save(tmp_path / "b.png")
+    other = image_dhash(tmp_path / "b.png")
+
+    assert original is not None and rescan is not None and other is not None
+    assert hamming_distance(original, rescan) <= 3
+    assert hamming_distance(original, other) > 10
+
+
+def test_unreadable_image_returns_none(tmp_path: Path):
+    bogus = tmp_path / "broken.png"
+    bogus.write_bytes(b"\x89PNG\r\n\x1a\n")
+    assert image_dhash(bogus) is None
+
+
+def test_split_bands_round_trip():
+    value = 0x0123_4567_89AB_CDEF
+    assert split_bands(value) == (0x0123, 0x4567, 0x89AB, 0xCDEF)
+
+
+def test_banded_lookup_respects_threshold(tmp_path: Path):
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    base = 0xFFFF_0000_FFFF_0000
+    record_image_hash(db, file_hash="h1", filename="a.png", phash=base)
+    record_image_hash(db, file_hash="h2", filename="far.png", phash=~base & (2**64 - 1))
+
+    near = base ^ 0b101  # two flipped bits in the last band
+    matches = find_near_duplicates(db, near, max_distance=3)
+    assert [m["file_hash"] for m in matches] == ["h1"]
+    assert matches[0]["distance"] == 2
+    assert find_near_duplicates(db, near, max_distance=1) == []
+    assert find_near_duplicates(db, base, max_distance=3, exclude_file_hash="h1") == []
+
+
+def test_ingest_short_circuits_ocr_for_rescan(monkeypatch, tmp_path: Path):
+    from src.ingestion.pipeline import ingest_file
+
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    calls: list[str] = []
+
+    def fake_extract(path: str):
+        calls.append(path)
+        return [{"raw_text": "Coffee 3.50"}]
+
+    monkeypatch.setattr(sys.modules["src.extraction.image_extractor"], "extract_raw_rows", fake_extract)
+
+    first = ingest_file(str(_gradient(tmp_path / "receipt.png")), db_path=db)
+    assert first["near_duplicate_of"] is None
+    assert first["perceptual_hash"] is not None
+    assert len(calls) == 1
+    # Not recorded until the document is persisted (an upload that fails later leaves nothing behind)
+    assert find_near_duplicates(db, first["perceptual_hash"]) == []
+    record_image_hash(
+        db, file_hash=first["source_file_hash"], filename=first["source_file"], phash=first["perceptual_hash"]
+    )
+
+    second = ingest_file(str(_gradient(tmp_path / "receipt_again.jpg", scale=1.5, fmt="JPEG")), db_path=db)
+    assert second["near_duplicate_of"]["filename"] == "receipt.png"
+    assert second["rows"] == []
+    assert len(calls) == 1  # OCR skipped
+
+    flagged = ingest_file(
+        str(_gradient(tmp_path / "receipt_third.jpg", fmt="JPEG")), db_path=db, skip_near_duplicates=False
+    )
+    assert flagged["near_duplicate_of"] is not None
+    assert len(flagged["rows"]) == 1
+    assert len(calls) == 2
+
+
+def test_deleting_document_drops_its_image_hash(tmp_path: Path):
+    from src.persistence.documents_repository import create_document, delete_document_by_file_hash
+
+    db = str(tmp_path / "t.db")
+    init_db(db)
+    phash = image_dhash(_gradient(tmp_path / "receipt.png"))
+    assert phash is not None
+    create_document(db, filename="receipt.png", file_hash="h1", document_type="Purchase Receipt")
+    record_image_hash(db, file_hash="h1", filename="receipt.png", phash=phash)
+    assert [m["file_hash"] for m in find_near_duplicates(db, phash)] == ["h1"]
+
+    delete_document_by_file_hash(db, "h1")
+    assert find_near_duplicates(db, phash) == []
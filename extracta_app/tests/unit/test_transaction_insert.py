@@ -60,3 +60,30 @@ def test_bulk_insert_and_idempotency(tmp_path: Path):
     bulk_insert_transactions(str(db_path), rows)
     fetched2 = get_transactions(str(db_path))
     assert len(fetched2) == 2, "Duplicate insert should not create additional rows"
+
+
+def test_deterministic_ids_make_reimport_a_noop(tmp_path: Path):
+    from src.normalization.engine import normalize_records
+    from src.normalization.mapping import TRANSACTION_ID_NAMESPACE
+
+    db_path = str(tmp_path / "tx.db")
+    init_db(db_path)
+    raw = [
+        {"Date": "2025-01-15", "Description": "Coffee", "Amount": "-3.50"},
+        {"Date": "2025-01-15", "Description": "Coffee", "Amount": "-3.50"},  # genuine repeat
+        {"Date": "2025-01-16", "Description": "Refund", "Amount": "12.00"},
+    ]
+    params = {
+        "header_map": {}, "mapping_version": "v1", "logic_version": "0.1.0",
+        "source_file": "statement.pdf", "source_file_hash": "a" * 64, "deterministic_ids": True,
+    }
+    first = normalize_records(raw, **params)
+    second = normalize_records(list(reversed(raw)), **params)
+    assert [r.transaction_id for r in first] == [r.transaction_id for r in second]
+    assert len({r.transaction_id for r in first}) == 3
+    coffee = [r for r in first if r.description == "Coffee"]
+    assert coffee[0].transaction_id == str(uuid.uuid5(TRANSACTION_ID_NAMESPACE, f"{coffee[0].normalization_hash}:0"))
+
+    assert bulk_insert_transactions(db_path, first) == 3
+    assert bulk_insert_transactions(db_path, second) == 0
+    assert len(get_transactions(db_path)) == 3
@@ -1,7 +1,16 @@
+import random
+from datetime import datetime
+
 import pytest
 
 try:
-    from src.normalization.validation import validate_rows  # type: ignore
+    from src.normalization.validation import (  # type: ignore
+        DATE_FORMATS,
+        DateFormatConflictError,
+        DateParser,
+        infer_date_format,
+        validate_rows,
+    )
 except ImportError:
     validate_rows = None  # type: ignore
 
@@ -19,16 +28,97 @@ def test_validation_required_columns():
         validate_rows(rows, required_columns=["Date", "Description", "Amount"])
 
 
-def test_validation_date_fallback_formats():
+def test_validation_tolerant_mode_quarantines_bad_rows():
+    rows = [
+        {"Date": "2025-01-01", "Description": "ok", "Amount": "10"},
+        {"Date": "2025-01-02", "Amount": "10"},  # missing Description
+        {"Date": "not a date", "Description": "ocr glitch", "Amount": "5"},
+        {"Date": "2025-01-03", "Description": "ok too", "Amount": "-1"},
+    ]
+    quarantined = []
+    cleaned, _ = validate_rows(rows, required_columns=["Date", "Description", "Amount"], quarantined=quarantined)
+    assert [r["Description"] for r in cleaned] == ["ok", "ok too"]
+    assert [q["row_index"] for q in quarantined] == [1, 2]
+    assert "Missing required columns" in quarantined[0]["reason"]
+    assert "Unrecognized date format" in quarantined[1]["reason"]
+    assert quarantined[1]["row"] is rows[2]
+
+
+def test_validation_date_formats_mixed_in_one_file_are_rejected():
     assert validate_rows is not None, "validate_rows not implemented (Task 26 pending)"
     rows = [
-        {"Date": "2025-01-15", "Description": "ISO", "Amount": "10.00"},
+        {"Date": "2025-01-15", "Description": "ISO", "Amount": "0"},
         {"Date": "15/01/2025", "Description": "EU", "Amount": "-5.25"},
-        {"Date": "01/16/2025", "Description": "US", "Amount": "0"},
+        {"Date": "01/16/2025", "Description": "US", "Amount": "10.00"},
     ]
-    cleaned, anomalies = validate_rows(rows, required_columns=["Date", "Description", "Amount"])
-    assert len(cleaned) == 3
-    dates = [r["Date"] for r in cleaned]
-    assert dates == ["2025-01-15", "2025-01-15", "2025-01-16"]
+    with pytest.raises(DateFormatConflictError):
+        validate_rows(rows, required_columns=["Date", "Description", "Amount"])
+    quarantined = []
+    cleaned, anomalies = validate_rows(rows, required_columns=["Date", "Description", "Amount"], quarantined=quarantined)
+    assert [r["Date"] for r in cleaned] == ["2025-01-15"]
+    assert [q["row_index"] for q in quarantined] == [1, 2]
     # Negative amount allowed (soft anomaly only for zero value row?)
     assert any(a["type"] == "zero_amount" for a in anomalies)
+
+
+REQUIRED = ["Date", "Description", "Amount"]
+
+
+def _rows(dates):
+    return [{"Date": d, "Description": f"Row {i}", "Amount": "1.00"} for i, d in enumerate(dates)]
+
+
+def test_date_format_inferred_month_first():
+    # One unambiguous value (13th) settles the whole file as mm/dd
+    cleaned, anomalies = validate_rows(_rows(["01/02/2025", "03/04/2025", "01/13/2025"]), required_columns=REQUIRED)
+    assert [r["Date"] for r in cleaned] == ["2025-01-02", "2025-03-04", "2025-01-13"]
+    assert not anomalies
+
+
+def test_date_format_ambiguous_defaults_to_day_first():
+    assert infer_date_format(["01/02/2025", "03/04/2025"]) == "%d/%m/%Y"
+    cleaned, _ = validate_rows(_rows(["01/02/2025"]), required_columns=REQUIRED)
+    assert cleaned[0]["Date"] == "2025-02-01"
+    cleaned, _ = validate_rows(_rows(["01/02/2025"]), required_columns=REQUIRED, date_format="%m/%d/%Y")
+    assert cleaned[0]["Date"] == "2025-01-02"
+
+
+def test_date_format_conflicts_quarantined():
+    dates = ["2025-01-15", "2025-01-16", "2025-01-17", "15/01/2025"]
+    quarantined = []
+    cleaned, _ = validate_rows(_rows(dates), required_columns=REQUIRED, quarantined=quarantined)
+    assert [r["Date"] for r in cleaned] == ["2025-01-15", "2025-01-16", "2025-01-17"]
+    assert [q["row_index"] for q in quarantined] == [3]
+    assert "%Y-%m-%d" in quarantined[0]["reason"]
+    with pytest.raises(DateFormatConflictError):
+        validate_rows(_rows(dates), required_columns=REQUIRED)
+    with pytest.raises(ValueError):
+        validate_rows(_rows(["2025-01-15", "not a date"]), required_columns=REQUIRED)
+    with pytest.raises(ValueError):
+        DateParser("%Y%m%d")
+
+
+def test_fast_date_parser_matches_strptime():
+    rng = random.Random(7)
+    parts = ["2025", "0", "1", "01", "12", "13", "29", "30", "31", " 1", "02", "2024", "-", "/", "x", "", "123"]
+    values = ["".join(rng.choice(parts) for _ in range(rng.randint(1, 6))) for _ in range(20000)]
+    values += ["2024-02-29", "2025-02-29", "31/04/2025", "1/2/2025", "2025-1-1", "2025-01- 1"]
+    for fmt in DATE_FORMATS:
+        parser = DateParser(fmt)
+        for v in values:
+            try:
+                expected = datetime.strptime(v, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                expected = None
+            try:
+                iso = parser.parse(v)
+            except ValueError:
+                iso = None
+            assert iso == expected, (fmt, v)
+
+
+def test_date_parser_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr("src.normalization.validation.DATE_MEMO_SIZE", 3)
+    parser = DateParser("%Y-%m-%d")
+    assert [parser.parse(f"2025-01-{d:02d}") for d in range(1, 6)][-1] == "2025-01-05"
+    assert len(parser._memo) == 3
@@ -65,3 +65,28 @@ def test_repository_integration_get_or_create(monkeypatch):
 def test_normalization_stable(text: str):
     base = ch.extract_counterparty_name("Card Payment " + text)
     assert base == "Rimi"
+
+
+def test_batch_api_matches_single_and_reports_hits():
+    descriptions = ["CARD PAYMENT RIMI LIETUVA", "12345", "purchase LIDL"] * 4
+    ch.configure_name_cache(16)
+    try:
+        assert ch.extract_counterparty_names(descriptions) == [ch.extract_counterparty_name(d) for d in descriptions]
+        stats = ch.name_cache_stats()
+        assert stats["misses"] == 3
+        assert stats["hits"] == len(descriptions) * 2 - 3
+        assert stats["currsize"] == 3 and stats["maxsize"] == 16
+        assert 0.0 < stats["hit_rate"] < 1.0
+        ch.clear_name_cache()
+        assert ch.name_cache_stats()["hits"] == 0
+    finally:
+        ch.configure_name_cache(ch.NAME_CACHE_SIZE)
+
+
+def test_name_cache_is_bounded():
+    ch.configure_name_cache(2)
+    try:
+        ch.extract_counterparty_names(["POS: AAA", "POS: BBB", "POS: CCC"])
+        assert ch.name_cache_stats()["currsize"] == 2
+    finally:
+        ch.configure_name_cache(ch.NAME_CACHE_SIZE)
@@ -1,11 +1,11 @@
 import os
-import tempfile
 import sqlite3
+import tempfile
 import uuid
 
-from extracta_app.src.persistence.migrations import init_db
-from extracta_app.src.persistence import documents_repository as docs_repo  # type: ignore
 from extracta_app.src.persistence import counterparties_repository as cp_repo  # type: ignore
+from extracta_app.src.persistence import documents_repository as docs_repo  # type: ignore
+from extracta_app.src.persistence.migrations import init_db
 from extracta_app.src.persistence.transactions_repository import bulk_insert_transactions
 
 
@@ -84,6 +84,27 @@ def test_counterparties_get_or_create_case_insensitive_and_merge():
         assert reassigned_second == 0
 
 
+def test_counterparties_merge_many_ids_in_chunks(monkeypatch):
+    monkeypatch.setattr(cp_repo, "MERGE_CHUNK", 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "test.db")
+        init_db(db)
+        ids = [cp_repo.get_or_create(db, display_name=f"Shop {i}", normalized=f"shop {i}") for i in range(6)]
+        bulk_insert_transactions(db, [_txn_row("f.pdf", "h1") for _ in ids])
+        con = sqlite3.connect(db)
+        try:
+            con.executemany(
+                "UPDATE transactions SET counterparty_id=? WHERE rowid=?", [(cp, i + 1) for i, cp in enumerate(ids)]
+            )
+            con.commit()
+        finally:
+            con.close()
+        # Winner and duplicates in the losing list are ignored
+        reassigned = cp_repo.merge(db, winner_id=ids[0], losing_ids=[ids[0], *ids[1:], ids[2]])
+        assert reassigned == 5
+        assert [r["counterparty_id"] for r in cp_repo.list_counterparties(db)] == [ids[0]]
+
+
 def test_counterparties_rename_and_conflict():
     with tempfile.TemporaryDirectory() as tmp:
         db = os.path.join(tmp, "test.db")